@@ -0,0 +1,160 @@
+import argparse
+import json
+import sys
+from dataset_readers import expandir_patron
+from model_format import crear_info_modelo, escribir_modelo
+from pipeline import ESTRATEGIAS_FALTANTES, ejecutar_flujo
+
+# Entrenamiento desatendido desde la línea de comandos: ejecuta el flujo completo sin interfaz
+# gráfica y guarda el modelo con el mismo formato JSON que el botón "Guardar Modelo".
+#
+#   python src/batch_training.py datos.csv --entradas x1 x2 --salida y --modelo modelo.json
+
+NOMBRES_PASOS = {
+    "carga": "Carga",
+    "seleccion": "Selección de columnas",
+    "faltantes": "Datos faltantes",
+    "separacion": "Separación",
+    "entrenamiento": "Entrenamiento",
+    "total": "Total",
+}
+
+
+def crear_parser():
+    """Construye el analizador de argumentos de la línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Entrena un modelo de regresión lineal sin interfaz gráfica."
+    )
+    parser.add_argument(
+        "origen",
+        help="Archivo de datos o patrón glob (entre comillas) de varios archivos",
+    )
+    parser.add_argument(
+        "--entradas", nargs="+", required=True, help="Columnas de entrada"
+    )
+    parser.add_argument("--salida", required=True, help="Columna de salida")
+    parser.add_argument(
+        "--modelo", required=True, help="Archivo JSON en el que guardar el modelo"
+    )
+    parser.add_argument(
+        "--faltantes",
+        choices=ESTRATEGIAS_FALTANTES,
+        default="eliminar",
+        help="Tratamiento de los datos faltantes (por defecto: eliminar)",
+    )
+    parser.add_argument(
+        "--valor",
+        type=float,
+        help="Valor con el que rellenar si --faltantes es constante",
+    )
+    parser.add_argument(
+        "--entrenamiento",
+        type=float,
+        default=80,
+        help="Porcentaje de filas para entrenamiento (por defecto: 80)",
+    )
+    parser.add_argument(
+        "--semilla", type=int, help="Semilla de la separación aleatoria"
+    )
+    parser.add_argument(
+        "--descripcion", default="", help="Descripción guardada con el modelo"
+    )
+    parser.add_argument("--tabla", help="Tabla o vista de SQLite")
+    parser.add_argument("--consulta", help="Consulta SELECT sobre SQLite")
+    parser.add_argument("--hoja", help="Hoja de Excel (por defecto, la primera)")
+    parser.add_argument(
+        "--fuera-de-memoria",
+        action="store_true",
+        help="Vuelca las columnas a un almacén en disco y las recorre por bloques",
+    )
+    parser.add_argument(
+        "--informe", help="Archivo JSON en el que guardar los tiempos de cada paso"
+    )
+    return parser
+
+
+def opciones_origen(args):
+    """Devuelve la ruta y las opciones de lectura del origen indicado en los argumentos"""
+    opciones = {
+        clave: valor
+        for clave, valor in (
+            ("tabla", args.tabla),
+            ("consulta", args.consulta),
+            ("hoja", args.hoja),
+        )
+        if valor is not None
+    }
+    if any(c in args.origen for c in "*?["):
+        archivos = expandir_patron(args.origen)
+        if not archivos:
+            raise ValueError(f"Ningún archivo de datos coincide con {args.origen}.")
+        if len(archivos) > 1:
+            opciones["archivos"] = archivos
+        return archivos[0], opciones
+    return args.origen, opciones
+
+
+def texto_informe(informe):
+    """Devuelve el informe de tiempos y métricas como texto para la consola"""
+    lineas = [
+        f"{NOMBRES_PASOS[paso]:<22} {segundos:9.3f} s"
+        for paso, segundos in informe["tiempos"].items()
+    ]
+    filas = informe["filas"]
+    metricas = informe["metricas"]
+    lineas.append(
+        f"Filas: {filas['cargadas']} cargadas · {filas['train']} entrenamiento · "
+        f"{filas['test']} test"
+    )
+    lineas.append(
+        f"R²: {metricas['r2_train']:.4f} (entrenamiento) · {metricas['r2_test']:.4f} (test)"
+    )
+    return "\n".join(lineas)
+
+
+def main(argv=None):
+    """Ejecuta el flujo con los argumentos dados; devuelve 0 si termina bien y 1 si falla"""
+    args = crear_parser().parse_args(argv)
+    try:
+        ruta, opciones = opciones_origen(args)
+        resultado = ejecutar_flujo(
+            ruta,
+            args.entradas,
+            args.salida,
+            args.faltantes,
+            args.entrenamiento,
+            args.semilla,
+            args.valor,
+            fuera_de_memoria=args.fuera_de_memoria,
+            **opciones,
+        )
+        escribir_modelo(
+            args.modelo,
+            crear_info_modelo(
+                resultado["modelo"],
+                resultado["entradas"],
+                resultado["salida"],
+                args.descripcion,
+                resultado["metricas"],
+            ),
+        )
+        informe = {
+            "origen": args.origen,
+            "modelo": args.modelo,
+            "tiempos": resultado["tiempos"],
+            "filas": resultado["filas"],
+            "metricas": resultado["metricas"],
+        }
+        if args.informe:
+            with open(args.informe, "w", encoding="utf-8") as f:
+                json.dump(informe, f, indent=4, ensure_ascii=False)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(texto_informe(informe))
+    print(f"Modelo guardado en {args.modelo}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import threading
+
+# Cancelación cooperativa de cargas y entrenamientos en segundo plano
+
+
+class OperacionCancelada(Exception):
+    """Se lanza cuando el usuario cancela una operación en curso"""
+
+
+class TokenCancelacion:
+    """Señal compartida entre la interfaz y un hilo de trabajo para pedir que se detenga.
+
+    El hilo consulta el token entre bloques de trabajo (comprobar) y abandona la operación
+    lanzando OperacionCancelada, de modo que los datos parciales se liberan al deshacer la pila.
+    """
+
+    def __init__(self):
+        self._evento = threading.Event()
+
+    def cancelar(self):
+        """Pide la cancelación de la operación"""
+        self._evento.set()
+
+    @property
+    def cancelado(self):
+        """Indica si se ha pedido la cancelación"""
+        return self._evento.is_set()
+
+    def comprobar(self):
+        """Lanza OperacionCancelada si se ha pedido la cancelación"""
+        if self._evento.is_set():
+            raise OperacionCancelada()
+
+    def esperar(self, segundos):
+        """Espera el tiempo indicado o hasta que se cancele; lanza OperacionCancelada si se cancela"""
+        if self._evento.wait(segundos):
+            raise OperacionCancelada()
+
+
+def comprobar_cancelacion(cancelacion):
+    """Comprueba un token opcional (None significa que la operación no se puede cancelar)"""
+    if cancelacion is not None:
+        cancelacion.comprobar()
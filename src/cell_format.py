@@ -0,0 +1,81 @@
+from collections import OrderedDict
+import numpy as np
+
+# Formato de las celdas de la tabla: cada bloque de una columna se convierte a texto de una vez
+
+MAXIMO_CARACTERES_CELDA = 18
+# Filas por bloque formateado y bloques que conserva la caché
+FILAS_POR_BLOQUE_FORMATO = 128
+MAXIMO_BLOQUES_FORMATO = 2048
+
+
+def texto_celda(valor):
+    """Convierte un valor en el texto de su celda, recortado si no cabe"""
+    texto = str(valor)
+    if len(texto) > MAXIMO_CARACTERES_CELDA:
+        texto = texto[: MAXIMO_CARACTERES_CELDA - 3] + "..."
+    return texto
+
+
+def _a_texto(serie):
+    """Convierte una columna a un array de textos con el formateador de su tipo"""
+    if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in "biuf":
+        # Numéricos y booleanos de numpy: conversión en C, mismo texto que str(valor)
+        return serie.to_numpy().astype(str)
+    # Texto, categorías, fechas y tipos con nulos de pandas: formato de pandas
+    return serie.astype(str).to_numpy(dtype=str)
+
+
+def formatear_valores(serie):
+    """Devuelve los textos de las celdas de una columna, recortados a MAXIMO_CARACTERES_CELDA"""
+    textos = _a_texto(serie)
+    largos = np.char.str_len(textos) > MAXIMO_CARACTERES_CELDA
+    if largos.any():
+        recortados = textos[largos].astype(f"<U{MAXIMO_CARACTERES_CELDA - 3}")
+        textos[largos] = np.char.add(recortados, "...")
+    return textos
+
+
+class CacheFormato:
+    """Caché LRU de bloques de celdas formateadas por (fuente de datos, columna, bloque de filas).
+
+    Los bloques están alineados a FILAS_POR_BLOQUE_FORMATO filas, de modo que desplazarse o
+    recolorear la tabla vuelve a usar el texto ya calculado de cualquier rango de filas.
+    """
+
+    def __init__(self, maximo_bloques=MAXIMO_BLOQUES_FORMATO):
+        self.maximo_bloques = maximo_bloques
+        self._bloques = OrderedDict()
+
+    def __len__(self):
+        return len(self._bloques)
+
+    def textos(self, clave, columna, inicio, fin, leer_filas):
+        """Textos de la columna en las filas [inicio, fin).
+
+        leer_filas(inicio, fin) devuelve las filas de la fuente como DataFrame; solo se llama para
+        los bloques que no están en la caché.
+        """
+        if fin <= inicio:
+            return np.empty(0, dtype=str)
+        tamano = FILAS_POR_BLOQUE_FORMATO
+        partes = []
+        for bloque in range(inicio // tamano, (fin - 1) // tamano + 1):
+            primera = bloque * tamano
+            textos = self._bloque(
+                (clave, columna, bloque),
+                lambda: formatear_valores(leer_filas(primera, primera + tamano)[columna]),
+            )
+            partes.append(textos[max(inicio, primera) - primera : fin - primera])
+        return np.concatenate(partes)
+
+    def _bloque(self, clave, formatear):
+        """Devuelve un bloque de la caché o lo formatea y lo guarda"""
+        if clave in self._bloques:
+            self._bloques.move_to_end(clave)
+            return self._bloques[clave]
+        textos = formatear()
+        self._bloques[clave] = textos
+        if len(self._bloques) > self.maximo_bloques:
+            self._bloques.popitem(last=False)
+        return textos
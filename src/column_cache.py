@@ -0,0 +1,73 @@
+import weakref
+import zlib
+import numpy as np
+import pandas as pd
+
+# Resultados calculados por columna de un DataFrame y guardados en memoria mientras el DataFrame
+# vive: el perfil de tipos, el índice de faltantes y las permutaciones de orden. Cada resultado se
+# guarda con la huella de su columna y se vuelve a calcular cuando la columna cambia.
+
+
+def huella_columna(serie):
+    """Tipo, longitud y suma de comprobación (CRC-32) de los valores de una columna.
+
+    Cambia al sustituir la columna y también al modificar sus valores en el sitio
+    (df.loc[i, col] = ..., fillna(inplace=True)...). Las columnas numéricas se comprueban sobre
+    sus bytes, sin copiarlas; las demás (texto, categóricas...) sobre el hash de cada valor.
+    """
+    if isinstance(serie.dtype, np.dtype) and serie.dtype != object:
+        suma = zlib.crc32(np.ascontiguousarray(serie.to_numpy()).view(np.uint8))
+    else:
+        suma = zlib.crc32(pd.util.hash_pandas_object(serie, index=False).to_numpy())
+    return (serie.dtype, len(serie), suma)
+
+
+class CacheColumnas:
+    """Base de los resultados que se calculan por columna de un DataFrame y se reutilizan.
+
+    Solo guarda una referencia débil al DataFrame. Cada resultado se guarda por columna y variante
+    junto con la huella de la columna (ver huella_columna) y se recalcula si la huella cambia.
+    """
+
+    def __init__(self, df):
+        self._df = weakref.ref(df)
+        self._resultados = {}
+
+    @property
+    def df(self):
+        """DataFrame al que pertenecen los resultados"""
+        return self._df()
+
+    def _resultado(self, columna, calcular, variante=None):
+        """Resultado de calcular(serie) para una columna, guardado mientras la columna no cambie"""
+        serie = self._df()[columna]
+        huella = huella_columna(serie)
+        guardado = self._resultados.get((columna, variante))
+        if guardado is None or guardado[0] != huella:
+            guardado = (huella, calcular(serie))
+            self._resultados[(columna, variante)] = guardado
+        return guardado[1]
+
+
+class RegistroDataFrames:
+    """Un objeto por DataFrame vivo (p. ej. su índice de faltantes), creado con crear(df) al pedirlo.
+
+    Los objetos se guardan por id(df) y se eliminan cuando se libera su DataFrame.
+    """
+
+    def __init__(self, crear):
+        self._crear = crear
+        self._objetos = {}
+
+    def __contains__(self, clave):
+        """Indica si hay un objeto guardado para el DataFrame con ese id"""
+        return clave in self._objetos
+
+    def obtener(self, df):
+        """Devuelve el objeto del DataFrame, creándolo la primera vez"""
+        objeto = self._objetos.get(id(df))
+        if objeto is None or objeto.df is not df:
+            objeto = self._crear(df)
+            self._objetos[id(df)] = objeto
+            weakref.finalize(df, self._objetos.pop, id(df), None)
+        return objeto
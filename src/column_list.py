@@ -0,0 +1,142 @@
+import fnmatch
+import math
+import re
+import pandas as pd
+
+# Modelo del selector de columnas de entrada: búsqueda, filtro por tipo y marcado en bloque sin
+# depender de la interfaz, para que el coste no dependa de cuántos widgets haya en pantalla
+
+TIPOS_COLUMNA = ("Numérica", "Booleana", "Texto", "Categórica", "Fecha")
+
+
+def tipo_columna(dtype):
+    """Nombre del tipo de una columna para mostrarlo y filtrar por él"""
+    if pd.api.types.is_bool_dtype(dtype):
+        return "Booleana"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "Numérica"
+    if isinstance(dtype, pd.CategoricalDtype):
+        return "Categórica"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "Fecha"
+    return "Texto"
+
+
+def es_patron(texto):
+    """Indica si el texto de búsqueda es un patrón glob (*, ? o [ ])"""
+    return any(c in texto for c in "*?[")
+
+
+class ListaColumnas:
+    """Columnas del selector con su tipo, las que se ven según la búsqueda y las marcadas.
+
+    La búsqueda es un texto contenido en el nombre o un patrón glob, sin distinguir mayúsculas.
+    Al escribir, si el texto nuevo amplía el anterior solo se revisan las columnas que ya
+    coincidían. Las columnas se identifican por su posición.
+
+    Las marcas cambiadas en bloque quedan pendientes de dibujar hasta que su fila se ve, para que
+    la interfaz solo actualice las filas a la vista (ver pendientes_en).
+    """
+
+    def __init__(self, columnas, tipos):
+        self.columnas = list(columnas)
+        self.tipos = list(tipos)
+        self._nombres = [str(c).lower() for c in self.columnas]
+        self._posiciones = {c: i for i, c in enumerate(self.columnas)}
+        self.texto = ""
+        # Tipo por el que se filtra, o None para todos
+        self.tipo = None
+        self.visibles = list(range(len(self.columnas)))
+        self.marcadas = set()
+        # Columnas cuya marca cambió en bloque y aún no se ha dibujado
+        self._pendientes = set()
+
+    @classmethod
+    def desde_datos(cls, df):
+        """Crea la lista con las columnas de un DataFrame y el tipo de cada una"""
+        return cls(df.columns, [tipo_columna(t) for t in df.dtypes])
+
+    def __len__(self):
+        return len(self.columnas)
+
+    def filtrar(self, texto, tipo=None):
+        """Deja visibles las columnas cuyo nombre coincide con el texto y que son del tipo dado"""
+        texto = texto.strip().lower()
+        if (
+            tipo == self.tipo
+            and not es_patron(texto)
+            and not es_patron(self.texto)
+            and texto.startswith(self.texto)
+        ):
+            # Búsqueda ampliada: solo pueden coincidir las que ya coincidían
+            candidatas = self.visibles
+        else:
+            candidatas = range(len(self.columnas))
+        if es_patron(texto):
+            coincide = re.compile(fnmatch.translate(texto)).match
+        else:
+            def coincide(nombre):
+                return texto in nombre
+        self.visibles = [
+            i
+            for i in candidatas
+            if coincide(self._nombres[i]) and (tipo is None or self.tipos[i] == tipo)
+        ]
+        self.texto = texto
+        self.tipo = tipo
+        return self.visibles
+
+    def alternar(self, indice):
+        """Marca o desmarca una columna; devuelve si queda marcada"""
+        if indice in self.marcadas:
+            self.marcadas.discard(indice)
+            return False
+        self.marcadas.add(indice)
+        return True
+
+    def marcar_visibles(self, marcar=True):
+        """Marca o desmarca todas las columnas visibles; devuelve cuántas cambian"""
+        antes = len(self.marcadas)
+        if marcar:
+            self.marcadas.update(self.visibles)
+        else:
+            self.marcadas.difference_update(self.visibles)
+        self._pendientes.update(self.visibles)
+        return abs(len(self.marcadas) - antes)
+
+    def marcar_columnas(self, columnas):
+        """Marca las columnas indicadas por nombre; devuelve cuántas no lo estaban"""
+        antes = len(self.marcadas)
+        posiciones = [self._posiciones[c] for c in columnas if c in self._posiciones]
+        self.marcadas.update(posiciones)
+        self._pendientes.update(posiciones)
+        return len(self.marcadas) - antes
+
+    def pendientes_en(self, primero, ultimo):
+        """Columnas a la vista cuya marca falta por dibujar; se dan por dibujadas.
+
+        primero y ultimo delimitan la parte de la lista que se ve, como fracciones (las de yview).
+        """
+        n = len(self.visibles)
+        filas = self.visibles[max(0, int(primero * n)):min(n, math.ceil(ultimo * n) + 1)]
+        pendientes = [i for i in filas if i in self._pendientes]
+        self._pendientes.difference_update(pendientes)
+        return pendientes
+
+    def actualizar_tipos(self, tipos):
+        """Sustituye los tipos (por ejemplo, con los de los datos completos) y vuelve a filtrar.
+
+        Devuelve las posiciones de las columnas cuyo tipo cambia.
+        """
+        tipos = list(tipos)
+        cambiadas = [i for i, (a, b) in enumerate(zip(self.tipos, tipos)) if a != b]
+        self.tipos = tipos
+        # El filtrado incremental partiría de las columnas visibles con los tipos anteriores
+        self.visibles = list(range(len(self.columnas)))
+        texto, self.texto = self.texto, ""
+        self.filtrar(texto, self.tipo)
+        return cambiadas
+
+    def seleccionadas(self):
+        """Nombres de las columnas marcadas, en el orden de los datos"""
+        return [self.columnas[i] for i in sorted(self.marcadas)]
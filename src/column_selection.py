@@ -1,70 +1,79 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import math
 import pandas as pd
+from column_list import TIPOS_COLUMNA, ListaColumnas, tipo_columna
+from dataset_loading import ejecutar_en_segundo_plano
+from feature_ranking import CacheRanking, resumen_ranking
+from pipeline import seleccionar_columnas, validar_seleccion
+
+# Marcas de las columnas de entrada en la lista
+MARCADA = "☑"
+SIN_MARCAR = "☐"
+# Filas de la lista de columnas a la vista
+FILAS_LISTA_COLUMNAS = 12
+# Milisegundos sin escribir antes de aplicar la búsqueda
+RETARDO_BUSQUEDA = 150
+# Filas a la vista del ranking de relevancia y columnas que se marcan por defecto
+FILAS_RANKING = 8
+MEJORES_POR_DEFECTO = 5
 
 
 def lanzar_selector(
-    df, parent_frame, on_confirm_callback, on_selection_change_callback=None
+    df,
+    parent_frame,
+    on_confirm_callback,
+    on_selection_change_callback=None,
+    obtener_df=None,
+    completo=True,
 ):
+    """Construye el selector de columnas.
+
+    obtener_df(columnas, al_estar_listo) devuelve los datos con las columnas pedidas o None si
+    aún no están disponibles; en ese caso puede llamar a al_estar_listo() cuando lo estén.
+    También puede devolver un DatosFueraDeMemoria, cuyas columnas ya se validaron al volcarlas.
+
+    completo=False indica que df es una vista previa. Devuelve una función que recibe los datos
+    completos cuando termina la carga y actualiza con ellos el selector.
+    """
     for w in parent_frame.winfo_children():
         w.destroy()
 
     columns = list(df.columns)
+    lista = ListaColumnas.desde_datos(df)
     salida_var = tk.StringVar(value="")
 
     def actualizar_seleccion(*args):
         """Callback que se ejecuta cada vez que cambia una selección"""
         if on_selection_change_callback:
-            entradas = [c for c, v in check_vars_inputs.items() if v.get()]
+            entradas = lista.seleccionadas()
             salida = salida_var.get()
             on_selection_change_callback(entradas, salida if salida else None)
 
     def confirmar_seleccion():
-        entradas = [c for c, v in check_vars_inputs.items() if v.get()]
+        entradas = lista.seleccionadas()
         salida = salida_var.get()
-
-        if not entradas:
-            messagebox.showerror(
-                "Error", "Selecciona al menos una columna de entrada."
-            )
-            return
-        if salida == "":
-            messagebox.showerror("Error", "Selecciona una columna de salida.")
-            return
-        if salida in entradas:
-            messagebox.showerror(
-                "Error", "La salida no puede ser una entrada."
-            )
-            return
-
-        # Validar que columnas seleccionadas solo contengan valores numéricos o vacíos
-        columnas_no_numericas = []
         todas_columnas = entradas + [salida]
 
-        for col in todas_columnas:
-            # Obtener valores no nulos de la columna
-            valores_no_nulos = df[col].dropna()
-
-            # Intentar convertir a numérico
-            try:
-                # Si no se puede convertir, pandas lanzará un error
-                pd.to_numeric(valores_no_nulos, errors="raise")
-            except (ValueError, TypeError):
-                columnas_no_numericas.append(col)
-
-        if columnas_no_numericas:
-            mensaje_error = (
-                "Las siguientes columnas contienen valores no numéricos:\n\n"
-            )
-            mensaje_error += "\n".join(
-                f"• {col}" for col in columnas_no_numericas
-            )
-            mensaje_error += "\n\nPor favor, selecciona solo columnas con valores numéricos o vacíos."
-            messagebox.showerror("Error de validación", mensaje_error)
+        # Validar la selección antes de pedir los datos
+        try:
+            validar_seleccion(entradas, salida)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
 
-        df_sel = df[entradas + [salida]].copy()
+        # El selector puede haberse construido sobre una vista previa
+        datos = (
+            df
+            if obtener_df is None
+            else obtener_df(todas_columnas, confirmar_seleccion)
+        )
+        if datos is None:
+            return
+        try:
+            df_sel = seleccionar_columnas(datos, entradas, salida)
+        except ValueError as e:
+            messagebox.showerror("Error de validación", str(e))
+            return
         on_confirm_callback(df_sel, entradas, salida)
 
     ttk.Label(
@@ -87,75 +96,301 @@ def lanzar_selector(
     contenedor.columnconfigure(0, weight=1)
     contenedor.columnconfigure(1, weight=1)
 
-    check_vars_inputs = {}
-
-    def distribuir_checkboxes():
-        # Limpiar frames
-        for w in frame_inputs.winfo_children():
-            w.destroy()
-        for w in frame_outputs.winfo_children():
-            w.destroy()
-
-        # Ancho disponible
-        ancho_inputs = frame_inputs.winfo_width()
-        ancho_outputs = frame_outputs.winfo_width()
-
-        # Si aún no existe tamaño, poner un valor base
-        ancho_inputs = max(ancho_inputs, 400)
-        ancho_outputs = max(ancho_outputs, 400)
-
-        # Tamaño estimado de un checkbox
-        check_width = 150
-
-        cols_inputs = max(1, ancho_inputs // check_width)
-
-        rows_inputs = math.ceil(len(columns) / cols_inputs)
-
-        # Crear checkboxes entrada
-        # Distribuir por columnas calculadas: llenamos por columnas para equilibrar
-        for idx, cname in enumerate(columns):
-            row = idx % rows_inputs
-            col = idx // rows_inputs
-            var = check_vars_inputs[cname]
-            # Usar ttk.Checkbutton para estilo consistente
-            chk = ttk.Checkbutton(frame_inputs, text=cname, variable=var)
-            # Expandir en ambas direcciones para ocupar el espacio disponible
-            chk.grid(row=row, column=col, padx=5, pady=3, sticky="nsew")
-
-        # Hacer que cada columna y fila se expanda igual
-        for i in range(cols_inputs):
-            frame_inputs.columnconfigure(i, weight=1)
-        for i in range(rows_inputs):
-            frame_inputs.rowconfigure(i, weight=1)
-
-        # Label
-        ttk.Label(frame_outputs, text="Selecciona la columna de salida:").pack(
-            anchor="w", pady=(0, 5)
-        )
+    # Búsqueda (texto o patrón glob como "precio_*") y filtro por tipo
+    frame_busqueda = ttk.Frame(frame_inputs)
+    frame_busqueda.pack(fill="x", pady=(0, 5))
+    ttk.Label(frame_busqueda, text="Buscar:").pack(side="left")
+    busqueda_var = tk.StringVar(value="")
+    ttk.Entry(frame_busqueda, textvariable=busqueda_var, width=20).pack(
+        side="left", fill="x", expand=True, padx=5
+    )
+    tipo_var = tk.StringVar(value="Todos")
+    ttk.Combobox(
+        frame_busqueda,
+        textvariable=tipo_var,
+        values=("Todos",) + TIPOS_COLUMNA,
+        state="readonly",
+        width=11,
+    ).pack(side="left")
+
+    # Lista de columnas: cada columna se inserta una sola vez; al filtrar se cambian de una vez
+    # las filas enganchadas a la lista y las marcas solo se actualizan en las filas a la vista
+    frame_lista = ttk.Frame(frame_inputs)
+    frame_lista.pack(fill="both", expand=True)
+    arbol = ttk.Treeview(
+        frame_lista,
+        columns=("tipo",),
+        height=FILAS_LISTA_COLUMNAS,
+        selectmode="extended",
+    )
+    arbol.heading("#0", text="Columna", anchor="w")
+    arbol.heading("tipo", text="Tipo", anchor="w")
+    arbol.column("#0", width=220, stretch=True)
+    arbol.column("tipo", width=90, stretch=False)
+    scroll_lista = ttk.Scrollbar(frame_lista, orient="vertical", command=arbol.yview)
+    arbol.pack(side="left", fill="both", expand=True)
+    scroll_lista.pack(side="right", fill="y")
 
-        # Combobox con todas las columnas
-        combo_salida = ttk.Combobox(
-            frame_outputs,
-            textvariable=salida_var,
-            values=columns,
-            state="readonly",
+    frame_acciones = ttk.Frame(frame_inputs)
+    frame_acciones.pack(fill="x", pady=(5, 0))
+    etiqueta_resumen = ttk.Label(frame_acciones, text="", foreground="gray")
+
+    def texto_fila(indice):
+        """Texto de una columna en la lista, con su marca"""
+        marca = MARCADA if indice in lista.marcadas else SIN_MARCAR
+        return f"{marca} {lista.columnas[indice]}"
+
+    def actualizar_resumen():
+        """Muestra cuántas columnas se ven y cuántas están marcadas"""
+        etiqueta_resumen.config(
+            text=f"{len(lista.visibles)} de {len(lista)} columnas · "
+            f"{len(lista.marcadas)} marcadas"
         )
-        combo_salida.pack(fill="x", pady=5)
 
-    # Inicializar check_vars
-    for cname in columns:
-        check_vars_inputs[cname] = tk.BooleanVar()
-        # Agregar trace para detectar cambios
-        check_vars_inputs[cname].trace_add("write", actualizar_seleccion)
+    def pintar_marcas(primero, ultimo):
+        """Dibuja las marcas pendientes de las filas que se ven"""
+        for i in lista.pendientes_en(float(primero), float(ultimo)):
+            arbol.item(str(i), text=texto_fila(i))
+
+    def al_desplazar(primero, ultimo):
+        """Mueve la barra y dibuja las marcas de las filas que aparecen"""
+        scroll_lista.set(primero, ultimo)
+        pintar_marcas(primero, ultimo)
+
+    arbol.configure(yscrollcommand=al_desplazar)
+    for i in range(len(lista)):
+        arbol.insert("", "end", iid=str(i), text=texto_fila(i), values=(lista.tipos[i],))
+
+    busqueda_pendiente = [None]
+
+    def mostrar_visibles(*args):
+        """Deja en la lista solo las columnas que cumplen la búsqueda y el tipo"""
+        if busqueda_pendiente[0] is not None:
+            arbol.after_cancel(busqueda_pendiente[0])
+            busqueda_pendiente[0] = None
+        tipo = tipo_var.get()
+        lista.filtrar(busqueda_var.get(), None if tipo == "Todos" else tipo)
+        # Las columnas que no cumplen se desenganchan (conservan su fila) en una sola llamada
+        arbol.selection_set(())
+        arbol.set_children("", *(str(i) for i in lista.visibles))
+        arbol.yview_moveto(0)
+        pintar_marcas(*arbol.yview())
+        actualizar_resumen()
+
+    def programar_busqueda(*args):
+        """Aplica la búsqueda cuando se deja de escribir, no con cada tecla"""
+        if busqueda_pendiente[0] is not None:
+            arbol.after_cancel(busqueda_pendiente[0])
+        busqueda_pendiente[0] = arbol.after(RETARDO_BUSQUEDA, mostrar_visibles)
+
+    def alternar(indices):
+        """Marca o desmarca las columnas indicadas y avisa una sola vez del cambio"""
+        for i in indices:
+            lista.alternar(i)
+            arbol.item(str(i), text=texto_fila(i))
+        actualizar_resumen()
+        actualizar_seleccion()
+
+    def al_pulsar(event):
+        """Un clic sobre una columna cambia su marca"""
+        fila = arbol.identify_row(event.y)
+        if fila and arbol.identify_region(event.x, event.y) in ("tree", "cell"):
+            alternar([int(fila)])
+
+    def al_pulsar_espacio(event):
+        """La barra espaciadora cambia la marca de las columnas seleccionadas"""
+        alternar([int(fila) for fila in arbol.selection()])
+        return "break"
+
+    def refrescar_marcas():
+        """Dibuja las marcas cambiadas que se ven y avisa una sola vez del cambio"""
+        pintar_marcas(*arbol.yview())
+        actualizar_resumen()
+        actualizar_seleccion()
+
+    def marcar_visibles(marcar):
+        """Marca o desmarca de una vez todas las columnas que se ven"""
+        if lista.marcar_visibles(marcar):
+            refrescar_marcas()
 
-    # Agregar trace a la variable de salida
+    ttk.Button(
+        frame_acciones, text="Marcar visibles", command=lambda: marcar_visibles(True)
+    ).pack(side="left")
+    ttk.Button(
+        frame_acciones,
+        text="Desmarcar visibles",
+        command=lambda: marcar_visibles(False),
+    ).pack(side="left", padx=5)
+    etiqueta_resumen.pack(side="left", padx=5)
+
+    arbol.bind("<Button-1>", al_pulsar)
+    arbol.bind("<space>", al_pulsar_espacio)
+    busqueda_var.trace_add("write", programar_busqueda)
+    tipo_var.trace_add("write", mostrar_visibles)
+    actualizar_resumen()
+
+    # Salida: una sola columna
+    ttk.Label(frame_outputs, text="Selecciona la columna de salida:").pack(
+        anchor="w", pady=(0, 5)
+    )
+    ttk.Combobox(
+        frame_outputs,
+        textvariable=salida_var,
+        values=columns,
+        state="readonly",
+    ).pack(fill="x", pady=5)
     salida_var.trace_add("write", actualizar_seleccion)
 
-    # Llamar a la distribución cuando se cambie tamaño
-    frame_inputs.bind("<Configure>", lambda e: distribuir_checkboxes())
-    frame_outputs.bind("<Configure>", lambda e: distribuir_checkboxes())
+    # Relevancia de cada columna numérica para la salida elegida
+    ttk.Label(frame_outputs, text="Relevancia para la salida:").pack(
+        anchor="w", pady=(10, 5)
+    )
+    frame_ranking = ttk.Frame(frame_outputs)
+    frame_ranking.pack(fill="both", expand=True)
+    arbol_ranking = ttk.Treeview(
+        frame_ranking,
+        columns=("correlacion", "r2"),
+        height=FILAS_RANKING,
+        selectmode="none",
+    )
+    arbol_ranking.column("#0", width=160, stretch=True)
+    arbol_ranking.column("correlacion", width=90, stretch=False, anchor="e")
+    arbol_ranking.column("r2", width=70, stretch=False, anchor="e")
+    scroll_ranking = ttk.Scrollbar(
+        frame_ranking, orient="vertical", command=arbol_ranking.yview
+    )
+    arbol_ranking.configure(yscrollcommand=scroll_ranking.set)
+    arbol_ranking.pack(side="left", fill="both", expand=True)
+    scroll_ranking.pack(side="right", fill="y")
+
+    frame_mejores = ttk.Frame(frame_outputs)
+    frame_mejores.pack(fill="x", pady=(5, 0))
+    mejores_var = tk.IntVar(value=MEJORES_POR_DEFECTO)
+    etiqueta_ranking = ttk.Label(frame_outputs, text="", foreground="gray")
+    etiqueta_ranking.pack(anchor="w")
+
+    # Rankings de los datos del selector: la vista previa hasta que llegan los datos completos
+    rankings = CacheRanking(df)
+    # Ranking mostrado, orden de la tabla (columna del ranking, descendente) y si el ranking se
+    # calcula con todas las filas o con la vista previa
+    estado_ranking = {"ranking": None, "orden": ("r2", True), "completo": completo}
+
+    def mostrar_ranking():
+        """Rellena el ranking en el orden elegido; los valores sin definir van al final"""
+        ranking = estado_ranking["ranking"]
+        arbol_ranking.delete(*arbol_ranking.get_children())
+        if ranking is None:
+            return
+        clave, descendente = estado_ranking["orden"]
+        if clave == "columna":
+            ordenado = ranking.iloc[
+                sorted(
+                    range(len(ranking)),
+                    key=lambda i: str(ranking["columna"].iloc[i]).lower(),
+                    reverse=descendente,
+                )
+            ]
+        else:
+            ordenado = ranking.sort_values(
+                clave, ascending=not descendente, na_position="last", kind="stable"
+            )
+        for columna, correlacion, r2 in zip(
+            ordenado["columna"], ordenado["correlacion"], ordenado["r2"]
+        ):
+            arbol_ranking.insert(
+                "",
+                "end",
+                text=str(columna),
+                values=tuple("—" if pd.isna(v) else f"{v:.3f}" for v in (correlacion, r2)),
+            )
+
+    def ordenar_ranking(clave):
+        """Ordena el ranking por una de sus columnas; pulsarla otra vez invierte el orden"""
+        actual, descendente = estado_ranking["orden"]
+        if actual == clave:
+            estado_ranking["orden"] = (clave, not descendente)
+        else:
+            # Los valores se ordenan de mayor a menor y los nombres alfabéticamente
+            estado_ranking["orden"] = (clave, clave != "columna")
+        mostrar_ranking()
+
+    arbol_ranking.heading(
+        "#0", text="Columna", anchor="w", command=lambda: ordenar_ranking("columna")
+    )
+    arbol_ranking.heading(
+        "correlacion", text="Correlación", command=lambda: ordenar_ranking("correlacion")
+    )
+    arbol_ranking.heading("r2", text="R²", command=lambda: ordenar_ranking("r2"))
+
+    def actualizar_ranking(*args):
+        """Calcula (una vez por salida) la relevancia de las columnas y la muestra"""
+        salida = salida_var.get()
+        if not salida:
+            return
+        if salida not in columns or lista.tipos[columns.index(salida)] not in (
+            "Numérica",
+            "Booleana",
+        ):
+            estado_ranking["ranking"] = None
+            mostrar_ranking()
+            etiqueta_ranking.config(text="La salida no es numérica.")
+            return
+        etiqueta_ranking.config(text="Calculando relevancia...")
+        cache = rankings
+        try:
+            ranking = ejecutar_en_segundo_plano(
+                parent_frame.winfo_toplevel(), cache.ranking, salida
+            )
+        except Exception as e:
+            etiqueta_ranking.config(text=f"No se pudo calcular la relevancia: {e}")
+            return
+        if salida_var.get() != salida or cache is not rankings:
+            # La salida o los datos cambiaron mientras se calculaba: el cálculo nuevo lo muestra
+            return
+        estado_ranking["ranking"] = ranking
+        mostrar_ranking()
+        etiqueta_ranking.config(
+            text=resumen_ranking(ranking, len(cache.df), estado_ranking["completo"])
+        )
+
+    def marcar_mejores():
+        """Marca como entradas las columnas con mayor R² para la salida"""
+        ranking = estado_ranking["ranking"]
+        if ranking is None:
+            messagebox.showinfo("Relevancia", "Selecciona primero una salida numérica.")
+            return
+        try:
+            k = int(mejores_var.get())
+        except (tk.TclError, ValueError):
+            messagebox.showerror("Error", "Indica cuántas columnas marcar.")
+            return
+        mejores = ranking.dropna(subset=["r2"])["columna"].head(max(k, 0))
+        if lista.marcar_columnas(mejores):
+            refrescar_marcas()
+
+    ttk.Label(frame_mejores, text="Mejores:").pack(side="left")
+    ttk.Spinbox(
+        frame_mejores, from_=1, to=max(1, len(columns)), textvariable=mejores_var, width=5
+    ).pack(side="left", padx=5)
+    ttk.Button(frame_mejores, text="Marcar como entradas", command=marcar_mejores).pack(
+        side="left"
+    )
+    salida_var.trace_add("write", actualizar_ranking)
 
     # Botón confirmar
     ttk.Button(
         parent_frame, text="Confirmar y continuar", command=confirmar_seleccion
     ).pack(pady=15)
+
+    def usar_datos_completos(df_completo):
+        """Sustituye la vista previa por los datos completos al terminar la carga"""
+        nonlocal rankings
+        # Los tipos de la vista previa pueden no representar la columna entera
+        for i in lista.actualizar_tipos(tipo_columna(t) for t in df_completo.dtypes):
+            arbol.item(str(i), values=(lista.tipos[i],))
+        mostrar_visibles()
+        rankings = CacheRanking(df_completo)
+        estado_ranking["completo"] = True
+        actualizar_ranking()
+
+    return usar_datos_completos
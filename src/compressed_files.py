@@ -0,0 +1,168 @@
+import bz2
+import gzip
+import lzma
+import os
+import tempfile
+import zipfile
+from contextlib import contextmanager
+
+import dataset_cache
+from dataset_cache import huella_archivo, expulsar_entradas
+from cancellation import comprobar_cancelacion
+
+# Lectura transparente de archivos comprimidos (gzip, bz2, xz, zstd y zip)
+EXTENSIONES_COMPRESION = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+    ".zip": "zip",
+}
+
+# Firmas (magic bytes) de cada formato de compresión
+FIRMAS_COMPRESION = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+    (b"PK\x03\x04", "zip"),
+)
+
+# Formatos que pueden llegar comprimidos aunque la extensión no lo indique.
+# Excel (.xlsx) es internamente un zip y no debe detectarse por su firma.
+EXTENSIONES_DETECCION_FIRMA = (".csv", ".sqlite", ".db")
+
+# Tamaño de los trozos al descomprimir a disco
+BYTES_POR_TROZO = 4 * 1024 * 1024
+
+
+def detectar_compresion(ruta):
+    """Devuelve el formato de compresión del archivo (por extensión o firma) o None"""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension in EXTENSIONES_COMPRESION:
+        return EXTENSIONES_COMPRESION[extension]
+    if extension not in EXTENSIONES_DETECCION_FIRMA:
+        return None
+    with open(ruta, "rb") as f:
+        cabecera = f.read(6)
+    for firma, compresion in FIRMAS_COMPRESION:
+        if cabecera.startswith(firma):
+            return compresion
+    return None
+
+
+def _miembro_zip(archivo_zip):
+    """Elige el archivo de datos dentro de un zip (el primero con extensión conocida)"""
+    miembros = [m for m in archivo_zip.infolist() if not m.is_dir()]
+    if not miembros:
+        raise ValueError("El archivo zip está vacío.")
+    for miembro in miembros:
+        if os.path.splitext(miembro.filename)[1].lower() in (
+            EXTENSIONES_DETECCION_FIRMA
+        ):
+            return miembro
+    return miembros[0]
+
+
+def extension_datos(ruta):
+    """Devuelve la extensión del contenido, sin la de compresión (datos.csv.gz -> .csv)"""
+    base, extension = os.path.splitext(ruta)
+    extension = extension.lower()
+    if extension == ".zip":
+        with zipfile.ZipFile(ruta) as archivo_zip:
+            nombre = _miembro_zip(archivo_zip).filename
+        return os.path.splitext(nombre)[1].lower()
+    if extension in EXTENSIONES_COMPRESION:
+        return os.path.splitext(base)[1].lower()
+    return extension
+
+
+def _abrir_zstd(crudo):
+    """Crea un lector zstd con el módulo estándar (Python 3.14+) o con zstandard"""
+    try:
+        from compression import zstd
+
+        return zstd.ZstdFile(crudo)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError(
+            "Para leer archivos .zst es necesario instalar zstandard."
+        )
+    return zstandard.ZstdDecompressor().stream_reader(crudo)
+
+
+@contextmanager
+def abrir_descomprimido(ruta):
+    """Abre un archivo descomprimiéndolo al vuelo.
+
+    Devuelve el flujo de bytes descomprimido y el archivo comprimido subyacente, cuyo
+    tell() indica cuántos bytes comprimidos se han consumido (para informar del progreso).
+    """
+    compresion = detectar_compresion(ruta)
+    crudo = open(ruta, "rb")
+    flujo = crudo
+    archivo_zip = None
+    try:
+        if compresion == "gzip":
+            flujo = gzip.GzipFile(fileobj=crudo)
+        elif compresion == "bz2":
+            flujo = bz2.BZ2File(crudo)
+        elif compresion == "xz":
+            flujo = lzma.LZMAFile(crudo)
+        elif compresion == "zstd":
+            flujo = _abrir_zstd(crudo)
+        elif compresion == "zip":
+            archivo_zip = zipfile.ZipFile(crudo)
+            flujo = archivo_zip.open(_miembro_zip(archivo_zip))
+        yield flujo, crudo
+    finally:
+        if flujo is not crudo:
+            flujo.close()
+        if archivo_zip is not None:
+            archivo_zip.close()
+        crudo.close()
+
+
+def ruta_sqlite_descomprimida(
+    ruta, progress_callback=None, cancelacion=None, directorio=None
+):
+    """Devuelve una ruta a la base de datos SQLite lista para abrir.
+
+    SQLite necesita acceso aleatorio, así que una copia comprimida se descomprime una sola
+    vez a la caché en disco (por huella del archivo) y se reutiliza en las lecturas siguientes.
+    El progreso se informa sobre los bytes comprimidos leídos.
+    """
+    if detectar_compresion(ruta) is None:
+        return ruta
+    directorio = directorio or dataset_cache.DIRECTORIO_CACHE
+    destino = os.path.join(directorio, f"{huella_archivo(ruta)}.db")
+    if os.path.exists(destino):
+        # Marcar como usada recientemente para la expulsión LRU
+        os.utime(destino, None)
+        return destino
+
+    os.makedirs(directorio, exist_ok=True)
+    # Se hace sitio antes de escribir para no expulsar la copia recién creada
+    expulsar_entradas(directorio)
+    total = os.path.getsize(ruta)
+    descriptor, ruta_temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as salida:
+            with abrir_descomprimido(ruta) as (flujo, crudo):
+                while True:
+                    comprobar_cancelacion(cancelacion)
+                    trozo = flujo.read(BYTES_POR_TROZO)
+                    if not trozo:
+                        break
+                    salida.write(trozo)
+                    if progress_callback:
+                        progress_callback(crudo.tell(), total, None)
+        os.replace(ruta_temporal, destino)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+    return destino
@@ -1,7 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from sklearn.model_selection import train_test_split
 import random
+from dataset_loading import ejecutar_en_segundo_plano
+from out_of_core import DatosFueraDeMemoria
+from pipeline import DatosInsuficientes, separar_conjuntos
 
 # Variables globales
 train_df = None
@@ -15,7 +17,10 @@ def iniciar_separacion(
     callback=None,
     df_original=None,
 ):
-    """Separa los datos en conjuntos de entrenamiento y prueba según el porcentaje y semilla proporcionados"""
+    """Separa los datos en conjuntos de entrenamiento y prueba según el porcentaje y semilla proporcionados.
+
+    Con datos fuera de memoria la separación es un sorteo por fila que se aplica al recorrerlos.
+    """
 
     frame_inputs = ttk.Frame(frame_pasos_container)
     frame_inputs.pack(pady=5, padx=10)
@@ -99,11 +104,6 @@ def iniciar_separacion(
                 )
                 return
 
-            train_pct = float(train_pct_str)
-            if not (0 < train_pct < 100):
-                raise ValueError("El porcentaje debe estar entre 0 y 100.")
-
-            test_pct = 100 - train_pct
             seed = None
             msg_info = "Datos separados aleatoriamente."
 
@@ -118,22 +118,21 @@ def iniciar_separacion(
                     )
                     return
 
-            if len(df_procesado) < 5:
-                messagebox.showerror(
-                    "Error",
-                    "No hay suficientes datos para realizar la separación (mínimo 5 filas).",
+            if isinstance(df_procesado, DatosFueraDeMemoria):
+                # Contar los conjuntos recorre el almacén: se hace sin bloquear la interfaz
+                train_df, test_df, filas_train, filas_test = ejecutar_en_segundo_plano(
+                    frame_pasos_container, separar_conjuntos, df_procesado, train_pct_str, seed
+                )
+            else:
+                train_df, test_df, filas_train, filas_test = separar_conjuntos(
+                    df_procesado, train_pct_str, seed
                 )
-                return
-
-            train_df, test_df = train_test_split(
-                df_procesado, test_size=test_pct / 100, random_state=seed
-            )
 
             messagebox.showinfo(
                 "Separación Completada",
                 f"{msg_info}\n\n"
-                f"Conjunto de Entrenamiento: {len(train_df)} filas\n"
-                f"Conjunto de Test: {len(test_df)} filas",
+                f"Conjunto de Entrenamiento: {filas_train} filas\n"
+                f"Conjunto de Test: {filas_test} filas",
             )
 
             # Mantener el botón de separar para recalcular
@@ -168,6 +167,8 @@ def iniciar_separacion(
             if callback:
                 callback(train_df, test_df)
 
+        except DatosInsuficientes as e:
+            messagebox.showerror("Error", str(e))
         except ValueError as e:
             messagebox.showerror("Error", f"Entrada inválida: {e}")
 
@@ -0,0 +1,188 @@
+import itertools
+import sqlite3
+from collections import OrderedDict
+import pandas as pd
+from dataset_readers import identificador_sql
+
+# Fuentes de datos para la tabla de visualización: devuelven rangos de filas bajo demanda.
+# Cada fuente tiene una clave única con la que la tabla guarda en caché sus celdas formateadas.
+_claves = itertools.count()
+
+
+class FuenteDataFrame:
+    """Fuente de datos de la tabla basada en un DataFrame en memoria"""
+
+    def __init__(self, df):
+        self.df = df
+        self.clave = next(_claves)
+
+    @property
+    def columnas(self):
+        """Nombres de las columnas de la fuente"""
+        return list(self.df.columns)
+
+    def __len__(self):
+        return len(self.df)
+
+    def obtener_filas(self, inicio, fin):
+        """Devuelve las filas en el rango [inicio, fin) como DataFrame"""
+        return self.df.iloc[inicio:fin]
+
+    def cerrar(self):
+        """No hay recursos que liberar"""
+
+
+class FuenteSQLite:
+    """Fuente de datos paginada sobre una tabla SQLite.
+
+    Las páginas se leen con paginación por clave (rangos de rowid) según se necesitan y se
+    conservan en una pequeña caché LRU, de modo que la memoria no depende del tamaño de la tabla.
+    Se guarda la clave de cada página visitada para que los saltos no recorran la tabla desde el
+    principio.
+    """
+
+    def __init__(self, ruta, tabla, filas_por_pagina=200, paginas_en_cache=8):
+        self.tabla = tabla
+        self.clave = next(_claves)
+        self.filas_por_pagina = filas_por_pagina
+        self.paginas_en_cache = paginas_en_cache
+        self._conn = sqlite3.connect(ruta)
+        self._origen = identificador_sql(tabla)
+        cursor = self._conn.execute(f"SELECT * FROM {self._origen} LIMIT 0")
+        self._columnas = [d[0] for d in cursor.description]
+        self._num_filas, minimo, maximo = self._conn.execute(
+            f"SELECT COUNT(*), MIN(rowid), MAX(rowid) FROM {self._origen}"
+        ).fetchone()
+        # Con rowid consecutivos (tabla sin borrados) la clave de cada página se calcula
+        self._rowid_inicial = (
+            minimo if self._num_filas and maximo - minimo + 1 == self._num_filas else None
+        )
+        self._rowid_final = maximo
+        # Último rowid anterior a cada página conocida (clave de inicio de la página)
+        self._claves = {0: None}
+        self._paginas = OrderedDict()
+
+    @property
+    def columnas(self):
+        """Nombres de las columnas de la tabla"""
+        return list(self._columnas)
+
+    def __len__(self):
+        return self._num_filas
+
+    def _clave_inicio(self, pagina):
+        """Devuelve el rowid tras el que empieza la página indicada"""
+        if pagina in self._claves:
+            return self._claves[pagina]
+        if self._rowid_inicial is not None:
+            return self._rowid_inicial - 1 + pagina * self.filas_por_pagina
+        # Salto a una página no visitada: se parte de la clave conocida más cercana, por delante o
+        # por detrás (también del final de la tabla), y SQLite solo cuenta las filas que las
+        # separan; OFFSET sobre un rango de rowid es unas tres veces más rápido que agregar un LIMIT
+        objetivo = pagina * self.filas_por_pagina
+        inicios = [(p * self.filas_por_pagina, c) for p, c in self._claves.items()]
+        inicios.append((self._num_filas, self._rowid_final))
+        posicion, clave = min(inicios, key=lambda inicio: abs(inicio[0] - objetivo))
+        if posicion > objetivo:
+            consulta = f"SELECT rowid FROM {self._origen} WHERE rowid <= ? ORDER BY rowid DESC"
+            parametros = (clave, posicion - objetivo)
+        elif clave is None:
+            consulta = f"SELECT rowid FROM {self._origen} ORDER BY rowid"
+            parametros = (objetivo - 1,)
+        else:
+            consulta = f"SELECT rowid FROM {self._origen} WHERE rowid > ? ORDER BY rowid"
+            parametros = (clave, objetivo - 1 - posicion)
+        fila = self._conn.execute(consulta + " LIMIT 1 OFFSET ?", parametros).fetchone()
+        self._claves[pagina] = fila[0] if fila else None
+        return self._claves[pagina]
+
+    def obtener_pagina(self, pagina):
+        """Devuelve una página de filas como DataFrame, leyéndola de SQLite si no está en caché"""
+        if pagina in self._paginas:
+            self._paginas.move_to_end(pagina)
+            return self._paginas[pagina]
+
+        clave = self._clave_inicio(pagina)
+        condicion = "" if clave is None else "WHERE rowid > ?"
+        parametros = () if clave is None else (clave,)
+        cursor = self._conn.execute(
+            f"SELECT rowid, * FROM {self._origen} {condicion} "
+            f"ORDER BY rowid LIMIT {int(self.filas_por_pagina)}",
+            parametros,
+        )
+        filas = cursor.fetchall()
+        if filas:
+            self._claves[pagina + 1] = filas[-1][0]
+        df = pd.DataFrame(
+            [fila[1:] for fila in filas],
+            columns=self._columnas,
+            index=range(
+                pagina * self.filas_por_pagina,
+                pagina * self.filas_por_pagina + len(filas),
+            ),
+        )
+
+        self._paginas[pagina] = df
+        if len(self._paginas) > self.paginas_en_cache:
+            self._paginas.popitem(last=False)
+        return df
+
+    def obtener_filas(self, inicio, fin):
+        """Devuelve las filas en el rango [inicio, fin) como DataFrame"""
+        fin = min(fin, self._num_filas)
+        if inicio >= fin:
+            return pd.DataFrame(columns=self._columnas)
+        primera = inicio // self.filas_por_pagina
+        ultima = (fin - 1) // self.filas_por_pagina
+        paginas = [self.obtener_pagina(p) for p in range(primera, ultima + 1)]
+        return pd.concat(paginas).loc[inicio : fin - 1]
+
+    def cerrar(self):
+        """Cierra la conexión con la base de datos"""
+        self._conn.close()
+
+
+class FuenteVersion:
+    """Fuente de datos de la tabla sobre una versión derivada del dataset.
+
+    Solo se materializan las filas de cada página que se dibuja.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.clave = next(_claves)
+
+    @property
+    def columnas(self):
+        """Nombres de las columnas de la versión"""
+        return list(self.version.columnas)
+
+    def __len__(self):
+        return len(self.version)
+
+    def obtener_filas(self, inicio, fin):
+        """Devuelve las filas en el rango [inicio, fin) como DataFrame"""
+        return self.version.materializar_filas(inicio, fin)
+
+    def cerrar(self):
+        """No hay recursos que liberar"""
+
+
+def crear_fuente_sqlite(ruta, tabla, **kwargs):
+    """Crea una fuente paginada para la tabla o devuelve None si no admite paginación por rowid"""
+    try:
+        conn = sqlite3.connect(ruta)
+        try:
+            tipo = conn.execute(
+                "SELECT type FROM sqlite_master WHERE name = ?", (tabla,)
+            ).fetchone()
+            if tipo is None or tipo[0] != "table":
+                # Las vistas no tienen rowid estable
+                return None
+            # Las tablas WITHOUT ROWID fallan en esta consulta
+            conn.execute(f"SELECT rowid FROM {identificador_sql(tabla)} LIMIT 1")
+        finally:
+            conn.close()
+        return FuenteSQLite(ruta, tabla, **kwargs)
+    except sqlite3.Error:
+        return None
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import tempfile
+
+# Caché en disco de datasets ya parseados, en formato Feather (Arrow IPC)
+DIRECTORIO_CACHE = os.path.join(
+    os.path.expanduser("~"), ".cache", "regresion_lineal"
+)
+TAMANO_MAXIMO_CACHE = 5 * 1024**3
+BYTES_MUESTRA_HASH = 1024 * 1024
+
+
+def _pyarrow_disponible():
+    """Indica si pyarrow está instalado (sin él la caché queda desactivada)"""
+    try:
+        import pyarrow.feather  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def huella_archivo(file_path, variante=""):
+    """Calcula la huella de un archivo a partir de su ruta, tamaño, fecha de modificación y contenido.
+
+    El hash del contenido se calcula sobre muestras del inicio, el centro y el final del archivo
+    para no tener que leerlo entero en cada apertura. La variante distingue lecturas distintas
+    de un mismo archivo (por ejemplo, hojas de un libro Excel).
+    """
+    info = os.stat(file_path)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(os.path.abspath(file_path).encode("utf-8"))
+    h.update(f"{info.st_size}:{info.st_mtime_ns}:{variante}".encode("utf-8"))
+    with open(file_path, "rb") as f:
+        for posicion in (0, info.st_size // 2, info.st_size - BYTES_MUESTRA_HASH):
+            f.seek(max(0, posicion))
+            h.update(f.read(BYTES_MUESTRA_HASH))
+    return h.hexdigest()
+
+
+def _ruta_cache(huella, directorio):
+    """Devuelve la ruta del archivo de caché asociado a una huella"""
+    return os.path.join(directorio, f"{huella}.feather")
+
+
+def leer_cache(file_path, columnas=None, directorio=None, variante=""):
+    """Devuelve el DataFrame cacheado del archivo (con mapeo en memoria) o None si no está en caché"""
+    directorio = directorio or DIRECTORIO_CACHE
+    if not _pyarrow_disponible():
+        return None
+    ruta = _ruta_cache(huella_archivo(file_path, variante), directorio)
+    if not os.path.exists(ruta):
+        return None
+
+    import pyarrow.feather as feather
+
+    try:
+        # Con el mapeo en memoria leer la tabla entera no copia datos: solo lee su esquema
+        tabla = feather.read_table(ruta, memory_map=True)
+    except Exception:
+        # Entrada corrupta o incompatible: se descarta
+        _eliminar(ruta)
+        return None
+    if columnas is not None:
+        if not set(columnas) <= set(tabla.column_names):
+            # Columnas que la entrada no tiene: se lee el archivo, pero la entrada sigue siendo válida
+            return None
+        tabla = tabla.select(list(columnas))
+    # Marcar como usada recientemente para la expulsión LRU
+    os.utime(ruta, None)
+    return tabla.to_pandas(split_blocks=True)
+
+
+def guardar_cache(
+    file_path,
+    df,
+    directorio=None,
+    tamano_maximo=TAMANO_MAXIMO_CACHE,
+    variante="",
+):
+    """Guarda el DataFrame parseado en la caché y expulsa las entradas menos usadas si se supera el límite"""
+    directorio = directorio or DIRECTORIO_CACHE
+    if not _pyarrow_disponible():
+        return False
+
+    import pyarrow.feather as feather
+
+    os.makedirs(directorio, exist_ok=True)
+    ruta = _ruta_cache(huella_archivo(file_path, variante), directorio)
+    descriptor, ruta_temporal = tempfile.mkstemp(
+        dir=directorio, suffix=".tmp"
+    )
+    os.close(descriptor)
+    try:
+        # Sin compresión para poder mapear los buffers directamente al leer
+        feather.write_feather(
+            df.reset_index(drop=True), ruta_temporal, compression="uncompressed"
+        )
+        os.replace(ruta_temporal, ruta)
+    except Exception:
+        # Columnas con tipos no representables en Arrow: no se cachea
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        return False
+    expulsar_entradas(directorio, tamano_maximo)
+    return True
+
+
+def _entradas_cache(directorio):
+    """Lista las entradas de la caché como (ruta, tamaño, último uso)"""
+    if not os.path.isdir(directorio):
+        return []
+    entradas = []
+    for nombre in os.listdir(directorio):
+        # Datasets parseados y copias descomprimidas de bases de datos SQLite
+        if nombre.endswith((".feather", ".db")):
+            ruta = os.path.join(directorio, nombre)
+            try:
+                info = os.stat(ruta)
+            except OSError:
+                # Eliminada mientras tanto por otro proceso de lectura
+                continue
+            entradas.append((ruta, info.st_size, info.st_mtime))
+    return entradas
+
+
+def _eliminar(ruta):
+    """Elimina una entrada; puede fallar si el archivo sigue mapeado en memoria (Windows)"""
+    try:
+        os.remove(ruta)
+    except OSError:
+        return False
+    return True
+
+
+def expulsar_entradas(directorio=None, tamano_maximo=TAMANO_MAXIMO_CACHE):
+    """Elimina las entradas usadas hace más tiempo hasta que la caché no supere el tamaño máximo"""
+    directorio = directorio or DIRECTORIO_CACHE
+    entradas = sorted(_entradas_cache(directorio), key=lambda e: e[2])
+    total = sum(e[1] for e in entradas)
+    for ruta, tamano, _ in entradas:
+        if total <= tamano_maximo:
+            break
+        if _eliminar(ruta):
+            total -= tamano
+
+
+def tamano_cache(directorio=None):
+    """Devuelve el tamaño total de la caché en bytes"""
+    return sum(e[1] for e in _entradas_cache(directorio or DIRECTORIO_CACHE))
+
+
+def limpiar_cache(directorio=None):
+    """Vacía la caché y devuelve los bytes liberados"""
+    directorio = directorio or DIRECTORIO_CACHE
+    liberados = 0
+    for ruta, tamano, _ in _entradas_cache(directorio):
+        if _eliminar(ruta):
+            liberados += tamano
+    return liberados
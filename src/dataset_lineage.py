@@ -0,0 +1,262 @@
+import numpy as np
+import pandas as pd
+from column_cache import CacheColumnas, RegistroDataFrames
+from missing_index import indice_faltantes
+
+# Linaje de versiones de un dataset: cada paso del flujo deriva una versión ligera de la anterior
+# (columnas, filas y rellenos) que comparte los buffers del DataFrame cargado
+
+
+def _argsort(serie):
+    """Posiciones que ordenan una columna de forma estable, con los faltantes al final"""
+    if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in "biuf":
+        # numpy ya deja los NaN al final
+        return np.argsort(serie.to_numpy(), kind="stable")
+    serie = serie.reset_index(drop=True)
+    try:
+        ordenada = serie.sort_values(kind="stable", na_position="last")
+    except TypeError:
+        # Columnas de objetos con tipos mezclados: se ordenan por su texto
+        ordenada = serie.where(serie.isna(), serie.astype(str)).sort_values(
+            kind="stable", na_position="last"
+        )
+    return ordenada.index.to_numpy()
+
+
+def _orden_descendente(valores, ascendente, validas):
+    """Orden descendente estable a partir del ascendente, con los faltantes al final.
+
+    Se invierte el orden de los grupos de valores iguales pero no el de las filas de cada grupo,
+    que siguen en su orden original; valores son los de la columna y validas las filas sin faltar.
+    """
+    if not validas:
+        return ascendente
+    orden = ascendente[:validas]
+    ordenados = valores[orden]
+    inicios = np.flatnonzero(np.r_[True, ordenados[1:] != ordenados[:-1]])
+    longitudes = np.diff(np.r_[inicios, validas])[::-1]
+    inicios = inicios[::-1]
+    dentro = np.arange(validas) - np.repeat(np.cumsum(longitudes) - longitudes, longitudes)
+    return np.concatenate([orden[np.repeat(inicios, longitudes) + dentro], ascendente[validas:]])
+
+
+class OrdenesColumnas(CacheColumnas):
+    """Permutaciones de orden de las columnas de un DataFrame, por columna y sentido.
+
+    Se guardan por DataFrame, como el índice de faltantes, para que las versiones que se crean de
+    nuevo al cambiar los datos de la tabla las reutilicen. Cada permutación se vuelve a calcular
+    si cambian los valores de su columna (ver CacheColumnas).
+    """
+
+    def orden(self, columna, descendente=False):
+        """Posiciones de las filas ordenadas por una columna, con los faltantes al final"""
+        if not descendente:
+            return self._resultado(columna, _argsort)
+
+        def calcular(serie):
+            """Invierte los grupos del orden ascendente"""
+            validas = len(serie) - indice_faltantes(self.df).cuenta(columna)
+            return _orden_descendente(serie.to_numpy(), self.orden(columna), validas)
+
+        return self._resultado(columna, calcular, variante="descendente")
+
+
+_ordenes_columnas = RegistroDataFrames(OrdenesColumnas)
+
+
+def ordenes_columnas(df):
+    """Devuelve las permutaciones de orden de un DataFrame, creándolas la primera vez"""
+    return _ordenes_columnas.obtener(df)
+
+
+class VersionDataset:
+    """Versión de un dataset derivada de otra sin copiar sus datos.
+
+    Cada paso registra solo lo que cambia: el subconjunto de columnas, las posiciones de las filas
+    que se conservan y el valor con que se rellenan los faltantes de algunas columnas. Las columnas
+    se leen del DataFrame raíz, que nunca se modifica, y solo se copian las filas y columnas
+    afectadas al materializar la versión.
+    """
+
+    def __init__(
+        self,
+        raiz,
+        columnas=None,
+        filas=None,
+        rellenos=None,
+        padre=None,
+        paso="Carga",
+    ):
+        self.raiz = raiz
+        self.columnas = list(raiz.columns if columnas is None else columnas)
+        # Posiciones de las filas en la raíz, o None para conservarlas todas
+        self.filas = filas
+        self.rellenos = dict(rellenos or {})
+        self.padre = padre
+        self.paso = paso
+        self._materializada = None
+        # Permutaciones de orden ya calculadas por (columna, descendente)
+        self._ordenes = {}
+        # Faltantes por columna, calculados una vez con el índice de faltantes de la raíz
+        self._faltantes = None
+
+    def __len__(self):
+        return len(self.raiz) if self.filas is None else len(self.filas)
+
+    def _derivar(self, paso, columnas=None, filas=None, rellenos=None):
+        """Crea una versión hija que hereda lo que no se indica"""
+        return VersionDataset(
+            self.raiz,
+            self.columnas if columnas is None else columnas,
+            self.filas if filas is None else filas,
+            self.rellenos if rellenos is None else rellenos,
+            padre=self,
+            paso=paso,
+        )
+
+    def _posiciones(self, posiciones):
+        """Traduce posiciones de esta versión a posiciones de la raíz"""
+        posiciones = np.asarray(posiciones, dtype=np.intp)
+        return posiciones if self.filas is None else self.filas[posiciones]
+
+    def seleccionar(self, columnas, paso="Selección de columnas"):
+        """Deriva una versión con solo las columnas indicadas, en ese orden"""
+        return self._derivar(
+            paso,
+            columnas=columnas,
+            rellenos={c: v for c, v in self.rellenos.items() if c in columnas},
+        )
+
+    def filtrar(self, mascara, paso="Filtrado de filas"):
+        """Deriva una versión con las filas donde la máscara (sobre esta versión) es verdadera"""
+        return self._derivar(
+            paso, filas=self._posiciones(np.flatnonzero(np.asarray(mascara)))
+        )
+
+    def tomar(self, posiciones, paso="Subconjunto de filas"):
+        """Deriva una versión con las filas indicadas por posición, en ese orden"""
+        return self._derivar(paso, filas=self._posiciones(posiciones))
+
+    def rellenar(self, valores, paso="Relleno de faltantes"):
+        """Deriva una versión que rellena los faltantes de cada columna con el valor indicado"""
+        rellenos = {c: v for c, v in valores.items() if c in self.columnas}
+        # Un relleno anterior ya no deja faltantes en su columna: tiene prioridad
+        rellenos.update(self.rellenos)
+        return self._derivar(paso, rellenos=rellenos)
+
+    def _columna(self, nombre, filas):
+        """Lee una columna de la raíz en las filas dadas; solo se copia si hay filas o relleno"""
+        serie = self.raiz[nombre]
+        if filas is not None:
+            serie = serie.take(filas)
+        if nombre in self.rellenos:
+            serie = serie.fillna(self.rellenos[nombre])
+        return serie
+
+    def columna(self, nombre):
+        """Devuelve una columna de la versión como Series, con sus filas y su relleno"""
+        return self._columna(nombre, self.filas)
+
+    def _sin_faltantes(self, nombre):
+        """Indica si una columna no tiene faltantes en la versión (sin recorrerla)"""
+        if nombre in self.rellenos and not pd.isna(self.rellenos[nombre]):
+            return True
+        return indice_faltantes(self.raiz).cuenta(nombre) == 0
+
+    def _nulos(self, nombre):
+        """Máscara de faltantes de una columna en las filas de la versión, tras su relleno"""
+        if self._sin_faltantes(nombre):
+            return np.zeros(len(self), dtype=bool)
+        return indice_faltantes(self.raiz).mascara(nombre, self.filas)
+
+    def faltantes(self):
+        """Valores faltantes por columna (como df.isnull().sum()) sin materializar la versión.
+
+        Se leen del índice de faltantes de la raíz: la cuenta directamente si la versión tiene
+        todas las filas y, si no, de la máscara de las filas conservadas.
+        """
+        if self._faltantes is None:
+            indice = indice_faltantes(self.raiz)
+            self._faltantes = pd.Series(
+                [
+                    0 if self._sin_faltantes(c)
+                    else indice.cuenta(c) if self.filas is None
+                    else int(self._nulos(c).sum())
+                    for c in self.columnas
+                ],
+                index=self.columnas,
+                dtype="int64",
+            )
+        return self._faltantes.copy()
+
+    def filas_completas(self):
+        """Máscara de las filas sin faltantes una vez aplicados los rellenos"""
+        completas = np.ones(len(self), dtype=bool)
+        for col in self.columnas:
+            if not self._sin_faltantes(col):
+                completas &= ~self._nulos(col)
+        return completas
+
+    def orden(self, columna, descendente=False):
+        """Posiciones de las filas de la versión ordenadas por una columna, con los faltantes al final.
+
+        Los empates conservan el orden de las filas en ambos sentidos. Si la columna no tiene
+        relleno y las filas siguen el orden de la raíz, la permutación se obtiene de la del
+        DataFrame raíz (ver ordenes_columnas) sin volver a ordenar; si no, se calcula una vez por
+        columna y sentido y se guarda en la versión.
+        """
+        clave = (columna, descendente)
+        if clave not in self._ordenes:
+            filas = self.filas
+            if columna not in self.rellenos and filas is None:
+                self._ordenes[clave] = ordenes_columnas(self.raiz).orden(columna, descendente)
+            elif columna not in self.rellenos and np.all(filas[1:] > filas[:-1]):
+                # Se recorren las filas de la raíz ya ordenadas y se quedan las de la versión
+                posicion = np.full(len(self.raiz), -1, dtype=np.intp)
+                posicion[filas] = np.arange(len(filas))
+                orden = posicion[ordenes_columnas(self.raiz).orden(columna, descendente)]
+                self._ordenes[clave] = orden[orden >= 0]
+            elif descendente:
+                validas = len(self) - int(self._nulos(columna).sum())
+                self._ordenes[clave] = _orden_descendente(
+                    self.columna(columna).to_numpy(), self.orden(columna), validas
+                )
+            else:
+                self._ordenes[clave] = _argsort(self.columna(columna))
+        return self._ordenes[clave]
+
+    def _construir(self, filas):
+        """Construye un DataFrame con las filas dadas compartiendo las columnas sin cambios"""
+        # Sin columns=: el diccionario ya tiene su orden y con él pandas reserva copias temporales
+        return pd.DataFrame({c: self._columna(c, filas) for c in self.columnas}, copy=False)
+
+    def materializar(self):
+        """Devuelve la versión como DataFrame (se construye una sola vez; no se debe modificar)"""
+        if self._materializada is None:
+            self._materializada = self._construir(self.filas)
+        return self._materializada
+
+    def materializar_filas(self, inicio, fin):
+        """Devuelve solo las filas en el rango [inicio, fin) como DataFrame"""
+        if self._materializada is not None:
+            return self._materializada.iloc[inicio:fin]
+        return self._construir(self._posiciones(np.arange(inicio, min(fin, len(self)))))
+
+    def linaje(self):
+        """Nombres de los pasos desde la carga hasta esta versión"""
+        pasos = []
+        version = self
+        while version is not None:
+            pasos.append(version.paso)
+            version = version.padre
+        return pasos[::-1]
+
+
+def como_version(datos):
+    """Devuelve los datos como versión, creando la versión raíz si son un DataFrame"""
+    return datos if isinstance(datos, VersionDataset) else VersionDataset(datos)
+
+
+def materializar(datos):
+    """Materializa una versión como DataFrame; otros datos se devuelven tal cual"""
+    return datos.materializar() if isinstance(datos, VersionDataset) else datos
@@ -1,35 +1,40 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox
 import pandas as pd
 import sqlite3
 import threading
+from cancellation import OperacionCancelada, comprobar_cancelacion
+from compressed_files import (
+    detectar_compresion,
+    extension_datos,
+    ruta_sqlite_descomprimida,
+)
+from dataset_readers import (
+    cargar_vista_previa,
+    construir_consulta_sqlite,
+    expandir_patron,
+    leer_dataset,
+    listar_hojas_excel,
+    listar_tablas_sqlite,
+    optimizar_tipos,
+    texto_estadisticas_archivos,
+    texto_estadisticas_hojas,
+    texto_memoria,
+)
+from missing_index import indice_faltantes
+from type_profile import perfil_tipos
 
+# Carga de datasets desde la interfaz: diálogos, lectura en segundo plano y entrega de los datos
+# al hilo de Tk. La lectura en sí está en dataset_readers, que no depende de tkinter.
 
-def cargar_dataset(file_path):
-    """Carga un dataset desde un archivo CSV, Excel o SQLite y lo devuelve como un DataFrame de pandas"""
-    try:
-        if file_path.endswith(".csv"):
-            df = pd.read_csv(file_path)
-        elif file_path.endswith((".xls", ".xlsx")):
-            df = pd.read_excel(file_path)
-        elif file_path.endswith((".sqlite", ".db")):
-            conn = sqlite3.connect(file_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT name FROM sqlite_master WHERE type='table';"
-            )
-            tables = cursor.fetchall()
-            if not tables:
-                raise ValueError(
-                    "No se encontraron tablas en la base de datos SQLite."
-                )
-            table_name = tables[0][0]
-            df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
-            conn.close()
-        else:
-            raise ValueError("Formato de archivo no válido.")
-        return df
 
+def cargar_dataset(file_path, progress_callback=None, **opciones):
+    """Carga un dataset con leer_dataset y muestra los errores al usuario; devuelve None si falla"""
+    try:
+        return leer_dataset(file_path, progress_callback, **opciones)
+    except OperacionCancelada:
+        # No es un error: quien lanzó la carga restaura la interfaz
+        raise
     except FileNotFoundError:
         messagebox.showerror("Error", "Archivo no encontrado.")
     except pd.errors.EmptyDataError:
@@ -45,6 +50,326 @@ def cargar_dataset(file_path):
     return None
 
 
+def _cargar_para_interfaz(
+    ruta,
+    informar_progreso,
+    columnas=None,
+    compacto=False,
+    opciones=None,
+    cancelacion=None,
+):
+    """Carga el dataset en un hilo de trabajo y, si se pide, optimiza sus tipos.
+
+    Devuelve el DataFrame (o None) y un texto con el resumen de memoria y, para Excel,
+    el tiempo y la memoria de cada hoja (vacío si no hay nada que resumir).
+    Lanza OperacionCancelada si se cancela la carga.
+    """
+    df = cargar_dataset(
+        ruta,
+        informar_progreso,
+        columnas=columnas,
+        usar_cache=True,
+        cancelacion=cancelacion,
+        **(opciones or {}),
+    )
+    if df is None:
+        return df, ""
+    resumen = ""
+    estadisticas = df.attrs.pop("estadisticas_hojas", None)
+    if estadisticas:
+        resumen += " · " + texto_estadisticas_hojas(estadisticas)
+    estadisticas = df.attrs.pop("estadisticas_archivos", None)
+    if estadisticas:
+        resumen += " · " + texto_estadisticas_archivos(estadisticas)
+    if compacto:
+        comprobar_cancelacion(cancelacion)
+        df, memoria_antes, memoria_despues = optimizar_tipos(df)
+        resumen += " · " + texto_memoria(memoria_antes, memoria_despues)
+    # El perfil de tipos y el índice de faltantes se calculan aquí, en el hilo de carga, para que
+    # validar la selección de columnas y tratar los faltantes solo tengan que consultarlos
+    perfil_tipos(df).calcular(cancelacion)
+    indice_faltantes(df).calcular(cancelacion)
+    return df, resumen
+
+
+def pedir_origen_sqlite(ventana, ruta):
+    """Muestra un diálogo para elegir la tabla o vista de SQLite, o escribir una consulta propia.
+
+    Devuelve las opciones de lectura ({"tabla": ...} o {"consulta": ...}) o None si se cancela.
+    """
+    try:
+        objetos = listar_tablas_sqlite(ruta)
+    except sqlite3.Error:
+        messagebox.showerror(
+            "Error", "No se pudo leer la base de datos SQLite."
+        )
+        return None
+    if not objetos:
+        messagebox.showerror(
+            "Error", "No se encontraron tablas en la base de datos SQLite."
+        )
+        return None
+
+    dialogo = tk.Toplevel(ventana)
+    dialogo.title("Origen de datos SQLite")
+    dialogo.transient(ventana)
+    dialogo.grab_set()
+    resultado = [None]
+
+    frame = ttk.Frame(dialogo, padding=10)
+    frame.pack(fill="both", expand=True)
+
+    ttk.Label(frame, text="Tabla o vista:").grid(row=0, column=0, sticky="w")
+    tabla_var = tk.StringVar(value=objetos[0][0])
+    ttk.Combobox(
+        frame,
+        textvariable=tabla_var,
+        values=[nombre for nombre, _ in objetos],
+        state="readonly",
+        width=40,
+    ).grid(row=0, column=1, sticky="ew", pady=3)
+
+    ttk.Label(frame, text="Condición WHERE (opcional):").grid(
+        row=1, column=0, sticky="w"
+    )
+    entry_condicion = ttk.Entry(frame, width=40)
+    entry_condicion.grid(row=1, column=1, sticky="ew", pady=3)
+
+    ttk.Label(frame, text="Límite de filas (opcional):").grid(
+        row=2, column=0, sticky="w"
+    )
+    entry_limite = ttk.Entry(frame, width=10)
+    entry_limite.grid(row=2, column=1, sticky="w", pady=3)
+
+    ttk.Label(
+        frame, text="Consulta SQL propia (opcional, sustituye a lo anterior):"
+    ).grid(row=3, column=0, columnspan=2, sticky="w", pady=(10, 0))
+    txt_consulta = tk.Text(frame, height=4, width=60)
+    txt_consulta.grid(row=4, column=0, columnspan=2, sticky="ew", pady=3)
+
+    def aceptar():
+        """Valida la selección y construye las opciones de lectura"""
+        consulta = txt_consulta.get("1.0", tk.END).strip()
+        condicion = entry_condicion.get().strip()
+        limite = entry_limite.get().strip()
+        try:
+            limite = int(limite) if limite else None
+        except ValueError:
+            messagebox.showerror(
+                "Error", "El límite debe ser un número entero.", parent=dialogo
+            )
+            return
+
+        if consulta:
+            opciones = {"consulta": consulta}
+        elif condicion or limite is not None:
+            opciones = {
+                "consulta": construir_consulta_sqlite(
+                    tabla_var.get(), condicion=condicion, limite=limite
+                )
+            }
+        else:
+            opciones = {"tabla": tabla_var.get()}
+
+        # Comprobar la sintaxis sin ejecutar la consulta
+        conn = sqlite3.connect(ruta_sqlite_descomprimida(ruta))
+        try:
+            conn.execute("EXPLAIN " + construir_consulta_sqlite(**opciones))
+        except sqlite3.Error as e:
+            messagebox.showerror(
+                "Consulta no válida", str(e), parent=dialogo
+            )
+            return
+        finally:
+            conn.close()
+
+        resultado[0] = opciones
+        dialogo.destroy()
+
+    frame_botones = ttk.Frame(frame)
+    frame_botones.grid(row=5, column=0, columnspan=2, pady=(10, 0))
+    ttk.Button(frame_botones, text="Aceptar", command=aceptar).pack(
+        side="left", padx=5
+    )
+    ttk.Button(frame_botones, text="Cancelar", command=dialogo.destroy).pack(
+        side="left", padx=5
+    )
+
+    ventana.wait_window(dialogo)
+    return resultado[0]
+
+
+def pedir_hojas_excel(ventana, ruta):
+    """Muestra un diálogo para elegir la hoja del libro Excel, o varias hojas para concatenarlas.
+
+    Devuelve las opciones de lectura ({"hoja": ...} o {"hojas": [...]}) o None si se cancela.
+    Si el libro solo tiene una hoja no se pregunta.
+    """
+    try:
+        hojas = listar_hojas_excel(ruta)
+    except Exception:
+        messagebox.showerror("Error", "No se pudo leer el libro Excel.")
+        return None
+    if len(hojas) == 1:
+        return {"hoja": hojas[0]}
+
+    dialogo = tk.Toplevel(ventana)
+    dialogo.title("Hojas del libro Excel")
+    dialogo.transient(ventana)
+    dialogo.grab_set()
+    resultado = [None]
+
+    frame = ttk.Frame(dialogo, padding=10)
+    frame.pack(fill="both", expand=True)
+
+    ttk.Label(
+        frame,
+        text="Seleccione una hoja, o varias con las mismas columnas para unirlas:",
+    ).pack(anchor="w")
+    lista = tk.Listbox(
+        frame, selectmode="extended", height=min(len(hojas), 12), width=50
+    )
+    for nombre in hojas:
+        lista.insert(tk.END, nombre)
+    lista.selection_set(0)
+    lista.pack(fill="both", expand=True, pady=5)
+
+    def aceptar():
+        """Construye las opciones de lectura con las hojas seleccionadas"""
+        seleccion = [hojas[i] for i in lista.curselection()]
+        if not seleccion:
+            messagebox.showerror(
+                "Error", "Seleccione al menos una hoja.", parent=dialogo
+            )
+            return
+        if len(seleccion) == 1:
+            resultado[0] = {"hoja": seleccion[0]}
+        else:
+            resultado[0] = {"hojas": seleccion}
+        dialogo.destroy()
+
+    frame_botones = ttk.Frame(frame)
+    frame_botones.pack(pady=(10, 0))
+    ttk.Button(frame_botones, text="Aceptar", command=aceptar).pack(
+        side="left", padx=5
+    )
+    ttk.Button(frame_botones, text="Cancelar", command=dialogo.destroy).pack(
+        side="left", padx=5
+    )
+
+    ventana.wait_window(dialogo)
+    return resultado[0]
+
+
+def crear_informe_progreso(ventana, update_progress):
+    """Crea un callback de progreso que traslada los avances de lectura al hilo de la interfaz"""
+
+    def informar_progreso(bytes_leidos, bytes_totales, filas):
+        """Convierte bytes leídos y filas en un porcentaje y un texto de estado"""
+        if update_progress is None:
+            return
+        if bytes_totales is None:
+            # Origen sin tamaño conocido (consultas SQLite): solo filas
+            texto = f"Leídas {filas} filas"
+            ventana.after(0, lambda: update_progress(None, texto))
+            return
+        porcentaje = (
+            bytes_leidos / bytes_totales * 100 if bytes_totales else 100
+        )
+        texto = f"Leídos {bytes_leidos / 1e6:.1f} de {bytes_totales / 1e6:.1f} MB"
+        if filas is not None:
+            # Sin filas: descompresión previa de una base de datos SQLite
+            texto += f" · {filas} filas"
+        ventana.after(0, lambda: update_progress(porcentaje, texto))
+
+    return informar_progreso
+
+
+def ejecutar_en_segundo_plano(ventana, funcion, *args):
+    """Ejecuta una función en un hilo mientras la interfaz sigue atendiendo eventos y devuelve su resultado"""
+    terminado = tk.BooleanVar(master=ventana, value=False)
+    resultado = {}
+
+    def hilo():
+        """Hilo que ejecuta la función y avisa a la interfaz al terminar"""
+        try:
+            resultado["valor"] = funcion(*args)
+        except Exception as e:
+            resultado["error"] = e
+        ventana.after(0, lambda: terminado.set(True))
+
+    threading.Thread(target=hilo, daemon=True).start()
+    ventana.wait_variable(terminado)
+    if "error" in resultado:
+        raise resultado["error"]
+    return resultado["valor"]
+
+
+def _informar_cancelacion(stop_progress, update_progress, al_cancelar=None):
+    """Detiene el progreso, informa de la cancelación y restaura la interfaz si se indica cómo"""
+    if stop_progress:
+        stop_progress()
+    if update_progress:
+        update_progress(0, "Carga cancelada")
+    if al_cancelar:
+        al_cancelar()
+
+
+def cargar_columnas(
+    ruta,
+    columnas,
+    ventana,
+    al_terminar,
+    start_progress=None,
+    stop_progress=None,
+    update_progress=None,
+    compacto=False,
+    opciones=None,
+    cancelacion=None,
+):
+    """Materializa en segundo plano solo las columnas indicadas y entrega el resultado en el hilo de la interfaz.
+
+    Si se cancela, no se llama a al_terminar y la selección de columnas sigue como estaba.
+    """
+    if start_progress:
+        start_progress()
+    informar_progreso = crear_informe_progreso(ventana, update_progress)
+
+    def hilo_columnas():
+        """Hilo que lee únicamente las columnas seleccionadas"""
+        try:
+            df, resumen = _cargar_para_interfaz(
+                ruta,
+                informar_progreso,
+                columnas=columnas,
+                compacto=compacto,
+                opciones=opciones,
+                cancelacion=cancelacion,
+            )
+        except OperacionCancelada:
+            ventana.after(
+                0,
+                lambda: _informar_cancelacion(stop_progress, update_progress),
+            )
+            return
+
+        def fin():
+            """Entrega las columnas cargadas a la interfaz"""
+            if stop_progress:
+                stop_progress()
+            if df is not None and update_progress:
+                update_progress(
+                    0,
+                    f"Cargadas {len(df.columns)} columnas · {len(df)} filas"
+                    + resumen,
+                )
+            al_terminar(df)
+
+        ventana.after(0, fin)
+
+    threading.Thread(target=hilo_columnas, daemon=True).start()
+
+
 def abrir_archivo(
     entrada_texto,
     start_progress,
@@ -54,50 +379,191 @@ def abrir_archivo(
     ventana,
     set_dataframes,
     reset_callback=None,
+    update_progress=None,
+    diferir_carga=False,
+    compacto=False,
+    patron=None,
+    cancelacion=None,
+    al_cancelar=None,
 ):
-    """Abre un cuadro de diálogo para seleccionar un archivo de datos, lo carga y actualiza la interfaz"""
-    ruta = filedialog.askopenfilename(
-        title="Seleccionar archivo de datos",
-        filetypes=[
-            ("Archivos soportados", "*.csv *.xls *.xlsx *.sqlite *.db"),
-            ("Todos los archivos", "*.*"),
-        ],
-    )
-    if not ruta:
+    """Abre un diálogo para seleccionar uno o varios archivos de datos, los carga y actualiza la interfaz.
+
+    Con patron (glob) se cargan todos los archivos que coinciden, sin mostrar el diálogo.
+    Varios archivos se leen en paralelo y se concatenan tras comprobar que tienen las mismas columnas.
+    Con diferir_carga solo se lee la vista previa; las columnas elegidas se cargan después
+    con cargar_columnas. Con compacto se optimizan los tipos tras la carga.
+    Con un token de cancelación la carga se puede detener; entonces se llama a al_cancelar
+    para devolver la interfaz a su estado anterior.
+    Devuelve la ruta (la del primer archivo) y las opciones de lectura (tabla o consulta SQLite,
+    hojas Excel, lista de archivos), o (None, None) si se cancela.
+    """
+    if patron is None:
+        rutas = list(
+            filedialog.askopenfilenames(
+                title="Seleccionar archivos de datos",
+                filetypes=[
+                    (
+                        "Archivos soportados",
+                        "*.csv *.xls *.xlsx *.sqlite *.db *.parquet *.feather *.arrow *.ipc "
+                        "*.gz *.bz2 *.xz *.zst *.zip",
+                    ),
+                    ("Todos los archivos", "*.*"),
+                ],
+            )
+        )
+    else:
+        rutas = expandir_patron(patron)
+        if not rutas:
+            messagebox.showerror(
+                "Error", f"Ningún archivo de datos coincide con {patron}."
+            )
+            return None, None
+    if not rutas:
+        messagebox.showinfo(
+            "Carga cancelada", "La carga de archivo fue cancelada."
+        )
+        return None, None
+    ruta = rutas[0]
+
+    informar_progreso = crear_informe_progreso(ventana, update_progress)
+    try:
+        formato = extension_datos(ruta)
+    except Exception:
+        # Zip dañado: el error se notifica al intentar cargarlo
+        formato = None
+
+    opciones = {}
+    if formato in (".sqlite", ".db"):
+        if detectar_compresion(ruta):
+            # La elección de tabla necesita la base de datos descomprimida
+            start_progress()
+            try:
+                ejecutar_en_segundo_plano(
+                    ventana,
+                    ruta_sqlite_descomprimida,
+                    ruta,
+                    informar_progreso,
+                    cancelacion,
+                )
+            except OperacionCancelada:
+                if update_progress:
+                    update_progress(0, "Carga cancelada")
+                return None, None
+            except Exception as e:
+                messagebox.showerror(
+                    "Error", f"No se pudo descomprimir la base de datos:\n{e}"
+                )
+                return None, None
+            finally:
+                stop_progress()
+        opciones = pedir_origen_sqlite(ventana, ruta)
+    elif formato in (".xls", ".xlsx"):
+        opciones = pedir_hojas_excel(ventana, ruta)
+    if opciones is None:
         messagebox.showinfo(
             "Carga cancelada", "La carga de archivo fue cancelada."
         )
-        return
+        return None, None
+    if len(rutas) > 1:
+        # El origen elegido para el primer archivo se aplica a todos
+        opciones["archivos"] = rutas
 
     # Ejecutar reset solo después de confirmar que hay archivo seleccionado
     if reset_callback:
         reset_callback()
 
+    if patron is not None:
+        texto_ruta = patron
+    elif len(rutas) > 1:
+        texto_ruta = f"{ruta} (+{len(rutas) - 1} archivos)"
+    else:
+        texto_ruta = ruta
     entrada_texto.config(state="normal")
     entrada_texto.delete(0, tk.END)
-    entrada_texto.insert(0, ruta)
+    entrada_texto.insert(0, texto_ruta)
     entrada_texto.config(state="readonly", disabledforeground="black")
     start_progress()
 
+    vista_previa_mostrada = [False]
+
     def hilo_carga():
         """Hilo para cargar el dataset y actualizar la interfaz"""
-        df = cargar_dataset(ruta)
+        # Fase 1: cabecera y primeras filas para poder interactuar cuanto antes
+        df_previa = cargar_vista_previa(ruta, **opciones)
+        if df_previa is not None:
+
+            def mostrar_previa():
+                """Muestra la vista previa y permite empezar a elegir columnas"""
+                vista_previa_mostrada[0] = True
+                set_dataframes(df_previa, df_previa, completo=False)
+                mostrar_tabla(df_previa)
+                iniciar_flujo_paso_1(df_previa)
+
+            ventana.after(0, mostrar_previa)
+
+        if diferir_carga:
+
+            def fin_diferida():
+                """Termina la carga diferida: solo queda la vista previa"""
+                stop_progress()
+                if df_previa is None:
+                    set_dataframes(None, None)
+                    messagebox.showerror(
+                        "Error en carga", "No se pudo leer el archivo."
+                    )
+                elif update_progress:
+                    update_progress(
+                        0,
+                        "Vista previa cargada. Solo se leerán las columnas seleccionadas.",
+                    )
+
+            ventana.after(0, fin_diferida)
+            return
+
+        # Fase 2: carga completa en segundo plano
+        try:
+            comprobar_cancelacion(cancelacion)
+            df, resumen = _cargar_para_interfaz(
+                ruta,
+                informar_progreso,
+                compacto=compacto,
+                opciones=opciones,
+                cancelacion=cancelacion,
+            )
+        except OperacionCancelada:
+            # Los bloques leídos ya se han liberado al deshacer la pila
+            ventana.after(
+                0,
+                lambda: _informar_cancelacion(
+                    stop_progress, update_progress, al_cancelar
+                ),
+            )
+            return
 
         def fin():
             """Finaliza la carga del dataset y actualiza la interfaz"""
             stop_progress()
             if df is not None:
-                df_original = df.copy()
-                df_original_sin_filtrar = df.copy()
-                # Actualizar las variables globales en interface.py
-                set_dataframes(df_original, df_original_sin_filtrar)
-                mostrar_tabla(df_original)
+                # Nadie modifica los datos cargados: ambas referencias comparten el mismo DataFrame
+                # y cada paso deriva de él versiones ligeras (ver dataset_lineage)
+                set_dataframes(df, df)
+                mostrar_tabla(df)
+                if update_progress:
+                    update_progress(
+                        0, f"Carga completa: {len(df)} filas" + resumen
+                    )
+                if vista_previa_mostrada[0]:
+                    # El paso 1 ya está activo: solo se sustituyen los datos
+                    return
                 messagebox.showinfo(
                     "Datos cargados",
                     "Archivo cargado exitosamente. Iniciando flujo de preprocesamiento.",
                 )
-                iniciar_flujo_paso_1(df_original)
+                iniciar_flujo_paso_1(df)
             else:
+                if vista_previa_mostrada[0] and reset_callback:
+                    reset_callback()
+                set_dataframes(None, None)
                 messagebox.showerror(
                     "Error en carga", "No se pudo cargar el archivo."
                 )
@@ -105,3 +571,4 @@ def abrir_archivo(
         ventana.after(0, fin)
 
     threading.Thread(target=hilo_carga, daemon=True).start()
+    return ruta, opciones
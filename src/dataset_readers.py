@@ -0,0 +1,994 @@
+import pandas as pd
+import sqlite3
+import os
+import sys
+import glob
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from operator import itemgetter
+import numpy as np
+from openpyxl import load_workbook
+from dataset_cache import leer_cache, guardar_cache
+from cancellation import comprobar_cancelacion
+from compressed_files import (
+    abrir_descomprimido,
+    detectar_compresion,
+    extension_datos,
+    ruta_sqlite_descomprimida,
+)
+
+# Lectura de datasets sin interfaz gráfica: no importa tkinter, de modo que el flujo sin interfaz
+# (pipeline, entrenamiento por lotes) funciona donde Tk no está instalado. Los diálogos y la carga
+# desde la interfaz están en dataset_loading.
+
+# Filas que se leen en la vista previa mientras continúa la carga completa
+FILAS_VISTA_PREVIA = 200
+
+# Formatos de texto u hoja de cálculo cuyo parseo merece guardarse en caché
+EXTENSIONES_CACHEABLES = (".csv", ".xls", ".xlsx")
+
+# Formatos columnares que se leen con pyarrow (dependencia opcional)
+EXTENSIONES_COLUMNARES = (".parquet", ".feather", ".arrow", ".ipc")
+
+# Todos los formatos que se pueden abrir
+EXTENSIONES_SOPORTADAS = (
+    ".csv",
+    ".xls",
+    ".xlsx",
+    ".sqlite",
+    ".db",
+) + EXTENSIONES_COLUMNARES
+
+# Filas de Excel entre dos comprobaciones de cancelación
+FILAS_ENTRE_COMPROBACIONES = 5000
+
+# Volumen total a partir del cual compensa leer varios archivos en procesos separados
+BYTES_MINIMOS_PARALELO = 16 * 1024 * 1024
+
+# Tamaño aproximado (en bytes de texto) de cada bloque al leer CSV por partes
+BYTES_POR_BLOQUE = 32 * 1024 * 1024
+
+# Bloques de CSV que se unen en un trozo según se leen (ver leer_csv_por_bloques)
+BLOQUES_POR_TROZO = 8
+
+
+def _estimar_filas_por_bloque(file_path, bytes_por_bloque=BYTES_POR_BLOQUE):
+    """Estima cuántas filas caben en un bloque a partir de una muestra del inicio del archivo"""
+    with abrir_descomprimido(file_path) as (f, _):
+        muestra = f.read(64 * 1024)
+    lineas = muestra.count(b"\n")
+    if lineas == 0:
+        return 1000
+    bytes_por_fila = max(1, len(muestra) // lineas)
+    return max(1000, bytes_por_bloque // bytes_por_fila)
+
+
+def _concatenar_bloques(bloques):
+    """Une los bloques columna a columna, soltando cada columna de los bloques en cuanto se copia.
+
+    Vacía la lista recibida. La memoria de una columna se libera al copiarla si tiene su propio
+    array, como en el resultado de esta función; las columnas que read_csv agrupa en una matriz se
+    liberan al soltar el bloque. No se usa pop: quitar una columna de esa matriz copia las demás.
+    """
+    if len(bloques) == 1:
+        return bloques[0]
+    columnas = list(bloques[0].columns)
+    columnas_bloques = [{col: bloque[col] for col in columnas} for bloque in bloques]
+    bloques.clear()
+    datos = {}
+    for col in columnas:
+        partes = [columnas_bloque.pop(col) for columnas_bloque in columnas_bloques]
+        serie = pd.concat(partes, ignore_index=True)
+        # Un bloque sin valores puede llegar como object: recuperar el tipo común
+        if serie.dtype == object and len({p.dtype for p in partes}) > 1:
+            serie = serie.infer_objects()
+        datos[col] = serie
+        del partes
+    # Sin columns=: el diccionario ya tiene su orden y con él pandas reserva copias temporales
+    return pd.DataFrame(datos, copy=False)
+
+
+def iterar_csv_por_bloques(
+    file_path,
+    progress_callback=None,
+    filas_por_bloque=None,
+    columnas=None,
+    cancelacion=None,
+):
+    """Recorre un CSV en bloques de tamaño acotado e informa de los bytes leídos y las filas procesadas.
+
+    Los CSV comprimidos se descomprimen al vuelo y el progreso se mide sobre los bytes
+    comprimidos consumidos.
+    """
+    total_bytes = os.path.getsize(file_path)
+    if filas_por_bloque is None:
+        filas_por_bloque = _estimar_filas_por_bloque(file_path)
+
+    filas = 0
+    with abrir_descomprimido(file_path) as (flujo, crudo):
+        with pd.read_csv(
+            flujo, chunksize=filas_por_bloque, usecols=columnas
+        ) as lector:
+            for bloque in lector:
+                comprobar_cancelacion(cancelacion)
+                filas += len(bloque)
+                if progress_callback:
+                    progress_callback(crudo.tell(), total_bytes, filas)
+                yield bloque
+
+
+def leer_csv_por_bloques(
+    file_path,
+    progress_callback=None,
+    filas_por_bloque=None,
+    columnas=None,
+    cancelacion=None,
+):
+    """Lee un CSV en bloques de tamaño acotado (ver iterar_csv_por_bloques) y los concatena.
+
+    read_csv agrupa en cada bloque las columnas del mismo tipo en una sola matriz, que solo se
+    libera al soltar el bloque entero. Por eso los bloques se unen según llegan, cada
+    BLOQUES_POR_TROZO, en trozos con un array por columna, y al final se unen los trozos columna a
+    columna liberando cada una en cuanto se copia: no se llegan a tener todos los bloques y el
+    resultado en memoria a la vez.
+    """
+    trozos = []
+    pendientes = []
+    for bloque in iterar_csv_por_bloques(
+        file_path, progress_callback, filas_por_bloque, columnas, cancelacion
+    ):
+        pendientes.append(bloque)
+        if len(pendientes) == BLOQUES_POR_TROZO:
+            trozos.append(_concatenar_bloques(pendientes))
+            pendientes = []
+    if pendientes:
+        trozos.append(_concatenar_bloques(pendientes))
+    del pendientes
+    if not trozos:
+        # Solo cabecera: devolver un DataFrame vacío con sus columnas
+        with abrir_descomprimido(file_path) as (flujo, _):
+            return pd.read_csv(flujo, nrows=0, usecols=columnas)
+    return _concatenar_bloques(trozos)
+
+
+def _importar_pyarrow():
+    """Importa pyarrow o informa de que es necesario para los formatos columnares"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ValueError(
+            "Para leer archivos Parquet, Feather o Arrow es necesario instalar pyarrow."
+        )
+
+
+def leer_columnar(
+    file_path,
+    columnas=None,
+    n_filas=None,
+    progress_callback=None,
+    cancelacion=None,
+):
+    """Lee un archivo Parquet, Feather o Arrow IPC con mapeo en memoria.
+
+    Solo se leen las columnas indicadas y, si se pide un número de filas, únicamente los primeros
+    grupos de filas (Parquet) o lotes (Arrow) necesarios.
+    """
+    _importar_pyarrow()
+    import pyarrow as pa
+
+    if file_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        archivo = pq.ParquetFile(file_path, memory_map=True)
+        if n_filas is not None:
+            lotes = archivo.iter_batches(batch_size=max(1, n_filas), columns=columnas)
+            lote = next(lotes, None)
+            tabla = (
+                pa.Table.from_batches([lote])
+                if lote is not None
+                else archivo.schema_arrow.empty_table().select(
+                    columnas or archivo.schema_arrow.names
+                )
+            )
+        else:
+            metadatos = archivo.metadata
+            total_bytes = sum(
+                metadatos.row_group(i).total_byte_size
+                for i in range(metadatos.num_row_groups)
+            )
+            partes = []
+            bytes_leidos = 0
+            filas = 0
+            # Lectura por grupos de filas, descartando las columnas no pedidas
+            for i in range(metadatos.num_row_groups):
+                comprobar_cancelacion(cancelacion)
+                partes.append(archivo.read_row_group(i, columns=columnas))
+                bytes_leidos += metadatos.row_group(i).total_byte_size
+                filas += partes[-1].num_rows
+                if progress_callback:
+                    progress_callback(bytes_leidos, total_bytes, filas)
+            tabla = (
+                pa.concat_tables(partes)
+                if partes
+                else archivo.schema_arrow.empty_table().select(
+                    columnas or archivo.schema_arrow.names
+                )
+            )
+    else:
+        import pyarrow.feather as feather
+
+        # Feather v2 y Arrow IPC comparten formato: el mapeo evita copiar los buffers
+        tabla = feather.read_table(file_path, columns=columnas, memory_map=True)
+        if n_filas is not None:
+            tabla = tabla.slice(0, n_filas)
+        elif progress_callback:
+            tamano = os.path.getsize(file_path)
+            progress_callback(tamano, tamano, tabla.num_rows)
+
+    # split_blocks evita consolidar columnas y permite conversiones sin copia
+    return tabla.to_pandas(split_blocks=True)
+
+
+def listar_hojas_excel(file_path):
+    """Devuelve los nombres de las hojas de un libro Excel sin cargar su contenido"""
+    if file_path.endswith(".xlsx"):
+        libro = load_workbook(file_path, read_only=True)
+        try:
+            return list(libro.sheetnames)
+        finally:
+            libro.close()
+    with pd.ExcelFile(file_path) as libro:
+        return list(libro.sheet_names)
+
+
+def _nombres_columnas_excel(cabecera):
+    """Nombra las columnas como pandas: celdas vacías como "Unnamed: i" y duplicados con sufijo"""
+    nombres = []
+    vistos = {}
+    for i, valor in enumerate(cabecera):
+        nombre = f"Unnamed: {i}" if valor is None else valor
+        if nombre in vistos:
+            vistos[nombre] += 1
+            nombre = f"{nombre}.{vistos[nombre]}"
+        else:
+            vistos[nombre] = 0
+        nombres.append(nombre)
+    return nombres
+
+
+def leer_hoja_excel(
+    file_path,
+    hoja=None,
+    columnas=None,
+    n_filas=None,
+    progress_callback=None,
+    filas_por_bloque=50000,
+    cancelacion=None,
+):
+    """Lee una hoja de Excel en modo de solo lectura, recorriendo los valores sin crear objetos de celda.
+
+    Sin hoja se lee la primera. Los .xls antiguos no admiten este modo y se leen con pandas.
+    """
+    if not file_path.endswith(".xlsx"):
+        return pd.read_excel(
+            file_path, sheet_name=hoja or 0, usecols=columnas, nrows=n_filas
+        )
+
+    libro = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        hoja_excel = libro[hoja] if hoja is not None else libro.worksheets[0]
+        cabecera = next(
+            hoja_excel.iter_rows(max_row=1, values_only=True), None
+        )
+        if cabecera is None:
+            return pd.DataFrame()
+        nombres = _nombres_columnas_excel(cabecera)
+
+        if columnas is None:
+            seleccion = nombres
+            extraer = None
+        else:
+            faltan = [c for c in columnas if c not in nombres]
+            if faltan:
+                raise ValueError(
+                    f"Columnas no encontradas en la hoja: {', '.join(map(str, faltan))}"
+                )
+            indices = [nombres.index(c) for c in columnas]
+            seleccion = [nombres[i] for i in indices]
+            if len(indices) == 1:
+                extraer = lambda fila: (fila[indices[0]],)  # noqa: E731
+            else:
+                extraer = itemgetter(*indices)
+        fila_vacia = (None,) * len(seleccion)
+
+        bloques = []
+        bloque = []
+        filas = 0
+        vacias_pendientes = 0
+        # max_col rellena las filas cortas hasta el ancho de la cabecera
+        for fila in hoja_excel.iter_rows(
+            min_row=2, max_col=len(nombres), values_only=True
+        ):
+            if fila.count(None) == len(fila):
+                # Las filas en blanco solo se conservan si hay datos después
+                vacias_pendientes += 1
+                continue
+            if vacias_pendientes:
+                bloque.extend([fila_vacia] * vacias_pendientes)
+                vacias_pendientes = 0
+            bloque.append(fila if extraer is None else extraer(fila))
+            if n_filas is not None and filas + len(bloque) >= n_filas:
+                break
+            if len(bloque) % FILAS_ENTRE_COMPROBACIONES == 0:
+                comprobar_cancelacion(cancelacion)
+            if len(bloque) >= filas_por_bloque:
+                bloques.append(pd.DataFrame.from_records(bloque, columns=seleccion))
+                filas += len(bloque)
+                bloque = []
+                if progress_callback:
+                    # El número de filas de la hoja no es fiable en modo de solo lectura
+                    progress_callback(None, None, filas)
+    finally:
+        libro.close()
+
+    if bloque or not bloques:
+        bloques.append(pd.DataFrame.from_records(bloque, columns=seleccion))
+    df = _concatenar_bloques(bloques)
+    if n_filas is not None:
+        df = df.iloc[:n_filas]
+    if progress_callback:
+        progress_callback(None, None, len(df))
+    return df
+
+
+def _pico_memoria_proceso():
+    """Devuelve el pico de memoria residente del proceso en bytes, o None si no se puede medir"""
+    try:
+        import resource
+    except ImportError:
+        # Windows no dispone del módulo resource
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo expresa en KiB y macOS en bytes
+    return pico if sys.platform == "darwin" else pico * 1024
+
+
+def _leer_hoja_medida(
+    file_path, hoja, columnas=None, progress_callback=None, cancelacion=None
+):
+    """Lee una hoja y devuelve el DataFrame, el tiempo empleado y cuánto subió el pico de memoria.
+
+    ru_maxrss es el pico de toda la vida del proceso (que en el pool lee varias hojas): se resta el
+    pico anterior a la hoja, así que una hoja que no supera el pico de las anteriores suma 0.
+    """
+    pico_anterior = _pico_memoria_proceso()
+    inicio = time.perf_counter()
+    df = leer_hoja_excel(
+        file_path,
+        hoja,
+        columnas,
+        progress_callback=progress_callback,
+        cancelacion=cancelacion,
+    )
+    segundos = time.perf_counter() - inicio
+    if pico_anterior is None:
+        return df, segundos, None
+    return df, segundos, _pico_memoria_proceso() - pico_anterior
+
+
+def _ejecutar_en_procesos(funcion, tareas, al_terminar, cancelacion=None):
+    """Ejecuta funcion(*args) para cada tarea (clave, args) en un pool de procesos.
+
+    Llama a al_terminar(clave, resultado) según terminan las tareas. Si se cancela o falla
+    alguna, se descartan las pendientes sin esperar a las que siguen en curso.
+    """
+    # spawn evita heredar el estado de Tk y de los hilos de la interfaz
+    pool = ProcessPoolExecutor(
+        max_workers=min(len(tareas), os.cpu_count() or 1),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    try:
+        pendientes = {
+            pool.submit(funcion, *args): clave for clave, args in tareas
+        }
+        while pendientes:
+            hechos, _ = wait(
+                pendientes, timeout=0.2, return_when=FIRST_COMPLETED
+            )
+            for futuro in hechos:
+                al_terminar(pendientes.pop(futuro), futuro.result())
+            comprobar_cancelacion(cancelacion)
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+
+def leer_hojas_excel(
+    file_path,
+    hojas,
+    columnas=None,
+    progress_callback=None,
+    en_paralelo=True,
+    cancelacion=None,
+):
+    """Lee varias hojas con las mismas columnas y las concatena en un único DataFrame.
+
+    Con en_paralelo, cada hoja se parsea en un proceso distinto. Devuelve el DataFrame y una
+    lista de estadísticas por hoja: (hoja, segundos, filas, bytes del DataFrame, aumento del pico
+    de memoria del proceso al leerla).
+    """
+    resultados = {}
+    filas = 0
+
+    def registrar(hoja, resultado):
+        """Guarda el resultado de una hoja e informa del avance"""
+        nonlocal filas
+        resultados[hoja] = resultado
+        filas += len(resultado[0])
+        if progress_callback:
+            progress_callback(None, None, filas)
+
+    if en_paralelo and len(hojas) > 1:
+        _ejecutar_en_procesos(
+            _leer_hoja_medida,
+            [(hoja, (file_path, hoja, columnas)) for hoja in hojas],
+            registrar,
+            cancelacion,
+        )
+    else:
+        # Con una sola hoja se informa también del avance dentro de ella
+        progreso_hoja = progress_callback if len(hojas) == 1 else None
+        for hoja in hojas:
+            comprobar_cancelacion(cancelacion)
+            registrar(
+                hoja,
+                _leer_hoja_medida(
+                    file_path, hoja, columnas, progreso_hoja, cancelacion
+                ),
+            )
+
+    columnas_comunes = list(resultados[hojas[0]][0].columns)
+    estadisticas = []
+    bloques = []
+    for hoja in hojas:
+        df, segundos, pico = resultados.pop(hoja)
+        if set(df.columns) != set(columnas_comunes):
+            raise ValueError(
+                f"La hoja '{hoja}' no tiene las mismas columnas que '{hojas[0]}'."
+            )
+        estadisticas.append(
+            (
+                hoja,
+                segundos,
+                len(df),
+                int(df.memory_usage(deep=True).sum()),
+                pico,
+            )
+        )
+        bloques.append(df[columnas_comunes])
+    return _concatenar_bloques(bloques), estadisticas
+
+
+def texto_estadisticas_hojas(estadisticas):
+    """Formatea el tiempo de carga y la memoria de cada hoja para el área de estado"""
+    partes = []
+    for hoja, segundos, filas, memoria, pico in estadisticas:
+        nombre = "Primera hoja" if hoja is None else hoja
+        texto = f"{nombre}: {filas} filas en {segundos:.1f} s, {memoria / 1e6:.1f} MB"
+        if pico is not None:
+            texto += f" (pico del proceso +{pico / 1e6:.0f} MB)"
+        partes.append(texto)
+    return " · ".join(partes)
+
+
+def identificador_sql(nombre):
+    """Escapa un nombre de tabla o columna para usarlo en una consulta SQLite"""
+    return '"' + str(nombre).replace('"', '""') + '"'
+
+
+def _lista_columnas_sql(columnas=None):
+    """Construye la lista de columnas de un SELECT (todas si no se indica ninguna)"""
+    if not columnas:
+        return "*"
+    return ", ".join(identificador_sql(c) for c in columnas)
+
+
+def _primera_tabla_sqlite(conn):
+    """Devuelve el nombre de la primera tabla de la base de datos o None si no hay ninguna"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+    tables = cursor.fetchall()
+    return tables[0][0] if tables else None
+
+
+def listar_tablas_sqlite(file_path):
+    """Devuelve las tablas y vistas de una base de datos SQLite como pares (nombre, tipo)"""
+    conn = sqlite3.connect(ruta_sqlite_descomprimida(file_path))
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT name, type FROM sqlite_master "
+            "WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' "
+            "ORDER BY type, name;"
+        )
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def construir_consulta_sqlite(
+    tabla=None, consulta=None, columnas=None, condicion=None, limite=None
+):
+    """Construye el SELECT que se ejecuta en SQLite, de forma que proyección, filtro y límite
+    se resuelven en la propia base de datos y no en pandas"""
+    if consulta:
+        origen = f"({consulta.strip().rstrip(';')})"
+    else:
+        origen = identificador_sql(tabla)
+    sql = f"SELECT {_lista_columnas_sql(columnas)} FROM {origen}"
+    if condicion:
+        sql += f" WHERE {condicion}"
+    if limite is not None:
+        sql += f" LIMIT {int(limite)}"
+    return sql
+
+
+def iterar_sqlite(
+    file_path,
+    tabla=None,
+    consulta=None,
+    columnas=None,
+    limite=None,
+    progress_callback=None,
+    filas_por_bloque=50000,
+    cancelacion=None,
+):
+    """Ejecuta la consulta en SQLite y recorre los resultados por bloques (chunksize).
+
+    Sin tabla ni consulta se usa la primera tabla de la base de datos. Una copia comprimida
+    se descomprime antes a la caché en disco.
+    """
+    conn = sqlite3.connect(
+        ruta_sqlite_descomprimida(file_path, progress_callback, cancelacion)
+    )
+    try:
+        if tabla is None and consulta is None:
+            tabla = _primera_tabla_sqlite(conn)
+            if tabla is None:
+                raise ValueError(
+                    "No se encontraron tablas en la base de datos SQLite."
+                )
+        sql = construir_consulta_sqlite(
+            tabla, consulta, columnas, limite=limite
+        )
+        filas = 0
+        for bloque in pd.read_sql_query(sql, conn, chunksize=filas_por_bloque):
+            comprobar_cancelacion(cancelacion)
+            filas += len(bloque)
+            if progress_callback:
+                # El total de filas no se conoce sin recorrer la consulta
+                progress_callback(None, None, filas)
+            yield bloque
+    finally:
+        conn.close()
+
+
+def leer_sqlite(
+    file_path,
+    tabla=None,
+    consulta=None,
+    columnas=None,
+    limite=None,
+    progress_callback=None,
+    filas_por_bloque=50000,
+    cancelacion=None,
+):
+    """Lee el resultado de la consulta en SQLite por bloques (ver iterar_sqlite) y los concatena"""
+    return _concatenar_bloques(
+        list(
+            iterar_sqlite(
+                file_path,
+                tabla,
+                consulta,
+                columnas,
+                limite,
+                progress_callback,
+                filas_por_bloque,
+                cancelacion,
+            )
+        )
+    )
+
+
+def _iterar_columnar(
+    file_path, columnas=None, progress_callback=None, cancelacion=None
+):
+    """Recorre un archivo Parquet por grupos de filas, o uno Feather o Arrow mapeado por lotes"""
+    _importar_pyarrow()
+    import pyarrow as pa
+
+    if file_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        archivo = pq.ParquetFile(file_path, memory_map=True)
+        metadatos = archivo.metadata
+        tamanos = [
+            metadatos.row_group(i).total_byte_size
+            for i in range(metadatos.num_row_groups)
+        ]
+        partes = (
+            archivo.read_row_group(i, columns=columnas)
+            for i in range(metadatos.num_row_groups)
+        )
+    else:
+        import pyarrow.feather as feather
+
+        tabla = feather.read_table(file_path, columns=columnas, memory_map=True)
+        lotes = tabla.to_batches()
+        # Los lotes no indican su tamaño en disco: se reparte el del archivo por filas
+        tamano = os.path.getsize(file_path)
+        tamanos = [
+            tamano * lote.num_rows // max(1, tabla.num_rows) for lote in lotes
+        ]
+        partes = (pa.Table.from_batches([lote]) for lote in lotes)
+
+    total_bytes = sum(tamanos)
+    bytes_leidos = 0
+    filas = 0
+    for parte, tamano_parte in zip(partes, tamanos):
+        comprobar_cancelacion(cancelacion)
+        bytes_leidos += tamano_parte
+        filas += parte.num_rows
+        if progress_callback:
+            progress_callback(bytes_leidos, total_bytes, filas)
+        yield parte.to_pandas(split_blocks=True)
+
+
+def iterar_dataset(
+    file_path,
+    columnas=None,
+    progress_callback=None,
+    cancelacion=None,
+    tabla=None,
+    consulta=None,
+    hoja=None,
+    hojas=None,
+    archivos=None,
+):
+    """Recorre el dataset por bloques de filas sin llegar a materializarlo entero.
+
+    CSV, SQLite y Parquet se leen por bloques y Feather o Arrow por lotes del archivo mapeado.
+    Un libro Excel, que siempre cabe en memoria, se entrega como un único bloque.
+    Con archivos se recorren uno tras otro (file_path es el primero de ellos).
+    """
+    if archivos:
+        for ruta in archivos:
+            yield from iterar_dataset(
+                ruta,
+                columnas,
+                progress_callback,
+                cancelacion,
+                tabla=tabla,
+                consulta=consulta,
+                hoja=hoja,
+                hojas=hojas,
+            )
+        return
+
+    formato = extension_datos(file_path)
+    if detectar_compresion(file_path) and formato not in (
+        ".csv",
+        ".sqlite",
+        ".db",
+    ):
+        raise ValueError("Solo se admiten archivos CSV y SQLite comprimidos.")
+    if formato == ".csv":
+        yield from iterar_csv_por_bloques(
+            file_path, progress_callback, columnas=columnas, cancelacion=cancelacion
+        )
+    elif formato in (".sqlite", ".db"):
+        yield from iterar_sqlite(
+            file_path,
+            tabla,
+            consulta,
+            columnas,
+            progress_callback=progress_callback,
+            cancelacion=cancelacion,
+        )
+    elif formato in EXTENSIONES_COLUMNARES:
+        yield from _iterar_columnar(
+            file_path, columnas, progress_callback, cancelacion
+        )
+    elif formato in (".xls", ".xlsx"):
+        yield leer_dataset(
+            file_path,
+            progress_callback,
+            columnas,
+            hoja=hoja,
+            hojas=hojas,
+            cancelacion=cancelacion,
+        )
+    else:
+        raise ValueError("Formato de archivo no válido.")
+
+
+def leer_dataset(
+    file_path,
+    progress_callback=None,
+    columnas=None,
+    usar_cache=False,
+    tabla=None,
+    consulta=None,
+    hoja=None,
+    hojas=None,
+    archivos=None,
+    cancelacion=None,
+):
+    """Lee un dataset desde un archivo CSV, Excel, SQLite, Parquet o Arrow y lo devuelve como un DataFrame.
+
+    Si se indican columnas, solo se materializan esas (usecols o lista explícita en el SELECT).
+    Con usar_cache, los CSV y Excel ya parseados se recuperan de la caché en disco.
+    Para SQLite se puede indicar la tabla o vista, o una consulta propia.
+    Para Excel se puede indicar la hoja, o varias hojas que se concatenan; el tiempo y la
+    memoria de cada hoja quedan en df.attrs["estadisticas_hojas"].
+    Con archivos se leen y concatenan varios archivos (file_path es el primero de ellos).
+    Los CSV y SQLite comprimidos (gzip, bz2, xz, zstd o zip) se descomprimen al leerlos.
+    Con un token de cancelación, la lectura se detiene entre bloques si se cancela.
+    Los errores se propagan como excepciones.
+    """
+    if archivos:
+        df, estadisticas = leer_archivos(
+            archivos,
+            columnas,
+            progress_callback,
+            usar_cache=usar_cache,
+            cancelacion=cancelacion,
+            tabla=tabla,
+            consulta=consulta,
+            hoja=hoja,
+            hojas=hojas,
+        )
+        df.attrs["estadisticas_archivos"] = estadisticas
+        return df
+
+    formato = extension_datos(file_path)
+    if detectar_compresion(file_path) and formato not in (
+        ".csv",
+        ".sqlite",
+        ".db",
+    ):
+        raise ValueError("Solo se admiten archivos CSV y SQLite comprimidos.")
+    cacheable = usar_cache and formato in EXTENSIONES_CACHEABLES
+    # Cada hoja (o combinación de hojas) de un libro tiene su propia entrada en caché
+    variante = str(hojas or hoja or "")
+    if cacheable:
+        df = leer_cache(file_path, columnas, variante=variante)
+        if df is not None:
+            if progress_callback:
+                tamano = os.path.getsize(file_path)
+                progress_callback(tamano, tamano, len(df))
+            return df
+
+    if formato == ".csv":
+        df = leer_csv_por_bloques(
+            file_path,
+            progress_callback,
+            columnas=columnas,
+            cancelacion=cancelacion,
+        )
+    elif formato in (".xls", ".xlsx"):
+        df, estadisticas = leer_hojas_excel(
+            file_path,
+            hojas or [hoja],
+            columnas,
+            progress_callback,
+            cancelacion=cancelacion,
+        )
+    elif formato in EXTENSIONES_COLUMNARES:
+        df = leer_columnar(
+            file_path,
+            columnas,
+            progress_callback=progress_callback,
+            cancelacion=cancelacion,
+        )
+    elif formato in (".sqlite", ".db"):
+        df = leer_sqlite(
+            file_path,
+            tabla,
+            consulta,
+            columnas,
+            progress_callback=progress_callback,
+            cancelacion=cancelacion,
+        )
+    else:
+        raise ValueError("Formato de archivo no válido.")
+
+    # Solo se cachean cargas completas para poder proyectar columnas después
+    if cacheable and columnas is None:
+        guardar_cache(file_path, df, variante=variante)
+    if formato in (".xls", ".xlsx"):
+        df.attrs["estadisticas_hojas"] = estadisticas
+    return df
+
+
+def expandir_patron(patron):
+    """Devuelve, ordenados, los archivos de datos que coinciden con un patrón glob"""
+    return sorted(
+        ruta
+        for ruta in glob.glob(os.path.expanduser(patron))
+        if os.path.isfile(ruta) and extension_datos(ruta) in EXTENSIONES_SOPORTADAS
+    )
+
+
+def _leer_archivo_medido(
+    ruta, columnas=None, usar_cache=False, opciones=None, cancelacion=None
+):
+    """Lee un archivo del conjunto y devuelve el DataFrame y el tiempo empleado"""
+    inicio = time.perf_counter()
+    df = leer_dataset(
+        ruta,
+        columnas=columnas,
+        usar_cache=usar_cache,
+        cancelacion=cancelacion,
+        **(opciones or {}),
+    )
+    df.attrs.clear()
+    return df, time.perf_counter() - inicio
+
+
+def leer_archivos(
+    rutas,
+    columnas=None,
+    progress_callback=None,
+    usar_cache=False,
+    en_paralelo=None,
+    cancelacion=None,
+    **opciones,
+):
+    """Lee varios archivos con las mismas columnas (p. ej. particiones diarias) y los concatena.
+
+    Con en_paralelo cada archivo se parsea en un proceso del pool; por defecto solo se usa
+    el pool si el volumen total compensa el coste de arrancar los procesos. El progreso se
+    informa al terminar cada archivo. Devuelve el DataFrame y una lista de estadísticas por
+    archivo: (ruta, segundos, filas).
+    """
+    tamanos = {ruta: os.path.getsize(ruta) for ruta in rutas}
+    bytes_totales = sum(tamanos.values())
+    if en_paralelo is None:
+        en_paralelo = bytes_totales >= BYTES_MINIMOS_PARALELO
+    en_paralelo = en_paralelo and len(rutas) > 1
+
+    resultados = {}
+    bytes_leidos = 0
+    filas = 0
+
+    def registrar(ruta, resultado):
+        """Guarda el resultado de un archivo e informa del avance"""
+        nonlocal bytes_leidos, filas
+        resultados[ruta] = resultado
+        bytes_leidos += tamanos[ruta]
+        filas += len(resultado[0])
+        if progress_callback:
+            progress_callback(bytes_leidos, bytes_totales, filas)
+
+    if en_paralelo:
+        _ejecutar_en_procesos(
+            _leer_archivo_medido,
+            [(ruta, (ruta, columnas, usar_cache, opciones)) for ruta in rutas],
+            registrar,
+            cancelacion,
+        )
+    else:
+        for ruta in rutas:
+            registrar(
+                ruta,
+                _leer_archivo_medido(
+                    ruta, columnas, usar_cache, opciones, cancelacion
+                ),
+            )
+
+    columnas_comunes = list(resultados[rutas[0]][0].columns)
+    estadisticas = []
+    bloques = []
+    for ruta in rutas:
+        df, segundos = resultados.pop(ruta)
+        if set(df.columns) != set(columnas_comunes):
+            raise ValueError(
+                f"El archivo '{os.path.basename(ruta)}' no tiene las mismas columnas "
+                f"que '{os.path.basename(rutas[0])}'."
+            )
+        estadisticas.append((ruta, segundos, len(df)))
+        bloques.append(df[columnas_comunes])
+    return _concatenar_bloques(bloques), estadisticas
+
+
+def texto_estadisticas_archivos(estadisticas):
+    """Resume para el área de estado la lectura de varios archivos"""
+    ruta_lenta, segundos_lenta, _ = max(estadisticas, key=lambda e: e[1])
+    return (
+        f"{len(estadisticas)} archivos, el más lento "
+        f"{os.path.basename(ruta_lenta)} ({segundos_lenta:.1f} s)"
+    )
+
+
+def cargar_vista_previa(
+    file_path,
+    n_filas=FILAS_VISTA_PREVIA,
+    tabla=None,
+    consulta=None,
+    hoja=None,
+    hojas=None,
+    archivos=None,
+):
+    """Lee rápidamente la cabecera y las primeras filas del dataset; devuelve None si no es posible.
+
+    Con varios archivos, la vista previa es la del primero (file_path).
+    """
+    try:
+        formato = extension_datos(file_path)
+        if formato == ".csv":
+            with abrir_descomprimido(file_path) as (flujo, _):
+                return pd.read_csv(flujo, nrows=n_filas)
+        elif formato in (".xls", ".xlsx"):
+            return leer_hoja_excel(
+                file_path, hojas[0] if hojas else hoja, n_filas=n_filas
+            )
+        elif formato in EXTENSIONES_COLUMNARES:
+            return leer_columnar(file_path, n_filas=n_filas)
+        elif formato in (".sqlite", ".db"):
+            return leer_sqlite(file_path, tabla, consulta, limite=n_filas)
+    except Exception:
+        # Los errores se notifican al terminar la carga completa
+        return None
+    return None
+
+
+def optimizar_tipos(df, umbral_categorias=0.5):
+    """Reduce la memoria del DataFrame: numéricos al ancho mínimo seguro y texto repetido a categórico.
+
+    Devuelve el DataFrame optimizado y la memoria (bytes) antes y después de la conversión.
+    """
+    memoria_antes = int(df.memory_usage(deep=True).sum())
+    # Las columnas que no cambian se comparten con el original en lugar de copiarlo entero
+    columnas = {col: df[col] for col in df.columns}
+    for col, serie in columnas.items():
+        if pd.api.types.is_bool_dtype(serie):
+            continue
+        if pd.api.types.is_integer_dtype(serie):
+            columnas[col] = pd.to_numeric(serie, downcast="integer")
+        elif pd.api.types.is_float_dtype(serie):
+            reducida = serie.astype(np.float32)
+            # Solo se reduce si no se pierde precisión
+            if np.array_equal(
+                reducida.to_numpy(dtype=np.float64),
+                serie.to_numpy(),
+                equal_nan=True,
+            ):
+                columnas[col] = reducida
+        elif serie.dtype == object and len(serie) > 0:
+            if serie.nunique(dropna=True) > umbral_categorias * len(serie):
+                continue
+            # Las columnas de texto numérico se dejan intactas para poder imputarlas
+            try:
+                pd.to_numeric(serie.dropna(), errors="raise")
+                continue
+            except (ValueError, TypeError):
+                columnas[col] = serie.astype("category")
+    # Sin columns=, como en _concatenar_bloques: el diccionario ya conserva el orden
+    optimizado = pd.DataFrame(columnas, copy=False)
+    optimizado.attrs = df.attrs
+    memoria_despues = int(optimizado.memory_usage(deep=True).sum())
+    return optimizado, memoria_antes, memoria_despues
+
+
+def texto_memoria(memoria_antes, memoria_despues):
+    """Formatea el ahorro de memoria obtenido al optimizar los tipos"""
+    ahorro = (
+        (1 - memoria_despues / memoria_antes) * 100 if memoria_antes else 0
+    )
+    return (
+        f"Memoria: {memoria_antes / 1e6:.1f} MB → {memoria_despues / 1e6:.1f} MB"
+        f" (ahorro {ahorro:.0f}%)"
+    )
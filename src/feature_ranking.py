@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+# Relevancia de cada columna numérica para predecir la salida: correlación de Pearson y R² de la
+# regresión lineal con esa única entrada (que es la correlación al cuadrado)
+
+# Elementos por matriz en cada bloque de filas (acota la memoria con datasets anchos)
+ELEMENTOS_POR_BLOQUE = 2**22
+
+
+def columnas_candidatas(df, salida):
+    """Columnas numéricas (sin contar la salida) que se pueden ordenar por relevancia"""
+    return [
+        c for c in df.columns if c != salida and pd.api.types.is_numeric_dtype(df[c].dtype)
+    ]
+
+
+def _valores(serie):
+    """Valores de una columna como array de numpy, con NaN en los faltantes"""
+    if isinstance(serie.dtype, np.dtype):
+        return serie.to_numpy()
+    return serie.to_numpy(dtype=float, na_value=np.nan)
+
+
+def _media_presentes(valores):
+    """Media de los valores no vacíos por columna (0 si no hay ninguno)"""
+    presentes = ~np.isnan(valores)
+    cuenta = presentes.sum(axis=0)
+    suma = np.where(presentes, valores, 0.0).sum(axis=0)
+    return np.divide(suma, cuenta, out=np.zeros_like(suma, dtype=float), where=cuenta > 0)
+
+
+def ranking_columnas(df, salida, columnas=None):
+    """Devuelve la correlación y el R² de cada columna numérica con la salida, de mayor a menor R².
+
+    Los faltantes se descartan por parejas (columna, salida). Las sumas de todas las columnas se
+    obtienen con un producto de matrices por bloque de filas, [X, X²]ᵀ · [m, y, y²], donde m marca
+    las salidas presentes; si X tiene faltantes, su máscara M aporta otro producto Mᵀ · [m, y, y²].
+
+    Devuelve un DataFrame con las columnas "columna", "correlacion", "r2" y "filas" (filas usadas
+    para cada columna).
+    """
+    if columnas is None:
+        columnas = columnas_candidatas(df, salida)
+    p = len(columnas)
+    y_total = pd.to_numeric(df[salida], errors="coerce").to_numpy(dtype=float)
+    sumas = np.zeros((3 * p, 3))
+    filas_por_bloque = max(1, ELEMENTOS_POR_BLOQUE // max(p, 1))
+    # Se resta a cada columna un valor cercano a su media (la del primer bloque) para que las
+    # sumas de cuadrados no pierdan precisión; la correlación no cambia
+    centro_x = centro_y = None
+    # Arrays de las columnas (sin copiar las de tipos de numpy); cada bloque se copia en X
+    arrays = [_valores(df[c]) for c in columnas]
+    for inicio in range(0, len(df), filas_por_bloque):
+        y = y_total[inicio:inicio + filas_por_bloque]
+        # Matriz [X, X²] del bloque, por columnas para copiar cada columna de forma contigua
+        izquierda = np.empty((len(y), 2 * p), order="F")
+        x = izquierda[:, :p]
+        for j, valores in enumerate(arrays):
+            x[:, j] = valores[inicio:inicio + filas_por_bloque]
+        if centro_x is None:
+            centro_x = _media_presentes(x)
+            centro_y = _media_presentes(y)
+        x -= centro_x
+        presentes_y = ~np.isnan(y)
+        y = np.where(presentes_y, y - centro_y, 0.0)
+        derecha = np.column_stack([presentes_y, y, y * y])
+        faltan_x = np.isnan(x)
+        if faltan_x.any():
+            np.nan_to_num(x, copy=False)
+            sumas[2 * p:] += (~faltan_x).T @ derecha
+        else:
+            # Sin faltantes en X, M es una matriz de unos: sus sumas son las de la salida
+            sumas[2 * p:] += derecha.sum(axis=0)
+        np.multiply(x, x, out=izquierda[:, p:])
+        sumas[:2 * p] += izquierda.T @ derecha
+
+    # Cada fila de "sumas" combina una columna de X, X² o M con m, y o y²
+    n = sumas[2 * p:, 0]
+    suma_x, suma_xy = sumas[:p, 0], sumas[:p, 1]
+    suma_xx = sumas[p:2 * p, 0]
+    suma_y, suma_yy = sumas[2 * p:, 1], sumas[2 * p:, 2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covarianza = suma_xy - suma_x * suma_y / n
+        varianza_x = suma_xx - suma_x**2 / n
+        varianza_y = suma_yy - suma_y**2 / n
+        correlacion = covarianza / np.sqrt(varianza_x * varianza_y)
+    # Columnas constantes o sin pares completos no tienen correlación definida
+    correlacion = np.where(
+        (n > 1) & (varianza_x > 0) & (varianza_y > 0), np.clip(correlacion, -1, 1), np.nan
+    )
+    ranking = pd.DataFrame(
+        {
+            "columna": columnas,
+            "correlacion": correlacion,
+            "r2": correlacion**2,
+            "filas": n.astype(np.int64),
+        }
+    )
+    return ranking.sort_values(
+        "r2", ascending=False, na_position="last", kind="stable"
+    ).reset_index(drop=True)
+
+
+def resumen_ranking(ranking, filas, completo=True):
+    """Texto que resume un ranking: columnas y filas usadas, avisando si es una vista previa"""
+    if completo:
+        return f"{len(ranking)} columnas numéricas · {filas} filas"
+    return (
+        f"{len(ranking)} columnas numéricas · muestra de las primeras {filas} filas "
+        "(vista previa)"
+    )
+
+
+class CacheRanking:
+    """Rankings de unos datos por columna de salida, calculados una sola vez por salida"""
+
+    def __init__(self, df):
+        self.df = df
+        self._rankings = {}
+
+    def ranking(self, salida):
+        """Ranking de las columnas para la salida indicada"""
+        if salida not in self._rankings:
+            self._rankings[salida] = ranking_columnas(self.df, salida)
+        return self._rankings[salida]
@@ -1,13 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import threading
 import time
 import pandas as pd
 import numpy as np
+from cancellation import OperacionCancelada
+from out_of_core import DatosFueraDeMemoria
+from pipeline import entrenar_modelo
 
 _mousebind_installed = (
     False  # ya no se usará para binding global, mantenido por compatibilidad
@@ -23,8 +24,12 @@ def dibujar_ui_model_creation(
     start_progress=None,
     stop_progress=None,
     tab_predicciones=None,
+    cancelacion=None,
 ):
-    """Crea la interfaz de creación de modelo dentro del Frame de la pestaña provisto"""
+    """Crea la interfaz de creación de modelo dentro del Frame de la pestaña provisto.
+
+    Con un token de cancelación, el entrenamiento se abandona entre etapas si se cancela.
+    """
 
     # Scrollable frame dentro de la pestaña recibida
     canvas = tk.Canvas(tab_modelo)
@@ -74,57 +79,38 @@ def dibujar_ui_model_creation(
         if start_progress:
             start_progress()
         try:
-            output_col = train_df.columns[-1]
-            input_cols = list(train_df.columns[:-1])
-
-            X_train = train_df[input_cols]
-            y_train = train_df[output_col]
-            X_test = test_df[input_cols]
-            y_test = test_df[output_col]
-
-            # Validar que no haya NaN en los datos
-            if X_train.isnull().any().any() or y_train.isnull().any():
-                nan_cols = X_train.columns[X_train.isnull().any()].tolist()
-                if y_train.isnull().any():
-                    nan_cols.append(output_col)
-                raise ValueError(
-                    f"Los datos contienen valores faltantes en las columnas: {', '.join(nan_cols)}. "
-                    "Por favor, revisa el paso de preprocesado de datos."
-                )
-
-            # Simulación proceso pesado
-            time.sleep(0.5)
-            model = LinearRegression()
-            model.fit(X_train, y_train)
-
-            y_pred_train = model.predict(X_train)
-            y_pred_test = model.predict(X_test)
-
-            r2_train = r2_score(y_train, y_pred_train)
-            ecm_train = mean_squared_error(y_train, y_pred_train)
-            r2_test = r2_score(y_test, y_pred_test)
-            ecm_test = mean_squared_error(y_test, y_pred_test)
+            if not isinstance(train_df, DatosFueraDeMemoria):
+                # Simulación proceso pesado
+                if cancelacion is not None:
+                    cancelacion.esperar(0.5)
+                else:
+                    time.sleep(0.5)
+            resultado = entrenar_modelo(train_df, test_df, cancelacion)
+            metricas = resultado["metricas"]
 
             def _render():
                 mostrar_resultados(
                     frame_content,
-                    model,
-                    input_cols,
-                    output_col,
-                    y_pred_train,
-                    y_pred_test,
-                    r2_train,
-                    ecm_train,
-                    r2_test,
-                    ecm_test,
+                    resultado["modelo"],
+                    resultado["entradas"],
+                    resultado["salida"],
+                    resultado["pred_train"],
+                    resultado["pred_test"],
+                    metricas["r2_train"],
+                    metricas["ecm_train"],
+                    metricas["r2_test"],
+                    metricas["ecm_test"],
                     prediction_frame_ref,
-                    train_df,
-                    test_df,
+                    resultado["datos_train"],
+                    resultado["datos_test"],
                     txt_descripcion,
                     guardar_callback
                 )
 
             frame_content.after(0, _render)
+        except OperacionCancelada:
+            # Quien lanzó el entrenamiento restaura la interfaz al detener el progreso
+            pass
         except Exception :
             frame_content.after(
                 0,
@@ -1,10 +1,24 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog
 import threading
 import math
 
 # Funciones externas
-from dataset_loading import abrir_archivo
+from dataset_loading import (
+    abrir_archivo,
+    cargar_columnas,
+    crear_informe_progreso,
+    ejecutar_en_segundo_plano,
+)
+from dataset_cache import limpiar_cache, tamano_cache
+from cancellation import OperacionCancelada, TokenCancelacion
+from out_of_core import DatosFueraDeMemoria
+from pipeline import cargar_datos
+from data_sources import FuenteDataFrame, FuenteVersion, crear_fuente_sqlite
+from dataset_lineage import VersionDataset
+from table_view import TablaVirtual, calcular_ancho_columna
+from table_query import ConsultaTabla
+from compressed_files import ruta_sqlite_descomprimida
 from model_manager import guardar_modelo, cargar_modelo
 from column_selection import lanzar_selector
 from nonexistent_data import manejo_datos_inexistentes
@@ -14,18 +28,54 @@ from graphic_interface_model import dibujar_ui_model_creation
 # Variables globales
 df_original = None
 df_original_sin_filtrar = None
+carga_completa = False
+ruta_dataset = None
+opciones_dataset = None
+carga_diferida = False
+fuera_de_memoria = False
+df_columnas = None
 df_seleccionado = None
 df_procesado = None
 df_train = None
 df_test = None
+ventana = None
 tabla_canvas = None
+scroll_y = None
+frame_tabla = None
 canvas_pasos = None
 frame_pasos_container = None
 frame_pasos_wrapper = None
 notebook_visor = None
 progress_bar = None
+etiqueta_estado = None
 entrada_texto = None
+carga_diferida_var = None
+carga_compacta_var = None
+fuera_de_memoria_var = None
 tab_modelo = None
+boton_cancelar = None
+
+# Selector de columnas construido sobre una vista previa: (vista previa, función que le pasa los
+# datos completos cuando termina la carga), o None
+selector_vista_previa = None
+
+# Token de la carga o entrenamiento en curso (None si no hay ninguno cancelable)
+cancelacion_actual = None
+
+# Almacén en disco de las columnas elegidas en el modo fuera de memoria
+almacen_disco = None
+
+# Tabla virtualizada de datos y fuente paginada de SQLite para el dataset original
+tabla_virtual = None
+fuente_sqlite = None
+
+# Datos mostrados en la tabla y su orden y filtros
+datos_tabla = None
+consulta_tabla = None
+combo_filtro_columna = None
+entrada_filtro = None
+etiqueta_filtros = None
+consulta_en_curso = False
 
 # Variables para trackear columnas seleccionadas
 columnas_entrada_seleccionadas = []
@@ -40,7 +90,6 @@ def animate_wave_progress():
     """Animación de barra de progreso tipo onda"""
     global progress_angle
     if not progress_running:
-        progress_bar["value"] = 0
         return
     progress_value = (math.sin(progress_angle) + 1) / 2 * 100
     progress_bar["value"] = progress_value
@@ -63,11 +112,178 @@ def stop_progress():
     progress_bar["value"] = 0
 
 
-def set_dataframes(df_orig, df_sin_filtrar):
-    """Establece los dataframes originales globales"""
-    global df_original, df_original_sin_filtrar
+def update_progress(valor, texto=None):
+    """Muestra un progreso real (0-100) en la barra, sustituyendo la animación de onda.
+
+    Con valor None solo se actualiza el texto y se mantiene la animación.
+    """
+    global progress_running
+    if valor is not None:
+        progress_running = False
+        progress_bar["value"] = valor
+    if texto is not None:
+        etiqueta_estado.config(text=texto)
+
+
+def _activar_cancelacion(token):
+    """Registra el token de la tarea en curso y habilita el botón Cancelar"""
+    global cancelacion_actual
+    cancelacion_actual = token
+    boton_cancelar.config(state="normal")
+
+
+def _desactivar_cancelacion(token):
+    """Deshabilita el botón Cancelar si la tarea que termina es la que está en curso"""
+    global cancelacion_actual
+    if cancelacion_actual is token:
+        cancelacion_actual = None
+        boton_cancelar.config(state="disabled")
+
+
+def _cancelar_tarea():
+    """Pide la cancelación de la carga o el entrenamiento en curso"""
+    if cancelacion_actual is None:
+        return
+    cancelacion_actual.cancelar()
+    boton_cancelar.config(state="disabled")
+    etiqueta_estado.config(text="Cancelando...")
+
+
+def set_dataframes(df_orig, df_sin_filtrar, completo=True):
+    """Establece los dataframes originales globales (completo=False indica una vista previa).
+
+    Si el paso 1 se construyó sobre la vista previa que ahora se sustituye por los datos
+    completos, el selector pasa a usarlos.
+    """
+    global df_original, df_original_sin_filtrar, carga_completa, selector_vista_previa
+    anterior = df_original
     df_original = df_orig
     df_original_sin_filtrar = df_sin_filtrar
+    carga_completa = completo and df_orig is not None
+    if selector_vista_previa is not None and carga_completa:
+        previa, usar_datos_completos = selector_vista_previa
+        selector_vista_previa = None
+        if previa is anterior:
+            usar_datos_completos(df_orig)
+
+
+def _liberar_almacen():
+    """Borra del disco el almacén del modo fuera de memoria, si lo hay"""
+    global almacen_disco
+    if almacen_disco is not None:
+        almacen_disco.eliminar()
+        almacen_disco = None
+
+
+def _volcar_fuera_de_memoria(columnas):
+    """Vuelca las columnas elegidas a un almacén en disco sin bloquear la interfaz.
+
+    Devuelve los datos fuera de memoria o None si se cancela o falla.
+    """
+    global almacen_disco
+    token = TokenCancelacion()
+    start_progress()
+    _activar_cancelacion(token)
+    try:
+        datos = ejecutar_en_segundo_plano(
+            ventana,
+            lambda: cargar_datos(
+                ruta_dataset,
+                columnas,
+                fuera_de_memoria=True,
+                progress_callback=crear_informe_progreso(ventana, update_progress),
+                cancelacion=token,
+                **(opciones_dataset or {}),
+            ),
+        )
+    except OperacionCancelada:
+        update_progress(0, "Carga cancelada")
+        return None
+    except Exception as e:
+        messagebox.showerror(
+            "Error en carga", f"No se pudieron volcar los datos a disco:\n{e}"
+        )
+        return None
+    finally:
+        stop_progress()
+        _desactivar_cancelacion(token)
+    _liberar_almacen()
+    almacen_disco = datos.almacen
+    update_progress(
+        0, f"Volcadas a disco {len(almacen_disco)} filas · {len(columnas)} columnas"
+    )
+    return datos
+
+
+def obtener_datos_seleccion(columnas, al_estar_listo):
+    """Devuelve los datos necesarios para confirmar el paso 1 o los carga si la carga es diferida.
+
+    En el modo fuera de memoria las columnas elegidas se vuelcan a disco y se devuelven como
+    DatosFueraDeMemoria.
+    """
+    global df_columnas
+    if fuera_de_memoria and ruta_dataset is not None:
+        if almacen_disco is not None and set(columnas) <= set(almacen_disco.columnas):
+            return DatosFueraDeMemoria(almacen_disco)
+        return _volcar_fuera_de_memoria(columnas)
+    if carga_completa:
+        return df_original
+    if df_columnas is not None and set(columnas) <= set(df_columnas.columns):
+        return df_columnas
+    if not carga_diferida or ruta_dataset is None:
+        messagebox.showinfo(
+            "Carga en curso",
+            "El archivo aún se está cargando. Podrás confirmar la selección en cuanto termine.",
+        )
+        return None
+
+    def al_terminar(df):
+        """Guarda las columnas materializadas y reintenta la confirmación"""
+        global df_columnas
+        if df is None:
+            return
+        df_columnas = df
+        al_estar_listo()
+
+    df_columnas = None
+    token = TokenCancelacion()
+
+    def iniciar():
+        """Inicia el progreso y permite cancelar la lectura de columnas"""
+        start_progress()
+        _activar_cancelacion(token)
+
+    def detener():
+        """Detiene el progreso y deshabilita la cancelación"""
+        stop_progress()
+        _desactivar_cancelacion(token)
+
+    cargar_columnas(
+        ruta_dataset,
+        columnas,
+        ventana,
+        al_terminar,
+        iniciar,
+        detener,
+        update_progress,
+        compacto=carga_compacta_var.get(),
+        opciones=opciones_dataset,
+        cancelacion=token,
+    )
+    return None
+
+
+def _limpiar_cache():
+    """Vacía la caché de datasets parseados e informa del espacio liberado"""
+    if not messagebox.askyesno(
+        "Limpiar caché",
+        f"La caché de datasets ocupa {tamano_cache() / 1e6:.1f} MB. ¿Deseas vaciarla?",
+    ):
+        return
+    liberados = limpiar_cache()
+    messagebox.showinfo(
+        "Caché vaciada", f"Se han liberado {liberados / 1e6:.1f} MB de caché."
+    )
 
 
 def enable_global_scroll(canvas):
@@ -84,9 +300,26 @@ def enable_global_scroll(canvas):
 
 
 def mostrar_tabla(df, columnas_entrada=None, columna_salida=None):
-    """Muestra el DataFrame en la tabla con columnas coloreadas individualmente"""
+    """Muestra el DataFrame en la tabla con columnas coloreadas individualmente.
+
+    La tabla solo dibuja las celdas visibles y pide a una fuente de datos las filas de la vista
+    según se desplaza; si el DataFrame es el original y procede de una tabla SQLite, se lee
+    directamente de la base de datos. El orden y los filtros se conservan mientras se muestren
+    los mismos datos.
+    """
+    global datos_tabla, consulta_tabla
     if df is None:
         return
+    if consulta_tabla is None or df is not datos_tabla:
+        datos_tabla = df
+        # Datos fuera de memoria: se muestran sus primeras filas
+        consulta_tabla = ConsultaTabla(
+            df.muestra() if isinstance(df, DatosFueraDeMemoria) else df
+        )
+        if combo_filtro_columna is not None:
+            combo_filtro_columna["values"] = [str(c) for c in consulta_tabla.version.columnas]
+            combo_filtro_columna.set("")
+    df = consulta_tabla.resultado() if consulta_tabla.activa() else consulta_tabla.datos
 
     # Si no se pasan parámetros, usar las globales
     if columnas_entrada is None:
@@ -94,117 +327,116 @@ def mostrar_tabla(df, columnas_entrada=None, columna_salida=None):
     if columna_salida is None:
         columna_salida = columna_salida_seleccionada
 
-    # Limpiar canvas si existe
-    if tabla_canvas:
-        tabla_canvas.delete("all")
-
-    columnas = list(df.columns)
-    num_filas = min(1000, len(df))
+    actual = tabla_virtual.fuente
+    if fuente_sqlite is not None and df is df_original:
+        fuente = fuente_sqlite
+    elif actual is not None and (
+        getattr(actual, "df", None) is df or getattr(actual, "version", None) is df
+    ):
+        # Mismos datos (p. ej. al cambiar la selección): se conserva la caché de celdas formateadas
+        fuente = actual
+    elif isinstance(df, VersionDataset):
+        # Versión derivada: solo se construyen las filas que se dibujan
+        fuente = FuenteVersion(df)
+    else:
+        fuente = FuenteDataFrame(df)
 
     # Configuración dinámica de ancho de columnas
     try:
-        canvas_width = tabla_canvas.winfo_width()
-        if canvas_width > 1:  # Asegurarse de que el canvas ya tiene tamaño
-            num_cols = len(columnas)
-            col_width = (
-                max(120, canvas_width // num_cols) if num_cols > 0 else 150
-            )
-        else:
-            col_width = 150
-    except Exception:
-        col_width = 150
-
-    row_height = 25
-    header_height = 30
-
-    # Colores
-    color_entrada = "#CCFFCC"  # Verde claro
-    color_salida = "#FFCCCC"  # Rojo claro
-    color_normal = "white"
-    color_border = "#CCCCCC"
-
-    # Dibujar encabezados
-    x_offset = 0
-    for col_idx, col in enumerate(columnas):
-        # Determinar color de fondo
-        if columnas_entrada and col in columnas_entrada:
-            bg_color = color_entrada
-        elif columna_salida and col == columna_salida:
-            bg_color = color_salida
-        else:
-            bg_color = "#F0F0F0"
-
-        # Dibujar rectángulo del encabezado
-        tabla_canvas.create_rectangle(
-            x_offset,
-            0,
-            x_offset + col_width,
-            header_height,
-            fill=bg_color,
-            outline=color_border,
-            width=1,
+        col_width = calcular_ancho_columna(
+            tabla_canvas.winfo_width(), len(fuente.columnas)
         )
+    except Exception:
+        col_width = calcular_ancho_columna(0, 0)
+
+    tabla_virtual.mostrar(
+        fuente, col_width, columnas_entrada, columna_salida, consulta_tabla.orden
+    )
+    _actualizar_etiqueta_filtros()
+
+
+def _actualizar_etiqueta_filtros():
+    """Resume los filtros activos y las filas que los cumplen"""
+    if etiqueta_filtros is None:
+        return
+    if not consulta_tabla.filtros:
+        etiqueta_filtros.config(text="")
+        return
+    condiciones = " · ".join(f"{c} {cond}" for c, cond in consulta_tabla.filtros.items())
+    etiqueta_filtros.config(
+        text=f"{condiciones} ({len(consulta_tabla.resultado())} de "
+        f"{len(consulta_tabla.version)} filas)"
+    )
+
+
+def _mostrar_consulta():
+    """Calcula el resultado de la consulta en segundo plano y lo muestra en la tabla.
+
+    La primera ordenación de una columna grande recorre todas sus filas; las siguientes usan la
+    permutación guardada en la versión de los datos.
+    """
+    global consulta_en_curso
+    consulta_en_curso = True
+    try:
+        ejecutar_en_segundo_plano(ventana, consulta_tabla.resultado)
+    finally:
+        consulta_en_curso = False
+    mostrar_tabla(datos_tabla)
 
-        # Dibujar texto del encabezado
-        tabla_canvas.create_text(
-            x_offset + col_width / 2,
-            header_height / 2,
-            text=col,
-            font=("Arial", 9, "bold"),
+
+def _on_click_cabecera(event):
+    """Ordena la tabla por la columna pulsada; una segunda pulsación invierte el orden"""
+    columna = tabla_virtual.columna_en(event.x, event.y)
+    if columna is None or consulta_tabla is None or consulta_en_curso:
+        return
+    consulta_tabla.ordenar(columna)
+    _mostrar_consulta()
+
+
+def _aplicar_filtro(event=None):
+    """Filtra la columna elegida con la condición escrita (vacía: quita su filtro)"""
+    if consulta_tabla is None or consulta_en_curso:
+        return
+    indice = combo_filtro_columna.current()
+    if indice < 0:
+        messagebox.showerror("Error", "Selecciona la columna que quieres filtrar.")
+        return
+    try:
+        consulta_tabla.filtrar(
+            consulta_tabla.version.columnas[indice], entrada_filtro.get()
         )
+    except ValueError as e:
+        messagebox.showerror("Error en el filtro", str(e))
+        return
+    _mostrar_consulta()
+
 
-        x_offset += col_width
-
-    # Dibujar filas de datos
-    for row_idx, (_, fila) in enumerate(df.head(num_filas).iterrows()):
-        x_offset = 0
-        y_pos = header_height + (row_idx * row_height)
-
-        for col_idx, col in enumerate(columnas):
-            value = fila[col]
-
-            # Determinar color de fondo según la columna
-            if columnas_entrada and col in columnas_entrada:
-                bg_color = color_entrada
-            elif columna_salida and col == columna_salida:
-                bg_color = color_salida
-            else:
-                bg_color = color_normal if row_idx % 2 == 0 else "#F9F9F9"
-
-            # Dibujar rectángulo de celda
-            tabla_canvas.create_rectangle(
-                x_offset,
-                y_pos,
-                x_offset + col_width,
-                y_pos + row_height,
-                fill=bg_color,
-                outline=color_border,
-                width=1,
-            )
-
-            # Dibujar texto de la celda
-            text = str(value)
-            if len(text) > 18:
-                text = text[:15] + "..."
-
-            tabla_canvas.create_text(
-                x_offset + 5,
-                y_pos + row_height / 2,
-                text=text,
-                font=("Arial", 8),
-                anchor="w",
-            )
-
-            x_offset += col_width
-
-    # Actualizar región de scroll
-    tabla_canvas.configure(scrollregion=tabla_canvas.bbox("all"))
+def _quitar_filtros():
+    """Quita los filtros y el orden de la tabla"""
+    if consulta_tabla is None or consulta_en_curso:
+        return
+    consulta_tabla.quitar_filtros()
+    entrada_filtro.delete(0, "end")
+    mostrar_tabla(datos_tabla)
+
+
+def _set_fuente_sqlite(ruta, opciones):
+    """Prepara la lectura paginada directa de SQLite si el origen es una tabla completa de un único archivo"""
+    global fuente_sqlite
+    if fuente_sqlite is not None:
+        fuente_sqlite.cerrar()
+        fuente_sqlite = None
+    if ruta and opciones and "tabla" in opciones and "archivos" not in opciones:
+        # Una copia comprimida ya se descomprimió a la caché al elegir la tabla
+        fuente_sqlite = crear_fuente_sqlite(
+            ruta_sqlite_descomprimida(ruta), opciones["tabla"]
+        )
 
 
 # Flujo de pasos
 def iniciar_flujo_paso_1(df):
     """Inicia el flujo de preprocesamiento desde el paso 1: selección de columnas"""
-    global tab_modelo
+    global tab_modelo, selector_vista_previa
 
     # Borrar la pestaña del modelo si existe
     try:
@@ -241,8 +473,8 @@ def iniciar_flujo_paso_1(df):
         global columnas_entrada_seleccionadas, columna_salida_seleccionada
         columnas_entrada_seleccionadas = entradas
         columna_salida_seleccionada = salida
-        # Actualizar tabla con las columnas coloreadas
-        mostrar_tabla(df_original, entradas, salida)
+        # Recolorear solo las columnas que cambian, sin redibujar la tabla
+        tabla_virtual.colorear(entradas, salida)
 
     def callback(df_resultante, columnas_entrada, columna_salida):
         """Callback para manejar el resultado de la selección de columnas"""
@@ -271,7 +503,16 @@ def iniciar_flujo_paso_1(df):
         )
         iniciar_paso_2(df_seleccionado)
 
-    lanzar_selector(df, frame_paso_1, callback, on_selection_change)
+    usar_datos_completos = lanzar_selector(
+        df,
+        frame_paso_1,
+        callback,
+        on_selection_change,
+        obtener_df=obtener_datos_seleccion,
+        completo=carga_completa,
+    )
+    # Con una vista previa, el selector se actualiza cuando llegan los datos completos
+    selector_vista_previa = None if carga_completa else (df, usar_datos_completos)
     frame_pasos_container.update_idletasks()
     canvas_pasos.configure(scrollregion=canvas_pasos.bbox("all"))
 
@@ -345,6 +586,24 @@ def iniciar_paso_4(train_df_local, test_df_local):
 
     # Inicia la animación de progreso
     start_progress()
+    token = TokenCancelacion()
+    _activar_cancelacion(token)
+
+    def detener():
+        """Detiene el progreso desde el hilo de entrenamiento y, si se canceló, quita la pestaña"""
+
+        def en_interfaz():
+            """Actualiza la interfaz en el hilo principal"""
+            stop_progress()
+            _desactivar_cancelacion(token)
+            if token.cancelado:
+                try:
+                    notebook_visor.forget(tab_modelo)
+                except Exception:
+                    pass
+                etiqueta_estado.config(text="Entrenamiento cancelado")
+
+        ventana.after(0, en_interfaz)
 
     def crear_modelo_hilo():
         """Crea la interfaz de creación de modelo y la pestaña de predicciones en un hilo separado"""
@@ -371,71 +630,23 @@ def iniciar_paso_4(train_df_local, test_df_local):
         tab_modelo = ttk.Frame(notebook_visor)
         notebook_visor.add(tab_modelo, text="Modelo")
         # Entrenar el modelo y construir su interfaz (la pestaña Predicciones se añadirá solo cuando se pulse el botón)
+        # Los conjuntos se pasan como versiones: entrenar_modelo comprueba los faltantes con el
+        # índice del dataset cargado y solo después los construye como DataFrames contiguos
         dibujar_ui_model_creation(
             tab_modelo,
             notebook_visor,
             df_train,
             df_test,
             guardar_callback=guardar_modelo,
+            stop_progress=detener,
+            cancelacion=token,
         )
         # Obtener nombres de columna de entrada y salida
         # El gráfico se dibuja en on_model_ready
-        ventana.after(0, stop_progress)
 
     threading.Thread(target=crear_modelo_hilo, daemon=True).start()
 
 
-# Ventana principal
-ventana = tk.Tk()
-ventana.title("Visor y Preprocesador de Datos")
-ventana.geometry("900x800")
-
-frame_superior = ttk.Frame(ventana)
-frame_superior.pack(pady=10, fill="x", padx=10)
-
-left_frame = ttk.Frame(frame_superior)
-left_frame.pack(side="left", fill="x", expand=True)
-
-etiqueta_ruta = ttk.Label(left_frame, text="Ruta:")
-etiqueta_ruta.pack(side="left", padx=(0, 5))
-
-entrada_texto = tk.Entry(left_frame, fg="gray")
-entrada_texto.insert(0, "Seleccione el archivo a cargar")
-entrada_texto.pack(side="left", fill="x", expand=True, padx=5)
-
-right_frame = ttk.Frame(frame_superior)
-right_frame.pack(side="right")
-
-boton_abrir = ttk.Button(right_frame, text="Abrir archivo")
-boton_abrir.pack(side="left", padx=5)
-
-boton_cargar_modelo = ttk.Button(right_frame, text="Cargar Modelo")
-boton_cargar_modelo.pack(side="left", padx=5)
-
-progress_bar = ttk.Progressbar(
-    right_frame, mode="determinate", length=150, maximum=100
-)
-progress_bar.pack(side="left", padx=5, pady=(5, 0))
-
-frame_tabla_notebook = ttk.Frame(ventana)
-frame_tabla_notebook.pack(fill="x", expand=True, padx=10, pady=10)
-
-
-notebook_visor = ttk.Notebook(frame_tabla_notebook)
-notebook_visor.pack(fill="both", expand=True)
-
-tab_visor = ttk.Frame(notebook_visor)
-notebook_visor.add(tab_visor, text="Datos Originales/Procesados")
-
-frame_tabla = ttk.Frame(tab_visor)
-# Usamos grid en la pestaña para controlar proporciones.
-# La fila 0 (tabla) tendrá peso 1 y la fila 1 (panel de pasos) peso 2 -> tabla ocupa 1/3
-tab_visor.rowconfigure(0, weight=1)
-tab_visor.rowconfigure(1, weight=2)
-tab_visor.columnconfigure(0, weight=1)
-frame_tabla.grid(row=0, column=0, sticky="nsew")
-
-
 def on_tab_change(event):
     """Maneja el cambio de pestañas en el notebook para mostrar u ocultar paneles"""
     tab_id = notebook_visor.select()
@@ -458,96 +669,22 @@ def on_tab_change(event):
             pass
 
 
-notebook_visor.bind("<<NotebookTabChanged>>", on_tab_change)
-
-# Crear Canvas personalizado para la tabla con soporte de scroll
-tabla_canvas = tk.Canvas(frame_tabla, bg="white", highlightthickness=0)
-scroll_y = ttk.Scrollbar(
-    frame_tabla, orient="vertical", command=tabla_canvas.yview
-)
-scroll_x = ttk.Scrollbar(
-    frame_tabla, orient="horizontal", command=tabla_canvas.xview
-)
-tabla_canvas.configure(
-    yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set
-)
-
-tabla_canvas.grid(row=0, column=0, sticky="nsew")
-scroll_y.grid(row=0, column=1, sticky="ns")
-scroll_x.grid(row=1, column=0, sticky="ew")
-
-frame_tabla.rowconfigure(0, weight=1)
-frame_tabla.columnconfigure(0, weight=1)
-
-
 # Soporte para scroll con rueda del ratón
 def _on_canvas_mousewheel(event):
-    tabla_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+    tabla_virtual.yview("scroll", int(-1 * (event.delta / 120)), "units")
 
 
 def _on_canvas_shift_mousewheel(event):
-    tabla_canvas.xview_scroll(int(-1 * (event.delta / 120)), "units")
-
-
-tabla_canvas.bind(
-    "<Enter>",
-    lambda e: tabla_canvas.bind_all("<MouseWheel>", _on_canvas_mousewheel),
-)
-tabla_canvas.bind("<Leave>", lambda e: tabla_canvas.unbind_all("<MouseWheel>"))
-tabla_canvas.bind("<Shift-MouseWheel>", _on_canvas_shift_mousewheel)
+    tabla_virtual.xview("scroll", int(-1 * (event.delta / 120)), "units")
 
 
-# Redibujar tabla cuando cambie el tamaño del canvas
+# Recolocar la tabla cuando cambie el tamaño del canvas
 def _on_canvas_resize(event):
-    """Redibuja la tabla cuando cambia el tamaño de la ventana"""
-    if df_original is not None:
-        # Esperar un poco para evitar múltiples llamadas durante el resize
-        tabla_canvas.after(100, lambda: mostrar_tabla(df_original))
-
-
-tabla_canvas.bind("<Configure>", _on_canvas_resize)
-
-# Panel de pasos scrollable dentro de la pestaña para poder dimensionarlo junto a la tabla
-frame_pasos_wrapper = ttk.Frame(tab_visor)
-frame_pasos_wrapper.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
-
-canvas_pasos = tk.Canvas(frame_pasos_wrapper, bd=0, highlightthickness=0)
-scrollbar_pasos = ttk.Scrollbar(
-    frame_pasos_wrapper, orient="vertical", command=canvas_pasos.yview
-)
-scroll_x_pasos = ttk.Scrollbar(
-    frame_pasos_wrapper, orient="horizontal", command=canvas_pasos.xview
-)
-scrollbar_pasos.pack(side="right", fill="y")
-scroll_x_pasos.pack(side="bottom", fill="x")
-canvas_pasos.pack(side="left", fill="both", expand=True)
-canvas_pasos.configure(
-    yscrollcommand=scrollbar_pasos.set, xscrollcommand=scroll_x_pasos.set
-)
-
-frame_pasos_container = ttk.Frame(canvas_pasos)
-frame_pasos_container_id = canvas_pasos.create_window(
-    (0, 0), window=frame_pasos_container, anchor="nw", width=900
-)
-frame_pasos_container.bind(
-    "<Configure>",
-    lambda e: canvas_pasos.configure(scrollregion=canvas_pasos.bbox("all")),
-)
-canvas_pasos.bind(
-    "<Configure>",
-    lambda e: canvas_pasos.itemconfig(frame_pasos_container_id, width=e.width),
-)
-
-# Asegurar empaquetado de los elementos superiores
-frame_superior.pack(pady=5, fill="x", padx=10)
-frame_tabla_notebook.pack(fill="both", expand=True, padx=10, pady=5)
-
-# Habilitar scroll global en pasos
-enable_global_scroll(canvas_pasos)
+    """Ajusta la tabla al nuevo tamaño; los eventos seguidos se agrupan en un solo ajuste"""
+    tabla_virtual.redimensionar()
 
 
-# Configurar comandos de botones después de que se hayan definido todos los widgets
-def _abrir_archivo_reset():
+def _abrir_archivo_reset(patron=None):
     """Reinicia la interfaz y carga datos nuevos en la primera pestaña."""
 
     def hacer_reset():
@@ -572,35 +709,115 @@ def _abrir_archivo_reset():
                 ):
                     notebook_visor.select(i)
                     break
-            # Limpiar tabla (ya se limpia en mostrar_tabla)
+            # Limpiar tabla (puede contener una vista previa anterior)
+            tabla_virtual.limpiar()
             # Limpiar panel de pasos
             for w in frame_pasos_container.winfo_children():
                 w.destroy()
         except Exception:
             pass
 
+    global ruta_dataset, opciones_dataset, carga_diferida, fuera_de_memoria, df_columnas
+
+    # Estado anterior, para volver a él si se cancela la carga
+    anterior = (
+        df_original,
+        df_original_sin_filtrar,
+        carga_completa,
+        ruta_dataset,
+        opciones_dataset,
+        carga_diferida,
+        fuera_de_memoria,
+        df_columnas,
+    )
+    texto_anterior = entrada_texto.get()
+    token = TokenCancelacion()
+
+    def restaurar():
+        """Devuelve la interfaz al dataset que había antes de la carga cancelada"""
+        global df_original, df_original_sin_filtrar, carga_completa
+        global ruta_dataset, opciones_dataset, carga_diferida, fuera_de_memoria, df_columnas
+        hacer_reset()
+        (
+            df_original,
+            df_original_sin_filtrar,
+            carga_completa,
+            ruta_dataset,
+            opciones_dataset,
+            carga_diferida,
+            fuera_de_memoria,
+            df_columnas,
+        ) = anterior
+        entrada_texto.config(state="normal")
+        entrada_texto.delete(0, tk.END)
+        entrada_texto.insert(0, texto_anterior)
+        if ruta_dataset is None:
+            entrada_texto.config(fg="gray")
+        else:
+            entrada_texto.config(state="readonly")
+        _set_fuente_sqlite(ruta_dataset, opciones_dataset)
+        if df_original is not None:
+            mostrar_tabla(df_original)
+            iniciar_flujo_paso_1(df_original)
+
+    def iniciar():
+        """Inicia el progreso y permite cancelar la carga"""
+        start_progress()
+        _activar_cancelacion(token)
+
+    def detener():
+        """Detiene el progreso y deshabilita la cancelación"""
+        stop_progress()
+        _desactivar_cancelacion(token)
+
     # Abrir archivo y pasar callback de reset
-    abrir_archivo(
+    ruta, opciones = abrir_archivo(
         entrada_texto,
-        start_progress,
-        stop_progress,
+        iniciar,
+        detener,
         mostrar_tabla,
         iniciar_flujo_paso_1,
         ventana,
         set_dataframes,
         reset_callback=hacer_reset,
+        update_progress=update_progress,
+        # El modo fuera de memoria solo lee la vista previa antes del paso 1
+        diferir_carga=carga_diferida_var.get() or fuera_de_memoria_var.get(),
+        compacto=carga_compacta_var.get(),
+        patron=patron,
+        cancelacion=token,
+        al_cancelar=restaurar,
+    )
+    if ruta:
+        ruta_dataset = ruta
+        opciones_dataset = opciones
+        _set_fuente_sqlite(ruta, opciones)
+        carga_diferida = carga_diferida_var.get()
+        fuera_de_memoria = fuera_de_memoria_var.get()
+        df_columnas = None
+        _liberar_almacen()
+
+
+def _abrir_patron_reset():
+    """Pide un patrón de archivos (p. ej. particiones diarias) y los carga todos juntos"""
+    patron = simpledialog.askstring(
+        "Abrir varios archivos",
+        "Patrón de archivos (por ejemplo datos/ventas_2026-*.csv):",
+        parent=ventana,
     )
+    if patron and patron.strip():
+        _abrir_archivo_reset(patron.strip())
 
 
 def _cargar_modelo_reset():
     """Vacía completamente la tabla de datos antes de cargar el modelo."""
-    global df_original, df_original_sin_filtrar, df_seleccionado, df_procesado
+    global df_seleccionado, df_procesado, ruta_dataset, opciones_dataset, df_columnas
     global df_train, df_test, columnas_entrada_seleccionadas, columna_salida_seleccionada
 
     # Limpiar Canvas
     try:
-        if tabla_canvas:
-            tabla_canvas.delete("all")
+        if tabla_virtual:
+            tabla_virtual.limpiar()
     except Exception as e:
         print(f"Error limpiando tabla_canvas: {e}")
 
@@ -613,8 +830,12 @@ def _cargar_modelo_reset():
         print(f"Error limpiando entrada_texto: {e}")
 
     # Limpiar dataframes globales
-    df_original = None
-    df_original_sin_filtrar = None
+    set_dataframes(None, None)
+    ruta_dataset = None
+    opciones_dataset = None
+    _set_fuente_sqlite(None, None)
+    _liberar_almacen()
+    df_columnas = None
     df_seleccionado = None
     df_procesado = None
     df_train = None
@@ -627,18 +848,206 @@ def _cargar_modelo_reset():
     cargar_modelo(notebook_visor, frame_pasos_container)
 
 
-boton_abrir.config(command=_abrir_archivo_reset)
-boton_cargar_modelo.config(command=_cargar_modelo_reset)
+def construir_interfaz():
+    """Construye la ventana principal y sus widgets"""
+    global ventana, entrada_texto, progress_bar, etiqueta_estado
+    global carga_diferida_var, carga_compacta_var, fuera_de_memoria_var
+    global notebook_visor, frame_tabla
+    global tabla_canvas, tabla_virtual, scroll_y, frame_pasos_wrapper, canvas_pasos
+    global combo_filtro_columna, entrada_filtro, etiqueta_filtros
+    global frame_pasos_container, boton_cancelar
+
+    # Ventana principal
+    ventana = tk.Tk()
+    ventana.title("Visor y Preprocesador de Datos")
+    ventana.geometry("900x800")
+
+    frame_superior = ttk.Frame(ventana)
+    frame_superior.pack(pady=10, fill="x", padx=10)
+
+    left_frame = ttk.Frame(frame_superior)
+    left_frame.pack(side="left", fill="x", expand=True)
+
+    etiqueta_ruta = ttk.Label(left_frame, text="Ruta:")
+    etiqueta_ruta.pack(side="left", padx=(0, 5))
+
+    entrada_texto = tk.Entry(left_frame, fg="gray")
+    entrada_texto.insert(0, "Seleccione el archivo a cargar")
+    entrada_texto.pack(side="left", fill="x", expand=True, padx=5)
+
+    right_frame = ttk.Frame(frame_superior)
+    right_frame.pack(side="right")
+
+    boton_abrir = ttk.Button(right_frame, text="Abrir archivo")
+    boton_abrir.pack(side="left", padx=5)
+
+    boton_abrir_patron = ttk.Button(
+        right_frame, text="Abrir patrón", command=_abrir_patron_reset
+    )
+    boton_abrir_patron.pack(side="left", padx=5)
+
+    boton_cargar_modelo = ttk.Button(right_frame, text="Cargar Modelo")
+    boton_cargar_modelo.pack(side="left", padx=5)
+
+    boton_limpiar_cache = ttk.Button(
+        right_frame, text="Limpiar caché", command=_limpiar_cache
+    )
+    boton_limpiar_cache.pack(side="left", padx=5)
+
+    # Leer solo la vista previa y, tras el paso 1, únicamente las columnas elegidas
+    carga_diferida_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(
+        right_frame,
+        text="Cargar solo columnas seleccionadas",
+        variable=carga_diferida_var,
+    ).pack(side="left", padx=5)
+
+    # Reducir tipos numéricos y convertir texto repetido a categórico al cargar
+    carga_compacta_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(
+        right_frame, text="Carga compacta", variable=carga_compacta_var
+    ).pack(side="left", padx=5)
+
+    # Volcar las columnas elegidas a disco y entrenar recorriéndolas por bloques
+    fuera_de_memoria_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(
+        right_frame, text="Fuera de memoria", variable=fuera_de_memoria_var
+    ).pack(side="left", padx=5)
+
+    progress_bar = ttk.Progressbar(
+        right_frame, mode="determinate", length=150, maximum=100
+    )
+    progress_bar.pack(side="left", padx=5, pady=(5, 0))
+
+    # Solo se habilita mientras hay una carga o un entrenamiento en curso
+    boton_cancelar = ttk.Button(
+        right_frame, text="Cancelar", command=_cancelar_tarea, state="disabled"
+    )
+    boton_cancelar.pack(side="left", padx=5)
+
+    # Área de estado para informar del progreso de carga
+    etiqueta_estado = ttk.Label(ventana, text="", foreground="gray")
+    etiqueta_estado.pack(fill="x", padx=15)
+
+    frame_tabla_notebook = ttk.Frame(ventana)
+    frame_tabla_notebook.pack(fill="x", expand=True, padx=10, pady=10)
+
+    notebook_visor = ttk.Notebook(frame_tabla_notebook)
+    notebook_visor.pack(fill="both", expand=True)
+
+    tab_visor = ttk.Frame(notebook_visor)
+    notebook_visor.add(tab_visor, text="Datos Originales/Procesados")
+
+    frame_tabla = ttk.Frame(tab_visor)
+    # Usamos grid en la pestaña para controlar proporciones.
+    # La fila 0 (tabla) tendrá peso 1 y la fila 1 (panel de pasos) peso 2 -> tabla ocupa 1/3
+    tab_visor.rowconfigure(0, weight=1)
+    tab_visor.rowconfigure(1, weight=2)
+    tab_visor.columnconfigure(0, weight=1)
+    frame_tabla.grid(row=0, column=0, sticky="nsew")
+
+    notebook_visor.bind("<<NotebookTabChanged>>", on_tab_change)
+
+    # Barra de filtros: condición sobre una columna (por ejemplo "> 100", "= Madrid" o un texto)
+    frame_filtros = ttk.Frame(frame_tabla)
+    frame_filtros.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 5))
+    ttk.Label(frame_filtros, text="Filtrar:").pack(side="left", padx=(0, 5))
+    combo_filtro_columna = ttk.Combobox(frame_filtros, state="readonly", width=20)
+    combo_filtro_columna.pack(side="left", padx=5)
+    entrada_filtro = ttk.Entry(frame_filtros, width=20)
+    entrada_filtro.pack(side="left", padx=5)
+    entrada_filtro.bind("<Return>", _aplicar_filtro)
+    ttk.Button(frame_filtros, text="Aplicar", command=_aplicar_filtro).pack(
+        side="left", padx=5
+    )
+    ttk.Button(frame_filtros, text="Quitar filtros", command=_quitar_filtros).pack(
+        side="left", padx=5
+    )
+    etiqueta_filtros = ttk.Label(frame_filtros, text="", foreground="gray")
+    etiqueta_filtros.pack(side="left", padx=5)
+
+    # Crear Canvas personalizado para la tabla con soporte de scroll
+    tabla_canvas = tk.Canvas(frame_tabla, bg="white", highlightthickness=0)
+    scroll_y = ttk.Scrollbar(frame_tabla, orient="vertical")
+    scroll_x = ttk.Scrollbar(frame_tabla, orient="horizontal")
+    # La tabla virtual gobierna las barras: el canvas no se desplaza, se redibuja la vista
+    tabla_virtual = TablaVirtual(tabla_canvas, scroll_y, scroll_x)
+
+    tabla_canvas.grid(row=1, column=0, sticky="nsew")
+    scroll_y.grid(row=1, column=1, sticky="ns")
+    scroll_x.grid(row=2, column=0, sticky="ew")
+
+    frame_tabla.rowconfigure(1, weight=1)
+    frame_tabla.columnconfigure(0, weight=1)
+
+    tabla_canvas.bind(
+        "<Enter>",
+        lambda e: tabla_canvas.bind_all("<MouseWheel>", _on_canvas_mousewheel),
+    )
+    tabla_canvas.bind("<Leave>", lambda e: tabla_canvas.unbind_all("<MouseWheel>"))
+    tabla_canvas.bind("<Shift-MouseWheel>", _on_canvas_shift_mousewheel)
+    # Pulsar una cabecera ordena por su columna
+    tabla_canvas.bind("<Button-1>", _on_click_cabecera)
+
+    tabla_canvas.bind("<Configure>", _on_canvas_resize)
+
+    # Panel de pasos scrollable dentro de la pestaña para poder dimensionarlo junto a la tabla
+    frame_pasos_wrapper = ttk.Frame(tab_visor)
+    frame_pasos_wrapper.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+
+    canvas_pasos = tk.Canvas(frame_pasos_wrapper, bd=0, highlightthickness=0)
+    scrollbar_pasos = ttk.Scrollbar(
+        frame_pasos_wrapper, orient="vertical", command=canvas_pasos.yview
+    )
+    scroll_x_pasos = ttk.Scrollbar(
+        frame_pasos_wrapper, orient="horizontal", command=canvas_pasos.xview
+    )
+    scrollbar_pasos.pack(side="right", fill="y")
+    scroll_x_pasos.pack(side="bottom", fill="x")
+    canvas_pasos.pack(side="left", fill="both", expand=True)
+    canvas_pasos.configure(
+        yscrollcommand=scrollbar_pasos.set, xscrollcommand=scroll_x_pasos.set
+    )
+
+    frame_pasos_container = ttk.Frame(canvas_pasos)
+    frame_pasos_container_id = canvas_pasos.create_window(
+        (0, 0), window=frame_pasos_container, anchor="nw", width=900
+    )
+    frame_pasos_container.bind(
+        "<Configure>",
+        lambda e: canvas_pasos.configure(scrollregion=canvas_pasos.bbox("all")),
+    )
+    canvas_pasos.bind(
+        "<Configure>",
+        lambda e: canvas_pasos.itemconfig(frame_pasos_container_id, width=e.width),
+    )
+
+    # Asegurar empaquetado de los elementos superiores
+    frame_superior.pack(pady=5, fill="x", padx=10)
+    frame_tabla_notebook.pack(fill="both", expand=True, padx=10, pady=5)
+
+    # Habilitar scroll global en pasos
+    enable_global_scroll(canvas_pasos)
+
+    # Configurar comandos de botones después de que se hayan definido todos los widgets
+    boton_abrir.config(command=_abrir_archivo_reset)
+    boton_cargar_modelo.config(command=_cargar_modelo_reset)
+
+    # Mensaje de bienvenida al iniciar
+    ventana.after(
+        200,
+        lambda: messagebox.showinfo(
+            "Visor y preprocesador de datos",
+            "Bienvenido! Para comenzar, haga clic en 'Abrir archivo' y "
+            "seleccione un archivo de datos compatible (CSV, Excel, SQLite, Parquet, Arrow) "
+            "o cargue un modelo existente.",
+        ),
+    )
 
-# Mensaje de bienvenida al iniciar
-ventana.after(
-    200,
-    lambda: messagebox.showinfo(
-        "Visor y preprocesador de datos",
-        "Bienvenido! Para comenzar, haga clic en 'Abrir archivo' y "
-        "seleccione un archivo de datos compatible (CSV, Excel, SQLite) "
-        "o cargue un modelo existente.",
-    ),
-)
 
-ventana.mainloop()
+# Solo se abre la ventana al ejecutar el módulo: los procesos de trabajo que lo importan
+# (lectura en paralelo) no deben crear otra interfaz
+if __name__ == "__main__":
+    construir_interfaz()
+    ventana.mainloop()
+    _liberar_almacen()
@@ -0,0 +1,75 @@
+import numpy as np
+from cancellation import comprobar_cancelacion
+from column_cache import CacheColumnas, RegistroDataFrames
+
+# Índice de faltantes de un DataFrame: por columna, cuántos valores faltan y dónde. Se calcula una
+# vez por columna y DataFrame, de modo que contar faltantes, eliminar filas, rellenar y validar
+# antes de entrenar solo consultan el índice en lugar de volver a recorrer los datos.
+
+
+def _indexar(serie):
+    """(cuenta, posiciones, bits) de los faltantes de una columna"""
+    nulos = serie.isnull().to_numpy()
+    cuenta = int(nulos.sum())
+    posiciones = bits = None
+    if cuenta and cuenta * 64 < len(nulos):
+        posiciones = np.flatnonzero(nulos)
+    elif cuenta:
+        bits = np.packbits(nulos)
+    return cuenta, posiciones, bits
+
+
+class IndiceFaltantes(CacheColumnas):
+    """Índice de faltantes de un DataFrame, calculado columna a columna bajo demanda.
+
+    Las columnas sin faltantes solo guardan la cuenta. Las demás guardan sus faltantes de la forma
+    que ocupe menos: las posiciones de las filas si son pocos (menos de una fila de cada 64) o un
+    mapa de bits con np.packbits (un bit por celda) si son muchos. Cada columna se vuelve a indexar
+    si cambian sus valores (ver CacheColumnas).
+    """
+
+    def _entrada(self, columna):
+        """(cuenta, posiciones, bits) de una columna; solo uno de los dos últimos no es None"""
+        return self._resultado(columna, _indexar)
+
+    def calcular(self, cancelacion=None):
+        """Indexa todas las columnas (por ejemplo, al terminar la carga)"""
+        for columna in self.df.columns:
+            comprobar_cancelacion(cancelacion)
+            self._entrada(columna)
+
+    def cuenta(self, columna):
+        """Número de faltantes de una columna"""
+        return self._entrada(columna)[0]
+
+    def posiciones(self, columna):
+        """Posiciones de las filas con faltantes en una columna"""
+        cuenta, posiciones, bits = self._entrada(columna)
+        if posiciones is not None:
+            return posiciones
+        if not cuenta:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.mascara(columna))
+
+    def mascara(self, columna, filas=None):
+        """Máscara de faltantes de una columna, en todas las filas o en las posiciones dadas"""
+        cuenta, posiciones, bits = self._entrada(columna)
+        n = self.df.shape[0] if filas is None else len(filas)
+        if not cuenta:
+            return np.zeros(n, dtype=bool)
+        if bits is not None:
+            nulos = np.unpackbits(bits, count=self.df.shape[0]).view(bool)
+            return nulos if filas is None else nulos[filas]
+        if filas is None:
+            nulos = np.zeros(n, dtype=bool)
+            nulos[posiciones] = True
+            return nulos
+        return np.isin(filas, posiciones)
+
+
+_indices = RegistroDataFrames(IndiceFaltantes)
+
+
+def indice_faltantes(df):
+    """Devuelve el índice de faltantes de un DataFrame, creándolo la primera vez"""
+    return _indices.obtener(df)
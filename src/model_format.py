@@ -0,0 +1,33 @@
+import json
+
+# Formato JSON de los modelos guardados, compartido por el botón "Guardar Modelo" y el
+# entrenamiento por lotes. No importa tkinter para poder usarse sin interfaz gráfica.
+
+
+def crear_info_modelo(modelo, input_cols, output_col, descripcion, metricas):
+    """Devuelve el diccionario con el que se guarda un modelo en JSON"""
+    formula = (
+        f"{output_col} = "
+        + " + ".join(
+            [
+                f"({coef:.6f} * {col})"
+                for coef, col in zip(modelo.coef_, input_cols)
+            ]
+        )
+        + f" + ({modelo.intercept_:.6f})"
+    )
+    return {
+        "descripcion": descripcion,
+        "entradas": list(input_cols),
+        "salida": output_col,
+        "formula": formula,
+        "coeficientes": [float(c) for c in modelo.coef_],
+        "intercepto": float(modelo.intercept_),
+        "metricas": metricas,
+    }
+
+
+def escribir_modelo(file_path, info_modelo):
+    """Escribe la información de un modelo en un archivo JSON"""
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(info_modelo, f, indent=4, ensure_ascii=False)
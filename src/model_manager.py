@@ -3,6 +3,7 @@ from tkinter import filedialog, messagebox, ttk
 import json
 import joblib
 import pickle
+from model_format import crear_info_modelo, escribir_modelo
 
 
 def guardar_modelo(modelo, input_cols, output_col, descripcion, metricas):
@@ -27,30 +28,13 @@ def guardar_modelo(modelo, input_cols, output_col, descripcion, metricas):
             )
             return
 
-        formula = (
-            f"{output_col} = "
-            + " + ".join(
-                [
-                    f"({coef:.6f} * {col})"
-                    for coef, col in zip(modelo.coef_, input_cols)
-                ]
-            )
-            + f" + ({modelo.intercept_:.6f})"
+        escribir_modelo(
+            file_path,
+            crear_info_modelo(
+                modelo, input_cols, output_col, descripcion, metricas
+            ),
         )
 
-        info_modelo = {
-            "descripcion": descripcion,
-            "entradas": input_cols,
-            "salida": output_col,
-            "formula": formula,
-            "coeficientes": [float(c) for c in modelo.coef_],
-            "intercepto": float(modelo.intercept_),
-            "metricas": metricas,
-        }
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(info_modelo, f, indent=4, ensure_ascii=False)
-
         desc_flag = (
             "con descripción"
             if (descripcion and descripcion.strip())
@@ -1,14 +1,21 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import numpy as np
+from dataset_loading import ejecutar_en_segundo_plano
+from out_of_core import DatosFueraDeMemoria
+from pipeline import detectar_faltantes, tratar_faltantes
 
 
 def manejo_datos_inexistentes(df, parent_frame, on_apply_callback):
-    """Maneja los datos inexistentes en el DataFrame según la opción seleccionada por el usuario"""
+    """Maneja los datos inexistentes en el DataFrame según la opción seleccionada por el usuario.
+
+    Con datos fuera de memoria los faltantes ya se contaron al volcarlos y los rellenos se
+    aplican al vuelo al recorrer los datos. En memoria el resultado es una versión derivada que
+    comparte las columnas sin faltantes con el paso anterior.
+    """
+    fuera_de_memoria = isinstance(df, DatosFueraDeMemoria)
 
     # Detección automática
-    missing_info = df.isnull().sum()
-    missing_cols = missing_info[missing_info > 0]
+    missing_cols = detectar_faltantes(df)
 
     if missing_cols.empty:
         messagebox.showinfo(
@@ -60,36 +67,21 @@ def manejo_datos_inexistentes(df, parent_frame, on_apply_callback):
         """Aplica la opción seleccionada para manejar los datos inexistentes"""
         try:
             seleccion = opcion.get()
-            df_result = df.copy()
-
-            if seleccion == "eliminar":
-                df_result.dropna(inplace=True)
-            elif seleccion == "media":
-                cols_numericas = df_result.select_dtypes(
-                    include=np.number
-                ).columns
-                df_result[cols_numericas] = df_result[cols_numericas].fillna(
-                    df_result[cols_numericas].mean()
-                )
-                # Eliminar filas con NaN residual (columnas completamente nulas)
-                df_result.dropna(inplace=True)
-            elif seleccion == "mediana":
-                cols_numericas = df_result.select_dtypes(
-                    include=np.number
-                ).columns
-                df_result[cols_numericas] = df_result[cols_numericas].fillna(
-                    df_result[cols_numericas].median()
-                )
-                # Eliminar filas con NaN residual (columnas completamente nulas)
-                df_result.dropna(inplace=True)
-            elif seleccion == "constante":
+            valor = None
+            if seleccion == "constante":
                 valor = simpledialog.askstring(
                     "Valor constante",
                     "Introduce el valor con el que deseas rellenar:",
                 )
                 if valor is None:
                     return
-                df_result.fillna(valor, inplace=True)
+            if fuera_de_memoria:
+                # Los rellenos se calculan recorriendo el almacén sin bloquear la interfaz
+                df_result = ejecutar_en_segundo_plano(
+                    parent_frame, tratar_faltantes, df, seleccion, valor
+                )
+            else:
+                df_result = tratar_faltantes(df, seleccion, valor)
 
             # Llama a la función 'callback' que guarda el DF y dibuja el Paso 3
             on_apply_callback(df_result)
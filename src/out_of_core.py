@@ -0,0 +1,408 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+import dataset_cache
+from cancellation import comprobar_cancelacion
+from dataset_readers import iterar_dataset
+
+# Modo fuera de memoria: los datos se vuelcan una vez a un almacén de columnas en disco
+# (un archivo float64 por columna, leído con memmap) y cada paso lo recorre por bloques
+
+# Filas de cada bloque al recorrer el almacén (8 MB por columna)
+FILAS_POR_BLOQUE_ALMACEN = 1_000_000
+
+# Filas que se muestran en la tabla y en los gráficos de cada conjunto
+FILAS_MUESTRA = 2000
+
+# Casillas del histograma con el que se estima la mediana
+CASILLAS_MEDIANA = 65536
+
+# Nombre del archivo con las columnas, el número de filas y las estadísticas del volcado
+ARCHIVO_METADATOS = "almacen.json"
+
+
+def directorio_almacenes():
+    """Directorio donde se crean los almacenes, dentro de la caché pero fuera de su expulsión LRU"""
+    return os.path.join(dataset_cache.DIRECTORIO_CACHE, "almacenes")
+
+
+class AlmacenColumnas:
+    """Almacén en disco de columnas numéricas que se leen con memmap sin cargarlas enteras"""
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        with open(os.path.join(directorio, ARCHIVO_METADATOS), encoding="utf-8") as f:
+            metadatos = json.load(f)
+        self.columnas = metadatos["columnas"]
+        self.filas = metadatos["filas"]
+        self.estadisticas = metadatos["estadisticas"]
+        self._mapas = {}
+
+    def __len__(self):
+        return self.filas
+
+    def columna(self, nombre):
+        """Devuelve la columna como array mapeado en memoria (solo lectura)"""
+        if nombre not in self._mapas:
+            if self.filas == 0:
+                # No se puede mapear un archivo vacío
+                self._mapas[nombre] = np.empty(0, dtype=np.float64)
+            else:
+                self._mapas[nombre] = np.memmap(
+                    os.path.join(
+                        self.directorio, f"{self.columnas.index(nombre)}.f64"
+                    ),
+                    dtype=np.float64,
+                    mode="r",
+                    shape=(self.filas,),
+                )
+        return self._mapas[nombre]
+
+    def bloques(self, columnas=None, filas_por_bloque=FILAS_POR_BLOQUE_ALMACEN):
+        """Recorre las columnas indicadas como matrices (filas, columnas) de tamaño acotado"""
+        mapas = [self.columna(c) for c in (columnas or self.columnas)]
+        for inicio in range(0, self.filas, filas_por_bloque):
+            fin = min(inicio + filas_por_bloque, self.filas)
+            yield np.column_stack([mapa[inicio:fin] for mapa in mapas])
+
+    def eliminar(self):
+        """Cierra los mapeos y borra el almacén del disco"""
+        self._mapas.clear()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+def _a_float(serie, columna):
+    """Convierte una columna a float64 (faltantes como NaN) o lanza ValueError si no es numérica"""
+    try:
+        numerica = pd.to_numeric(serie, errors="raise")
+    except (ValueError, TypeError):
+        raise ValueError(f"La columna '{columna}' contiene valores no numéricos.")
+    return numerica.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _acumular_estadisticas(estadisticas, valores):
+    """Suma al resumen de una columna los faltantes, la suma y el rango de un bloque"""
+    validos = valores[~np.isnan(valores)]
+    estadisticas["nulos"] += len(valores) - len(validos)
+    if len(validos) == 0:
+        return
+    estadisticas["cuenta"] += len(validos)
+    estadisticas["suma"] += float(validos.sum())
+    minimo, maximo = float(validos.min()), float(validos.max())
+    if estadisticas["minimo"] is None or minimo < estadisticas["minimo"]:
+        estadisticas["minimo"] = minimo
+    if estadisticas["maximo"] is None or maximo > estadisticas["maximo"]:
+        estadisticas["maximo"] = maximo
+
+
+def volcar_a_disco(
+    ruta,
+    columnas,
+    directorio=None,
+    progress_callback=None,
+    cancelacion=None,
+    **opciones,
+):
+    """Vuelca las columnas indicadas del dataset a un almacén en disco, bloque a bloque.
+
+    Cada columna se convierte a float64 y se añade a su propio archivo, de modo que la memoria
+    usada no depende del tamaño del dataset. Al mismo tiempo se cuentan los faltantes, la suma y el
+    rango de cada columna. Un valor no numérico detiene el volcado con ValueError.
+    """
+    if directorio is None:
+        os.makedirs(directorio_almacenes(), exist_ok=True)
+        directorio = tempfile.mkdtemp(prefix="almacen_", dir=directorio_almacenes())
+    else:
+        os.makedirs(directorio, exist_ok=True)
+    columnas = list(columnas)
+    estadisticas = {
+        c: {"nulos": 0, "cuenta": 0, "suma": 0.0, "minimo": None, "maximo": None}
+        for c in columnas
+    }
+    filas = 0
+    try:
+        archivos = [
+            open(os.path.join(directorio, f"{i}.f64"), "wb")
+            for i in range(len(columnas))
+        ]
+        try:
+            for bloque in iterar_dataset(
+                ruta, columnas, progress_callback, cancelacion, **opciones
+            ):
+                for col, archivo in zip(columnas, archivos):
+                    valores = _a_float(bloque[col], col)
+                    valores.tofile(archivo)
+                    _acumular_estadisticas(estadisticas[col], valores)
+                filas += len(bloque)
+        finally:
+            for archivo in archivos:
+                archivo.close()
+        with open(
+            os.path.join(directorio, ARCHIVO_METADATOS), "w", encoding="utf-8"
+        ) as f:
+            json.dump(
+                {"columnas": columnas, "filas": filas, "estadisticas": estadisticas},
+                f,
+            )
+    except BaseException:
+        # Un volcado incompleto o cancelado no deja archivos en disco
+        shutil.rmtree(directorio, ignore_errors=True)
+        raise
+    return AlmacenColumnas(directorio)
+
+
+class DatosFueraDeMemoria:
+    """Vista de un almacén con la selección, el preprocesado y la separación aplicados al vuelo.
+
+    Ningún paso copia los datos: cada uno devuelve una vista nueva que se materializa bloque a
+    bloque al recorrerla.
+    """
+
+    def __init__(
+        self,
+        almacen,
+        columnas=None,
+        rellenos=None,
+        eliminar_faltantes=False,
+        separacion=None,
+    ):
+        self.almacen = almacen
+        self.columnas = list(columnas or almacen.columnas)
+        self.rellenos = dict(rellenos or {})
+        self.eliminar_faltantes = eliminar_faltantes
+        # (fracción de test, semilla, "train" o "test"), o None si no está separado
+        self.separacion = separacion
+
+    def seleccionar(self, columnas):
+        """Devuelve una vista con solo las columnas indicadas, en ese orden"""
+        return DatosFueraDeMemoria(
+            self.almacen,
+            columnas,
+            self.rellenos,
+            self.eliminar_faltantes,
+            self.separacion,
+        )
+
+    def preprocesar(self, rellenos):
+        """Devuelve una vista que rellena los faltantes indicados y descarta las filas con NaN residual"""
+        return DatosFueraDeMemoria(
+            self.almacen, self.columnas, rellenos, True, self.separacion
+        )
+
+    def separar(self, fraccion_test, semilla=None):
+        """Separa en entrenamiento y test sin copiar: cada fila va a test con probabilidad fraccion_test.
+
+        El sorteo se hace sobre las filas del almacén con un generador con semilla, así que las dos
+        vistas son complementarias y no dependen del tamaño de bloque.
+        """
+        if semilla is None:
+            semilla = int(np.random.SeedSequence().entropy % 2**32)
+        return tuple(
+            DatosFueraDeMemoria(
+                self.almacen,
+                self.columnas,
+                self.rellenos,
+                self.eliminar_faltantes,
+                (fraccion_test, semilla, conjunto),
+            )
+            for conjunto in ("train", "test")
+        )
+
+    def _bloques_con_sorteo(self, filas_por_bloque, cancelacion):
+        """Recorre el almacén junto con la máscara de test de cada bloque (None sin separación)"""
+        generador = (
+            np.random.default_rng(self.separacion[1]) if self.separacion else None
+        )
+        for matriz in self.almacen.bloques(self.columnas, filas_por_bloque):
+            comprobar_cancelacion(cancelacion)
+            en_test = (
+                generador.random(len(matriz)) < self.separacion[0]
+                if generador is not None
+                else None
+            )
+            yield matriz, en_test
+
+    def _transformar(self, matriz):
+        """Aplica los rellenos y descarta las filas con faltantes si se pidió"""
+        for i, col in enumerate(self.columnas):
+            if col in self.rellenos:
+                faltantes = np.isnan(matriz[:, i])
+                matriz[faltantes, i] = self.rellenos[col]
+        if self.eliminar_faltantes:
+            matriz = matriz[~np.isnan(matriz).any(axis=1)]
+        return matriz
+
+    def bloques(self, filas_por_bloque=FILAS_POR_BLOQUE_ALMACEN, cancelacion=None):
+        """Recorre las filas de la vista como matrices float64 con las columnas en orden"""
+        for matriz, en_test in self._bloques_con_sorteo(filas_por_bloque, cancelacion):
+            if en_test is not None:
+                matriz = matriz[en_test if self.separacion[2] == "test" else ~en_test]
+            yield self._transformar(matriz)
+
+    def contar_separacion(self, cancelacion=None):
+        """Cuenta en una sola pasada las filas de entrenamiento y de test de una vista separada"""
+        filas = {"train": 0, "test": 0}
+        for matriz, en_test in self._bloques_con_sorteo(
+            FILAS_POR_BLOQUE_ALMACEN, cancelacion
+        ):
+            filas["test"] += len(self._transformar(matriz[en_test]))
+            filas["train"] += len(self._transformar(matriz[~en_test]))
+        return filas["train"], filas["test"]
+
+    def muestra(self, filas=FILAS_MUESTRA):
+        """Devuelve las primeras filas de la vista como DataFrame (para tablas y gráficos)"""
+        partes = []
+        reunidas = 0
+        for matriz in self.bloques(filas_por_bloque=max(filas, 1)):
+            partes.append(matriz[: filas - reunidas])
+            reunidas += len(partes[-1])
+            if reunidas >= filas:
+                break
+        datos = (
+            np.concatenate(partes) if partes else np.empty((0, len(self.columnas)))
+        )
+        return pd.DataFrame(datos, columns=self.columnas)
+
+
+def contar_faltantes(datos):
+    """Faltantes por columna (como df.isnull().sum()); ya se contaron al volcar, no se recorre el almacén"""
+    return pd.Series(
+        {c: datos.almacen.estadisticas[c]["nulos"] for c in datos.columnas},
+        dtype="int64",
+    )
+
+
+def _medianas_aproximadas(datos, columnas, cancelacion=None):
+    """Estima la mediana de cada columna en una pasada con un histograma sobre su rango"""
+    estadisticas = datos.almacen.estadisticas
+    rangos = {c: (estadisticas[c]["minimo"], estadisticas[c]["maximo"]) for c in columnas}
+    cuentas = {c: np.zeros(CASILLAS_MEDIANA, dtype=np.int64) for c in columnas}
+    for matriz in datos.almacen.bloques(columnas):
+        comprobar_cancelacion(cancelacion)
+        for j, col in enumerate(columnas):
+            valores = matriz[:, j]
+            cuentas[col] += np.histogram(
+                valores[~np.isnan(valores)], bins=CASILLAS_MEDIANA, range=rangos[col]
+            )[0]
+
+    medianas = {}
+    for col in columnas:
+        minimo, maximo = rangos[col]
+        if minimo == maximo:
+            medianas[col] = minimo
+            continue
+        acumuladas = np.cumsum(cuentas[col])
+        mitad = acumuladas[-1] / 2
+        casilla = int(np.searchsorted(acumuladas, mitad))
+        anteriores = acumuladas[casilla - 1] if casilla > 0 else 0
+        # Interpolación lineal dentro de la casilla que contiene la mitad de los valores
+        ancho = (maximo - minimo) / CASILLAS_MEDIANA
+        fraccion = (mitad - anteriores) / max(cuentas[col][casilla], 1)
+        medianas[col] = minimo + (casilla + fraccion) * ancho
+    return medianas
+
+
+def calcular_rellenos(datos, metodo, valor=None, cancelacion=None):
+    """Calcula el valor de relleno de cada columna para el método del paso de preprocesado.
+
+    La media sale de las sumas del volcado; la mediana se estima con un histograma en una pasada.
+    Las columnas sin ningún valor no se rellenan (sus filas se descartan después).
+    """
+    estadisticas = datos.almacen.estadisticas
+    con_valores = [c for c in datos.columnas if estadisticas[c]["cuenta"] > 0]
+    if metodo == "eliminar":
+        return {}
+    if metodo == "media":
+        return {
+            c: estadisticas[c]["suma"] / estadisticas[c]["cuenta"] for c in con_valores
+        }
+    if metodo == "mediana":
+        return _medianas_aproximadas(datos, con_valores, cancelacion)
+    if metodo == "constante":
+        try:
+            constante = float(valor)
+        except (TypeError, ValueError):
+            raise ValueError(
+                "En el modo fuera de memoria el valor constante debe ser numérico."
+            )
+        return {c: constante for c in datos.columnas}
+    raise ValueError(f"Método de preprocesado desconocido: {metodo}")
+
+
+def _r2(suma_errores, suma_total):
+    """Coeficiente R² a partir de las sumas de cuadrados (mismo criterio que r2_score sin varianza)"""
+    if suma_total == 0:
+        return 1.0 if suma_errores == 0 else 0.0
+    return 1.0 - suma_errores / suma_total
+
+
+def ajustar_regresion(datos, cancelacion=None):
+    """Ajusta una regresión lineal a partir de estadísticos suficientes acumulados por bloques.
+
+    La última columna de la vista es la salida. Se acumulan Z'Z, Z'y e y'y (Z son las entradas
+    con una columna de unos), centradas en la media del primer bloque para que el sistema esté
+    bien condicionado, y se resuelven las ecuaciones normales. El R² y el ECM de entrenamiento
+    salen de los mismos estadísticos, sin otra pasada.
+    Devuelve un LinearRegression de sklearn, el R² y el ECM de entrenamiento.
+    """
+    k = len(datos.columnas) - 1
+    centro = None
+    ztz = np.zeros((k + 1, k + 1))
+    zty = np.zeros(k + 1)
+    yty = 0.0
+    for matriz in datos.bloques(cancelacion=cancelacion):
+        if len(matriz) == 0:
+            continue
+        if centro is None:
+            centro = matriz.mean(axis=0)
+        z = matriz - centro
+        y = z[:, -1].copy()
+        # La columna de salida se sustituye por la de unos del término independiente
+        z[:, -1] = 1.0
+        ztz += z.T @ z
+        zty += z.T @ y
+        yty += float(y @ y)
+    if centro is None:
+        raise ValueError("El conjunto de entrenamiento no tiene filas.")
+
+    beta = np.linalg.lstsq(ztz, zty, rcond=None)[0]
+    n = ztz[-1, -1]
+    suma_errores = max(yty - 2 * beta @ zty + beta @ ztz @ beta, 0.0)
+    suma_total = yty - zty[-1] ** 2 / n
+
+    modelo = LinearRegression()
+    modelo.coef_ = beta[:-1]
+    modelo.intercept_ = float(centro[-1] + beta[-1] - beta[:-1] @ centro[:-1])
+    modelo.n_features_in_ = k
+    modelo.feature_names_in_ = np.array(datos.columnas[:-1], dtype=object)
+    return modelo, _r2(suma_errores, suma_total), suma_errores / n
+
+
+def evaluar_regresion(modelo, datos, cancelacion=None):
+    """Calcula el R² y el ECM del modelo sobre la vista en una pasada por bloques"""
+    n = 0
+    centro = None
+    suma_errores = 0.0
+    suma_y = 0.0
+    suma_y2 = 0.0
+    for matriz in datos.bloques(cancelacion=cancelacion):
+        if len(matriz) == 0:
+            continue
+        y = matriz[:, -1]
+        if centro is None:
+            centro = float(y.mean())
+        residuos = y - (matriz[:, :-1] @ modelo.coef_ + modelo.intercept_)
+        suma_errores += float(residuos @ residuos)
+        desviaciones = y - centro
+        suma_y += float(desviaciones.sum())
+        suma_y2 += float(desviaciones @ desviaciones)
+        n += len(matriz)
+    if n == 0:
+        raise ValueError("El conjunto de test no tiene filas.")
+    return _r2(suma_errores, suma_y2 - suma_y**2 / n), suma_errores / n
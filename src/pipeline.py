@@ -0,0 +1,335 @@
+import time
+import pandas as pd
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from cancellation import comprobar_cancelacion
+from dataset_lineage import como_version, materializar
+from dataset_readers import leer_dataset
+from type_profile import perfil_tipos
+from out_of_core import (
+    DatosFueraDeMemoria,
+    ajustar_regresion,
+    calcular_rellenos,
+    contar_faltantes,
+    evaluar_regresion,
+    volcar_a_disco,
+)
+
+# API sin interfaz gráfica del flujo carga -> selección -> faltantes -> separación -> entrenamiento.
+# Cada etapa devuelve datos o modelos y lanza excepciones (ValueError para entradas inválidas) en
+# lugar de mostrar diálogos; las pantallas de Tk solo recogen los valores y muestran los errores.
+
+ESTRATEGIAS_FALTANTES = ("eliminar", "media", "mediana", "constante")
+FILAS_MINIMAS_SEPARACION = 5
+
+
+class DatosInsuficientes(ValueError):
+    """Se lanza cuando no quedan filas suficientes para separar los datos"""
+
+
+def cargar_datos(
+    ruta,
+    columnas=None,
+    fuera_de_memoria=False,
+    progress_callback=None,
+    cancelacion=None,
+    **opciones,
+):
+    """Carga un dataset como DataFrame o, fuera de memoria, lo vuelca a un almacén en disco.
+
+    Las opciones (tabla, consulta, hoja, hojas, archivos, usar_cache) se pasan al lector. Quien carga
+    datos fuera de memoria debe liberar su almacén con datos.almacen.eliminar().
+    """
+    if not fuera_de_memoria:
+        return leer_dataset(
+            ruta,
+            progress_callback,
+            columnas=columnas,
+            cancelacion=cancelacion,
+            **opciones,
+        )
+    if not columnas:
+        raise ValueError("El modo fuera de memoria necesita las columnas a volcar.")
+    opciones.pop("usar_cache", None)
+    almacen = volcar_a_disco(
+        ruta,
+        columnas,
+        progress_callback=progress_callback,
+        cancelacion=cancelacion,
+        **opciones,
+    )
+    return DatosFueraDeMemoria(almacen)
+
+
+def columnas_no_numericas(df, columnas):
+    """Devuelve las columnas con algún valor no vacío que no se puede convertir a número.
+
+    Se consulta el perfil de tipos del DataFrame, que analiza cada columna una sola vez.
+    """
+    return list(perfil_tipos(df).no_numericas(columnas))
+
+
+def validar_seleccion(entradas, salida):
+    """Comprueba que haya entradas, una salida y que la salida no sea también una entrada"""
+    if not entradas:
+        raise ValueError("Selecciona al menos una columna de entrada.")
+    if not salida:
+        raise ValueError("Selecciona una columna de salida.")
+    if salida in entradas:
+        raise ValueError("La salida no puede ser una entrada.")
+
+
+def seleccionar_columnas(datos, entradas, salida):
+    """Valida la selección y devuelve una versión de los datos con las entradas y la salida al final"""
+    entradas = list(entradas)
+    validar_seleccion(entradas, salida)
+    todas_columnas = entradas + [salida]
+    if isinstance(datos, DatosFueraDeMemoria):
+        # Las columnas ya se validaron al volcarlas
+        return datos.seleccionar(todas_columnas)
+
+    faltan = [c for c in todas_columnas if c not in datos.columns]
+    if faltan:
+        raise ValueError(f"Columnas inexistentes: {', '.join(map(str, faltan))}")
+    no_numericas = perfil_tipos(datos).no_numericas(todas_columnas)
+    if no_numericas:
+        raise ValueError(
+            "Las siguientes columnas contienen valores no numéricos:\n\n"
+            + "\n".join(
+                f"• {col}: {perfil['valor']!r} en la fila {perfil['fila']}"
+                for col, perfil in no_numericas.items()
+            )
+            + "\n\nPor favor, selecciona solo columnas con valores numéricos o vacíos."
+        )
+    # Versión derivada: comparte las columnas con el DataFrame cargado en lugar de copiarlas
+    return como_version(datos).seleccionar(todas_columnas)
+
+
+def detectar_faltantes(datos):
+    """Devuelve los valores faltantes de las columnas que tienen alguno"""
+    if isinstance(datos, DatosFueraDeMemoria):
+        faltantes = contar_faltantes(datos)
+    else:
+        faltantes = como_version(datos).faltantes()
+    return faltantes[faltantes > 0]
+
+
+def tratar_faltantes(datos, estrategia, valor=None, cancelacion=None):
+    """Aplica la estrategia de faltantes: eliminar filas o rellenar con media, mediana o constante.
+
+    Las estrategias de media y mediana solo rellenan columnas numéricas y después descartan las
+    filas con NaN residual (columnas completamente nulas).
+    """
+    if estrategia not in ESTRATEGIAS_FALTANTES:
+        raise ValueError(f"Método de preprocesado desconocido: {estrategia}")
+    if estrategia == "constante" and valor is None:
+        raise ValueError("Indica el valor constante con el que rellenar.")
+    if isinstance(datos, DatosFueraDeMemoria):
+        return datos.preprocesar(
+            calcular_rellenos(datos, estrategia, valor, cancelacion)
+        )
+
+    version = como_version(datos)
+    faltantes = detectar_faltantes(version)
+    if faltantes.empty:
+        return version
+    if estrategia == "eliminar":
+        return version.filtrar(version.filas_completas(), "Eliminar faltantes")
+    if estrategia == "constante":
+        return version.rellenar(
+            {c: valor for c in faltantes.index}, "Relleno constante"
+        )
+
+    df = version.materializar()
+    cols_numericas = [
+        c
+        for c in faltantes.index
+        if pd.api.types.is_numeric_dtype(df[c])
+        and not pd.api.types.is_bool_dtype(df[c])
+    ]
+    resultado = version.rellenar(
+        {
+            c: df[c].mean() if estrategia == "media" else df[c].median()
+            for c in cols_numericas
+        },
+        f"Relleno con la {estrategia}",
+    )
+    completas = resultado.filas_completas()
+    if not completas.all():
+        resultado = resultado.filtrar(completas, "Eliminar faltantes")
+    return resultado
+
+
+def separar_conjuntos(datos, porcentaje_entrenamiento, semilla=None, cancelacion=None):
+    """Separa los datos en entrenamiento y test.
+
+    Devuelve (train, test, filas_train, filas_test). En memoria se sortean posiciones con
+    train_test_split; fuera de memoria cada fila se sortea al recorrer el almacén.
+    """
+    porcentaje_entrenamiento = float(porcentaje_entrenamiento)
+    if not (0 < porcentaje_entrenamiento < 100):
+        raise ValueError("El porcentaje debe estar entre 0 y 100.")
+    fraccion_test = (100 - porcentaje_entrenamiento) / 100
+
+    if isinstance(datos, DatosFueraDeMemoria):
+        train, test = datos.separar(fraccion_test, semilla)
+        filas_train, filas_test = train.contar_separacion(cancelacion)
+        filas = filas_train + filas_test
+    else:
+        version = como_version(datos)
+        filas = len(version)
+    if filas < FILAS_MINIMAS_SEPARACION:
+        raise DatosInsuficientes(
+            "No hay suficientes datos para realizar la separación "
+            f"(mínimo {FILAS_MINIMAS_SEPARACION} filas)."
+        )
+
+    if not isinstance(datos, DatosFueraDeMemoria):
+        # Se sortean posiciones (mismo reparto que sobre el DataFrame) y cada conjunto
+        # es una versión que comparte los datos del paso anterior
+        pos_train, pos_test = train_test_split(
+            np.arange(filas), test_size=fraccion_test, random_state=semilla
+        )
+        train = version.tomar(pos_train, "Entrenamiento")
+        test = version.tomar(pos_test, "Test")
+        filas_train, filas_test = len(train), len(test)
+    return train, test, filas_train, filas_test
+
+
+def entrenar_modelo(train, test, cancelacion=None):
+    """Entrena la regresión lineal con la última columna como salida y la evalúa en test.
+
+    Devuelve un diccionario con el modelo, las columnas, las métricas (mismas claves que el modelo
+    guardado) y los datos y predicciones de cada conjunto; fuera de memoria son una muestra.
+    """
+    if isinstance(train, DatosFueraDeMemoria):
+        salida = train.columnas[-1]
+        entradas = train.columnas[:-1]
+        modelo, r2_train, ecm_train = ajustar_regresion(train, cancelacion)
+        r2_test, ecm_test = evaluar_regresion(modelo, test, cancelacion)
+        datos_train = train.muestra()
+        datos_test = test.muestra()
+        pred_train = modelo.predict(datos_train[entradas])
+        pred_test = modelo.predict(datos_test[entradas])
+    else:
+        # Validar que no haya NaN en los datos antes de materializarlos (con el índice de
+        # faltantes, sin recorrerlos)
+        faltantes = detectar_faltantes(train)
+        if not faltantes.empty:
+            nan_cols = [str(c) for c in faltantes.index]
+            raise ValueError(
+                f"Los datos contienen valores faltantes en las columnas: {', '.join(nan_cols)}. "
+                "Por favor, revisa el paso de preprocesado de datos."
+            )
+        datos_train = materializar(train)
+        datos_test = materializar(test)
+        salida = datos_train.columns[-1]
+        entradas = list(datos_train.columns[:-1])
+
+        X_train = datos_train[entradas]
+        y_train = datos_train[salida]
+        X_test = datos_test[entradas]
+        y_test = datos_test[salida]
+
+        modelo = LinearRegression()
+        modelo.fit(X_train, y_train)
+        comprobar_cancelacion(cancelacion)
+
+        pred_train = modelo.predict(X_train)
+        pred_test = modelo.predict(X_test)
+        comprobar_cancelacion(cancelacion)
+
+        r2_train = r2_score(y_train, pred_train)
+        ecm_train = mean_squared_error(y_train, pred_train)
+        r2_test = r2_score(y_test, pred_test)
+        ecm_test = mean_squared_error(y_test, pred_test)
+
+    return {
+        "modelo": modelo,
+        "entradas": list(entradas),
+        "salida": salida,
+        "metricas": {
+            "r2_train": float(r2_train),
+            "r2_test": float(r2_test),
+            "ecm_train": float(ecm_train),
+            "ecm_test": float(ecm_test),
+        },
+        "datos_train": datos_train,
+        "datos_test": datos_test,
+        "pred_train": pred_train,
+        "pred_test": pred_test,
+    }
+
+
+def ejecutar_flujo(
+    ruta,
+    entradas,
+    salida,
+    estrategia="eliminar",
+    porcentaje_entrenamiento=80,
+    semilla=None,
+    valor=None,
+    fuera_de_memoria=False,
+    cancelacion=None,
+    **opciones,
+):
+    """Ejecuta el flujo completo sobre un dataset y devuelve el resultado de entrenar_modelo.
+
+    Solo se cargan las columnas seleccionadas. El resultado incluye además las filas cargadas y de
+    cada conjunto y los segundos de cada etapa en resultado["tiempos"]. Al ser una función de módulo
+    sin estado de interfaz, se puede lanzar en un pool de procesos; fuera de memoria el almacén se
+    elimina al terminar.
+    """
+    tiempos = {}
+    columnas = list(entradas) + [salida]
+    datos = _medir(
+        tiempos,
+        "carga",
+        cargar_datos,
+        ruta,
+        columnas,
+        fuera_de_memoria,
+        cancelacion=cancelacion,
+        **opciones,
+    )
+    try:
+        seleccion = _medir(
+            tiempos, "seleccion", seleccionar_columnas, datos, entradas, salida
+        )
+        procesados = _medir(
+            tiempos, "faltantes", tratar_faltantes, seleccion, estrategia, valor, cancelacion
+        )
+        train, test, filas_train, filas_test = _medir(
+            tiempos,
+            "separacion",
+            separar_conjuntos,
+            procesados,
+            porcentaje_entrenamiento,
+            semilla,
+            cancelacion,
+        )
+        resultado = _medir(
+            tiempos, "entrenamiento", entrenar_modelo, train, test, cancelacion
+        )
+    finally:
+        if isinstance(datos, DatosFueraDeMemoria):
+            datos.almacen.eliminar()
+    tiempos["total"] = sum(tiempos.values())
+    resultado["tiempos"] = tiempos
+    resultado["filas"] = {
+        "cargadas": len(datos.almacen if isinstance(datos, DatosFueraDeMemoria) else datos),
+        "train": filas_train,
+        "test": filas_test,
+    }
+    return resultado
+
+
+def _medir(tiempos, paso, funcion, *args, **kwargs):
+    """Ejecuta una etapa y guarda en tiempos los segundos que ha tardado"""
+    inicio = time.perf_counter()
+    try:
+        return funcion(*args, **kwargs)
+    finally:
+        tiempos[paso] = time.perf_counter() - inicio
@@ -0,0 +1,128 @@
+import operator
+import numpy as np
+import pandas as pd
+from dataset_lineage import como_version
+
+# Orden y filtros de la tabla de datos: el resultado es una versión derivada de los datos
+# mostrados que la tabla virtual recorre como cualquier otra
+
+OPERADORES = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    "=": operator.eq,
+}
+
+
+def mascara_condicion(serie, condicion):
+    """Máscara de las filas de una columna que cumplen una condición escrita por el usuario.
+
+    La condición es un operador (>=, <=, !=, >, <, =) seguido de un valor, o solo un texto, que
+    selecciona los valores que lo contienen sin distinguir mayúsculas. Los faltantes no cumplen
+    ninguna condición.
+    """
+    texto = condicion.strip()
+    simbolo = next((o for o in OPERADORES if texto.startswith(o)), None)
+    valor = texto[len(simbolo):].strip() if simbolo else texto
+    if not valor:
+        raise ValueError("La condición del filtro no tiene valor.")
+
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Se evalúa sobre las categorías y se expande con los códigos (-1 es faltante)
+        por_categoria = mascara_condicion(pd.Series(serie.cat.categories), condicion)
+        return np.append(por_categoria, False)[serie.cat.codes.to_numpy()]
+
+    presentes = serie.notna().to_numpy()
+    if simbolo is None:
+        contiene = serie.astype(str).str.contains(valor, case=False, regex=False)
+        return contiene.to_numpy(dtype=bool) & presentes
+
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        try:
+            numero = float(valor)
+        except ValueError:
+            raise ValueError(
+                f"La columna {serie.name} es numérica y '{valor}' no es un número."
+            )
+        valores = serie.to_numpy(dtype=float, na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            return OPERADORES[simbolo](valores, numero) & presentes
+    return OPERADORES[simbolo](serie.astype(str), valor).to_numpy(dtype=bool) & presentes
+
+
+class ConsultaTabla:
+    """Orden y filtros por columna aplicados a los datos que muestra la tabla.
+
+    Las permutaciones de orden se guardan en la versión de los datos (VersionDataset.orden) y la
+    máscara de cada filtro en la consulta, así que cambiar el sentido del orden o añadir un filtro
+    solo combina arrays ya calculados.
+    """
+
+    def __init__(self, datos):
+        self.datos = datos
+        self.version = como_version(datos)
+        # (columna, descendente) o None
+        self.orden = None
+        # Condición de cada columna filtrada
+        self.filtros = {}
+        self._mascaras = {}
+        self._resultado = None
+
+    def activa(self):
+        """Indica si hay orden o filtros que aplicar"""
+        return self.orden is not None or bool(self.filtros)
+
+    def ordenar(self, columna):
+        """Ordena por una columna; si ya se ordenaba por ella de forma ascendente, la invierte"""
+        self.orden = (columna, self.orden == (columna, False))
+        self._resultado = None
+
+    def filtrar(self, columna, condicion):
+        """Añade o sustituye el filtro de una columna; una condición vacía lo quita.
+
+        Lanza ValueError si la condición no es válida para la columna.
+        """
+        condicion = condicion.strip()
+        if condicion:
+            self._mascara(columna, condicion)
+            self.filtros[columna] = condicion
+        else:
+            self.filtros.pop(columna, None)
+            self._mascaras.pop(columna, None)
+        self._resultado = None
+
+    def quitar_filtros(self):
+        """Elimina todos los filtros y el orden"""
+        self.orden = None
+        self.filtros = {}
+        self._mascaras = {}
+        self._resultado = None
+
+    def _mascara(self, columna, condicion):
+        """Máscara de un filtro, calculada solo si su condición cambió"""
+        guardada = self._mascaras.get(columna)
+        if guardada is None or guardada[0] != condicion:
+            guardada = (condicion, mascara_condicion(self.version.columna(columna), condicion))
+            self._mascaras[columna] = guardada
+        return guardada[1]
+
+    def resultado(self):
+        """Versión con las filas que pasan los filtros en el orden pedido"""
+        if self._resultado is None:
+            if not self.activa():
+                self._resultado = self.version
+                return self._resultado
+            mascara = None
+            for columna, condicion in self.filtros.items():
+                filtro = self._mascara(columna, condicion)
+                mascara = filtro if mascara is None else mascara & filtro
+            if self.orden is None:
+                posiciones = np.flatnonzero(mascara)
+            else:
+                posiciones = self.version.orden(*self.orden)
+                if mascara is not None:
+                    posiciones = posiciones[mascara[posiciones]]
+            self._resultado = self.version.tomar(posiciones, paso="Orden y filtros de la tabla")
+        return self._resultado
@@ -0,0 +1,340 @@
+import math
+from cell_format import CacheFormato
+
+# Tabla virtualizada sobre un canvas de Tkinter: solo existen elementos para las celdas visibles
+
+ALTO_FILA = 25
+ALTO_CABECERA = 30
+# Filas que se leen de más por encima y por debajo de las visibles al pedir datos a la fuente
+MARGEN_FILAS = 50
+ANCHO_MINIMO_COLUMNA = 120
+ANCHO_COLUMNA_POR_DEFECTO = 150
+COLOR_ENTRADA = "#CCFFCC"  # Verde claro
+COLOR_SALIDA = "#FFCCCC"  # Rojo claro
+COLOR_BORDE = "#CCCCCC"
+COLOR_CABECERA = "#F0F0F0"
+COLORES_FILAS = ("white", "#F9F9F9")
+# Marca que se añade a la cabecera de la columna por la que se ordena (ascendente, descendente)
+MARCAS_ORDEN = (" ▲", " ▼")
+# Milisegundos sin cambios de tamaño antes de recolocar la tabla
+RETARDO_REDIMENSION = 100
+
+
+def calcular_ancho_columna(ancho_vista, num_columnas):
+    """Reparte el ancho visible entre las columnas sin bajar del ancho mínimo"""
+    if ancho_vista <= 1 or num_columnas == 0:
+        return ANCHO_COLUMNA_POR_DEFECTO
+    return max(ANCHO_MINIMO_COLUMNA, ancho_vista // num_columnas)
+
+
+def desplazar(argumentos, actual, total, visibles, unidad=1):
+    """Nueva posición tras un comando de barra de scroll ("moveto", f) o ("scroll", n, tipo).
+
+    Las posiciones van de 0 a total - visibles; "units" avanza la unidad y "pages" lo visible.
+    """
+    if argumentos[0] == "moveto":
+        posicion = int(float(argumentos[1]) * total)
+    else:
+        paso = visibles if argumentos[2] == "pages" else unidad
+        posicion = actual + int(argumentos[1]) * paso
+    return max(0, min(posicion, total - visibles))
+
+
+def rango_columnas(x_inicio, ancho_vista, ancho_columna, num_columnas):
+    """Índices [inicio, fin) de las columnas que se ven desde la posición horizontal x_inicio"""
+    inicio = min(x_inicio // ancho_columna, num_columnas)
+    fin = min(math.ceil((x_inicio + ancho_vista) / ancho_columna), num_columnas)
+    return inicio, max(inicio, fin)
+
+
+class TablaVirtual:
+    """Tabla que dibuja en el canvas solo las celdas que caben en la vista.
+
+    El canvas no se desplaza: las barras de scroll mueven una ventana sobre la fuente de datos
+    y los elementos del canvas (rectángulo y texto de cada celda) se reutilizan cambiando su texto y
+    color, de modo que el coste de redibujar no depende del tamaño del dataset. Las filas se piden a
+    la fuente por bloques con un margen alrededor de las visibles y su texto se guarda en una caché
+    por fuente, columna y bloque de filas. Los fondos llevan etiquetas por posición de columna en la
+    vista para poder recolorear una columna entera con una sola llamada.
+    """
+
+    def __init__(self, canvas, scroll_y, scroll_x):
+        self.canvas = canvas
+        self.scroll_y = scroll_y
+        self.scroll_x = scroll_x
+        self.fuente = None
+        self.ancho_columna = ANCHO_COLUMNA_POR_DEFECTO
+        self.columnas_entrada = []
+        self.columna_salida = None
+        # (columna, descendente) por la que están ordenados los datos, o None
+        self.orden = None
+        self.fila_inicio = 0
+        self.x_inicio = 0
+        # Filas leídas de la fuente: (primera fila, DataFrame)
+        self._bloque = None
+        self.formatos = CacheFormato()
+        # Elementos reutilizables: cabeceras [(rect, texto)] y celdas por fila [[(rect, texto)]]
+        self._cabeceras = []
+        self._celdas = []
+        # Filas y columnas de elementos que están a la vista
+        self._en_uso = (0, 0)
+        # Primera columna de los datos que está a la vista
+        self._primera_columna = 0
+        # Identificador del ajuste de tamaño programado con after, si hay uno pendiente
+        self._redimension_pendiente = None
+        scroll_y.configure(command=self.yview)
+        scroll_x.configure(command=self.xview)
+
+    def mostrar(
+        self, fuente, ancho_columna, columnas_entrada=None, columna_salida=None, orden=None
+    ):
+        """Muestra una fuente de datos desde su primera fila"""
+        self._cancelar_redimension()
+        self.fuente = fuente
+        self.ancho_columna = ancho_columna
+        self.columnas_entrada = list(columnas_entrada or [])
+        self.columna_salida = columna_salida
+        self.orden = orden
+        self.fila_inicio = 0
+        self.x_inicio = 0
+        self._bloque = None
+        self.redibujar()
+
+    def colorear(self, columnas_entrada, columna_salida):
+        """Cambia las columnas seleccionadas actualizando solo el fondo de las columnas afectadas"""
+        if self.fuente is None:
+            self.columnas_entrada = list(columnas_entrada or [])
+            self.columna_salida = columna_salida
+            return
+        num_columnas = self._en_uso[1]
+        columnas = self.fuente.columnas[
+            self._primera_columna : self._primera_columna + num_columnas
+        ]
+        antes = [self._color_columna(columna) for columna in columnas]
+        self.columnas_entrada = list(columnas_entrada or [])
+        self.columna_salida = columna_salida
+        for j, columna in enumerate(columnas):
+            color = self._color_columna(columna)
+            if color == antes[j]:
+                continue
+            self.canvas.itemconfigure(f"cabecera{j}", fill=color or COLOR_CABECERA)
+            for paridad in (0, 1):
+                self.canvas.itemconfigure(
+                    f"fondo{j}_{paridad}",
+                    fill=color or COLORES_FILAS[(self.fila_inicio + paridad) % 2],
+                )
+
+    def limpiar(self):
+        """Vacía la tabla y elimina sus elementos del canvas"""
+        self._cancelar_redimension()
+        self.fuente = None
+        self._bloque = None
+        self._cabeceras = []
+        self._celdas = []
+        self._en_uso = (0, 0)
+        self._primera_columna = 0
+        self.canvas.delete("all")
+        self.scroll_y.set(0, 1)
+        self.scroll_x.set(0, 1)
+
+    def redimensionar(self):
+        """Programa el ajuste al nuevo tamaño del canvas.
+
+        Las peticiones que llegan antes de que venza el retardo sustituyen a la pendiente, de modo
+        que arrastrar el borde de la ventana produce un único ajuste al soltarlo.
+        """
+        self._cancelar_redimension()
+        self._redimension_pendiente = self.canvas.after(
+            RETARDO_REDIMENSION, self._ajustar_tamano
+        )
+
+    def _cancelar_redimension(self):
+        """Descarta el ajuste de tamaño pendiente, si lo hay"""
+        if self._redimension_pendiente is not None:
+            self.canvas.after_cancel(self._redimension_pendiente)
+            self._redimension_pendiente = None
+
+    def _ajustar_tamano(self):
+        """Reparte el ancho entre las columnas y recoloca la vista sin volver a su inicio"""
+        self._redimension_pendiente = None
+        if self.fuente is None:
+            return
+        ancho_columna = calcular_ancho_columna(
+            self._tamano_vista()[0], len(self.fuente.columnas)
+        )
+        # Conservar la columna que se estaba viendo
+        self.x_inicio = self.x_inicio * ancho_columna // self.ancho_columna
+        self.ancho_columna = ancho_columna
+        self.redibujar()
+
+    def columna_en(self, x, y):
+        """Columna cuya cabecera está en el punto (x, y) del canvas, o None si no hay ninguna"""
+        if self.fuente is None or not 0 <= y <= ALTO_CABECERA:
+            return None
+        indice = (self.x_inicio + x) // self.ancho_columna
+        columnas = self.fuente.columnas
+        return columnas[indice] if 0 <= indice < len(columnas) else None
+
+    def _tamano_vista(self):
+        """Ancho y alto del canvas en píxeles"""
+        return max(self.canvas.winfo_width(), 1), max(self.canvas.winfo_height(), 1)
+
+    def filas_visibles(self):
+        """Número de filas que caben bajo la cabecera"""
+        return max(1, math.ceil((self._tamano_vista()[1] - ALTO_CABECERA) / ALTO_FILA))
+
+    def yview(self, *argumentos):
+        """Comando de la barra vertical: desplaza la ventana de filas"""
+        if self.fuente is None:
+            return
+        self.fila_inicio = desplazar(
+            argumentos, self.fila_inicio, len(self.fuente), self.filas_visibles()
+        )
+        self.redibujar()
+
+    def xview(self, *argumentos):
+        """Comando de la barra horizontal: desplaza la vista en píxeles"""
+        if self.fuente is None:
+            return
+        self.x_inicio = desplazar(
+            argumentos,
+            self.x_inicio,
+            len(self.fuente.columnas) * self.ancho_columna,
+            self._tamano_vista()[0],
+            unidad=max(1, self.ancho_columna // 2),
+        )
+        self.redibujar()
+
+    def _filas(self, inicio, fin):
+        """Devuelve las filas [inicio, fin) leyendo de la fuente solo si no están en el bloque actual"""
+        fin = min(fin, len(self.fuente))
+        if self._bloque is not None:
+            primera, datos = self._bloque
+            if primera <= inicio and fin <= primera + len(datos):
+                return datos.iloc[inicio - primera : fin - primera]
+        primera = max(0, inicio - MARGEN_FILAS)
+        datos = self.fuente.obtener_filas(
+            primera, min(len(self.fuente), fin + MARGEN_FILAS)
+        )
+        self._bloque = (primera, datos)
+        return datos.iloc[inicio - primera : fin - primera]
+
+    def _color_columna(self, columna):
+        """Color de fondo de una columna seleccionada, o None si no lo está"""
+        if columna in self.columnas_entrada:
+            return COLOR_ENTRADA
+        if columna == self.columna_salida:
+            return COLOR_SALIDA
+        return None
+
+    def _preparar_elementos(self, num_filas, num_columnas):
+        """Crea los elementos que falten y oculta los que ya no se ven"""
+        canvas = self.canvas
+        while len(self._cabeceras) < num_columnas:
+            self._cabeceras.append(
+                (
+                    canvas.create_rectangle(
+                        0,
+                        0,
+                        0,
+                        0,
+                        outline=COLOR_BORDE,
+                        width=1,
+                        tags=f"cabecera{len(self._cabeceras)}",
+                    ),
+                    canvas.create_text(0, 0, font=("Arial", 9, "bold")),
+                )
+            )
+        while len(self._celdas) < num_filas:
+            self._celdas.append([])
+        for i, fila in enumerate(self._celdas[:num_filas]):
+            while len(fila) < num_columnas:
+                fila.append(
+                    (
+                        canvas.create_rectangle(
+                            0,
+                            0,
+                            0,
+                            0,
+                            outline=COLOR_BORDE,
+                            width=1,
+                            tags=f"fondo{len(fila)}_{i % 2}",
+                        ),
+                        canvas.create_text(0, 0, font=("Arial", 8), anchor="w"),
+                    )
+                )
+
+        filas_antes, columnas_antes = self._en_uso
+        for j in range(num_columnas, columnas_antes):
+            for elemento in self._cabeceras[j]:
+                canvas.itemconfigure(elemento, state="hidden")
+        for i in range(filas_antes):
+            for j in range(columnas_antes):
+                if i >= num_filas or j >= num_columnas:
+                    for elemento in self._celdas[i][j]:
+                        canvas.itemconfigure(elemento, state="hidden")
+        self._en_uso = (num_filas, num_columnas)
+
+    def redibujar(self):
+        """Coloca en los elementos del canvas las celdas de la ventana actual"""
+        if self.fuente is None:
+            return
+        canvas = self.canvas
+        ancho_vista, _ = self._tamano_vista()
+        columnas = self.fuente.columnas
+        total = len(self.fuente)
+        visibles = self.filas_visibles()
+        ancho_total = len(columnas) * self.ancho_columna
+
+        # Mantener la ventana dentro de los datos (tras redimensionar o cambiar de fuente)
+        self.fila_inicio = max(0, min(self.fila_inicio, total - visibles))
+        self.x_inicio = max(0, min(self.x_inicio, ancho_total - ancho_vista))
+        fila_fin = min(total, self.fila_inicio + visibles)
+        col_inicio, col_fin = rango_columnas(
+            self.x_inicio, ancho_vista, self.ancho_columna, len(columnas)
+        )
+        num_filas = fila_fin - self.fila_inicio
+        self._preparar_elementos(num_filas, col_fin - col_inicio)
+        self._primera_columna = col_inicio
+
+        desfase = col_inicio * self.ancho_columna - self.x_inicio
+        for j, c in enumerate(range(col_inicio, col_fin)):
+            columna = columnas[c]
+            x0 = desfase + j * self.ancho_columna
+            color = self._color_columna(columna)
+
+            rect, texto = self._cabeceras[j]
+            canvas.coords(rect, x0, 0, x0 + self.ancho_columna, ALTO_CABECERA)
+            canvas.itemconfigure(rect, fill=color or COLOR_CABECERA, state="normal")
+            canvas.coords(texto, x0 + self.ancho_columna / 2, ALTO_CABECERA / 2)
+            if self.orden is not None and self.orden[0] == columna:
+                titulo = f"{columna}{MARCAS_ORDEN[self.orden[1]]}"
+            else:
+                titulo = columna
+            canvas.itemconfigure(texto, text=titulo, state="normal")
+
+            textos = self.formatos.textos(
+                self.fuente.clave, columna, self.fila_inicio, fila_fin, self._filas
+            )
+            for i, texto_valor in enumerate(textos.tolist()):
+                fila = self.fila_inicio + i
+                y0 = ALTO_CABECERA + i * ALTO_FILA
+                rect, texto = self._celdas[i][j]
+                canvas.coords(rect, x0, y0, x0 + self.ancho_columna, y0 + ALTO_FILA)
+                canvas.itemconfigure(
+                    rect, fill=color or COLORES_FILAS[fila % 2], state="normal"
+                )
+                canvas.coords(texto, x0 + 5, y0 + ALTO_FILA / 2)
+                canvas.itemconfigure(texto, text=texto_valor, state="normal")
+
+        if total:
+            self.scroll_y.set(self.fila_inicio / total, fila_fin / total)
+        else:
+            self.scroll_y.set(0, 1)
+        if ancho_total:
+            self.scroll_x.set(
+                self.x_inicio / ancho_total,
+                min(1, (self.x_inicio + ancho_vista) / ancho_total),
+            )
+        else:
+            self.scroll_x.set(0, 1)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+from cancellation import comprobar_cancelacion
+from column_cache import CacheColumnas, RegistroDataFrames
+
+# Perfil de tipos de las columnas de un DataFrame: si son numéricas, convertibles a número o no
+# numéricas, con el primer valor que lo impide. Se calcula una vez por columna y DataFrame, de
+# modo que validar una selección solo consulta el perfil.
+
+NUMERICA = "numérica"
+CONVERTIBLE = "convertible"
+NO_NUMERICA = "no numérica"
+
+
+def _no_convertibles(serie):
+    """Máscara de los valores no vacíos que no se pueden convertir a número"""
+    try:
+        convertida = pd.to_numeric(serie, errors="coerce")
+    except TypeError:
+        # Valores que to_numeric no admite ni al forzar (listas, diccionarios...): uno a uno
+        return np.array(
+            [not np.isscalar(v) or _no_convertibles(pd.Series([v]))[0] for v in serie.tolist()],
+            dtype=bool,
+        )
+    return convertida.isna().to_numpy() & serie.notna().to_numpy()
+
+
+def perfil_columna(serie):
+    """Tipo de una columna como dict: tipo y, si no es numérica, el primer valor malo y su fila"""
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return {"tipo": NUMERICA}
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Se comprueban las categorías y se expande el resultado con los códigos (-1 es vacío)
+        malas = np.append(_no_convertibles(pd.Series(serie.cat.categories)), False)
+        malos = malas[serie.cat.codes.to_numpy()]
+    else:
+        malos = _no_convertibles(serie)
+    if not malos.any():
+        return {"tipo": CONVERTIBLE}
+    posicion = int(malos.argmax())
+    return {
+        "tipo": NO_NUMERICA,
+        "valor": serie.iloc[posicion],
+        "fila": serie.index[posicion],
+    }
+
+
+class PerfilTipos(CacheColumnas):
+    """Perfil de tipos de un DataFrame, calculado columna a columna bajo demanda.
+
+    El perfil de cada columna se vuelve a calcular al consultarlo si cambian sus valores, también
+    en el sitio (ver CacheColumnas).
+    """
+
+    def perfil(self, columna):
+        """Perfil de una columna (ver perfil_columna)"""
+        return self._resultado(columna, perfil_columna)
+
+    def calcular(self, cancelacion=None):
+        """Calcula el perfil de todas las columnas (por ejemplo, al terminar la carga)"""
+        for columna in self.df.columns:
+            comprobar_cancelacion(cancelacion)
+            self.perfil(columna)
+
+    def no_numericas(self, columnas):
+        """Perfiles de las columnas indicadas que no son numéricas, por nombre de columna"""
+        perfiles = {columna: self.perfil(columna) for columna in columnas}
+        return {c: p for c, p in perfiles.items() if p["tipo"] == NO_NUMERICA}
+
+
+_perfiles = RegistroDataFrames(PerfilTipos)
+
+
+def perfil_tipos(df):
+    """Devuelve el perfil de tipos de un DataFrame, creándolo la primera vez"""
+    return _perfiles.obtener(df)
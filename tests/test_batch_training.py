@@ -0,0 +1,168 @@
+import pytest
+import pandas as pd
+import numpy as np
+import json
+import os
+import sys
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from batch_training import main  # noqa: E402
+
+RUTA_SCRIPT = os.path.join(
+    os.path.dirname(__file__), "..", "src", "batch_training.py"
+)
+
+
+class TestEntrenamientoPorLotes:
+    """Pruebas para el entrenamiento desatendido desde la línea de comandos"""
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame con una relación lineal exacta y algunos faltantes"""
+        rng = np.random.default_rng(3)
+        n = 100
+        df = pd.DataFrame({"x1": rng.normal(size=n), "x2": rng.normal(size=n)})
+        df["y"] = 4 * df["x1"] + 0.5 * df["x2"] - 1
+        df.loc[::10, "x2"] = np.nan
+        return df
+
+    @pytest.fixture
+    def ruta_csv(self, datos, tmp_path):
+        """Guarda los datos en un CSV temporal"""
+        ruta = tmp_path / "datos.csv"
+        datos.to_csv(ruta, index=False)
+        return str(ruta)
+
+    def test_guarda_modelo_e_informe(self, ruta_csv, tmp_path, capsys):
+        """El modelo se guarda con el esquema de guardar_modelo y el informe tiene cada paso"""
+        ruta_modelo = tmp_path / "modelo.json"
+        ruta_informe = tmp_path / "informe.json"
+
+        codigo = main(
+            [
+                ruta_csv,
+                "--entradas", "x1", "x2",
+                "--salida", "y",
+                "--modelo", str(ruta_modelo),
+                "--semilla", "1",
+                "--descripcion", "Reentrenamiento nocturno",
+                "--informe", str(ruta_informe),
+            ]
+        )
+        with open(ruta_modelo, encoding="utf-8") as f:
+            modelo = json.load(f)
+        with open(ruta_informe, encoding="utf-8") as f:
+            informe = json.load(f)
+
+        assert codigo == 0
+        assert set(modelo) == {
+            "descripcion",
+            "entradas",
+            "salida",
+            "formula",
+            "coeficientes",
+            "intercepto",
+            "metricas",
+        }
+        assert modelo["descripcion"] == "Reentrenamiento nocturno"
+        np.testing.assert_allclose(modelo["coeficientes"], [4.0, 0.5])
+        assert modelo["intercepto"] == pytest.approx(-1.0)
+        assert list(informe["tiempos"]) == [
+            "carga",
+            "seleccion",
+            "faltantes",
+            "separacion",
+            "entrenamiento",
+            "total",
+        ]
+        assert informe["filas"] == {"cargadas": 100, "train": 72, "test": 18}
+        assert "Entrenamiento" in capsys.readouterr().out
+
+    def test_patron_y_relleno_constante(self, datos, tmp_path):
+        """Un patrón glob concatena los archivos y el relleno constante usa --valor"""
+        datos.iloc[:50].to_csv(tmp_path / "parte1.csv", index=False)
+        datos.iloc[50:].to_csv(tmp_path / "parte2.csv", index=False)
+        ruta_modelo = tmp_path / "modelo.json"
+        ruta_informe = tmp_path / "informe.json"
+
+        codigo = main(
+            [
+                str(tmp_path / "parte*.csv"),
+                "--entradas", "x1",
+                "--salida", "y",
+                "--modelo", str(ruta_modelo),
+                "--faltantes", "constante",
+                "--valor", "0",
+                "--entrenamiento", "50",
+                "--informe", str(ruta_informe),
+            ]
+        )
+        with open(ruta_informe, encoding="utf-8") as f:
+            informe = json.load(f)
+
+        assert codigo == 0
+        assert informe["filas"] == {"cargadas": 100, "train": 50, "test": 50}
+
+    def test_errores(self, ruta_csv, tmp_path, capsys):
+        """Los errores se informan por stderr con código de salida 1 sin escribir el modelo"""
+        ruta_modelo = tmp_path / "modelo.json"
+        base = [ruta_csv, "--salida", "y", "--modelo", str(ruta_modelo)]
+
+        assert main(base + ["--entradas", "x3"]) == 1
+        assert main(base + ["--entradas", "x1", "--faltantes", "constante"]) == 1
+        assert main(base + ["--entradas", "x1", "--entrenamiento", "100"]) == 1
+        assert "Error" in capsys.readouterr().err
+        assert not ruta_modelo.exists()
+
+    def test_sin_pantalla(self, ruta_csv, tmp_path):
+        """El script se ejecuta como proceso independiente sin servidor gráfico"""
+        ruta_modelo = tmp_path / "modelo.json"
+        entorno = {k: v for k, v in os.environ.items() if k != "DISPLAY"}
+        # El almacén fuera de memoria se crea en la caché del directorio personal
+        entorno["HOME"] = str(tmp_path)
+
+        proceso = subprocess.run(
+            [
+                sys.executable,
+                RUTA_SCRIPT,
+                ruta_csv,
+                "--entradas", "x1", "x2",
+                "--salida", "y",
+                "--modelo", str(ruta_modelo),
+                "--fuera-de-memoria",
+            ],
+            capture_output=True,
+            text=True,
+            env=entorno,
+            cwd=str(tmp_path),
+        )
+
+        assert proceso.returncode == 0, proceso.stderr
+        assert ruta_modelo.exists()
+        almacenes = tmp_path / ".cache" / "regresion_lineal" / "almacenes"
+        assert list(almacenes.iterdir()) == []
+
+    def test_sin_tkinter(self, ruta_csv, tmp_path):
+        """El script funciona en un intérprete donde tkinter no está disponible"""
+        ruta_modelo = tmp_path / "modelo.json"
+        argumentos = [ruta_csv, "--entradas", "x1", "x2", "--salida", "y", "--modelo", str(ruta_modelo)]
+        codigo = (
+            "import runpy, sys\n"
+            "sys.modules['tkinter'] = None\n"
+            f"sys.path.insert(0, {os.path.dirname(RUTA_SCRIPT)!r})\n"
+            f"sys.argv = [{RUTA_SCRIPT!r}] + {argumentos!r}\n"
+            f"runpy.run_path({RUTA_SCRIPT!r}, run_name='__main__')\n"
+        )
+
+        proceso = subprocess.run(
+            [sys.executable, "-c", codigo], capture_output=True, text=True, cwd=str(tmp_path)
+        )
+
+        assert proceso.returncode == 0, proceso.stderr
+        assert json.loads(ruta_modelo.read_text(encoding="utf-8"))["salida"] == "y"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,128 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+import gzip
+import sqlite3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import dataset_cache  # noqa: E402
+from cancellation import (  # noqa: E402
+    OperacionCancelada,
+    TokenCancelacion,
+    comprobar_cancelacion,
+)
+from compressed_files import ruta_sqlite_descomprimida  # noqa: E402
+from dataset_loading import cargar_dataset  # noqa: E402
+from dataset_readers import (  # noqa: E402
+    leer_archivos,
+    leer_csv_por_bloques,
+    leer_hojas_excel,
+)
+
+
+class TestCancelacion:
+    """Pruebas para la cancelación cooperativa de cargas en segundo plano"""
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame de prueba"""
+        return pd.DataFrame({"a": np.arange(1000), "b": np.arange(1000) * 0.5})
+
+    @pytest.fixture
+    def ruta_csv(self, datos, tmp_path):
+        """Guarda los datos en un CSV temporal"""
+        ruta = tmp_path / "datos.csv"
+        datos.to_csv(ruta, index=False)
+        return str(ruta)
+
+    @pytest.fixture(autouse=True)
+    def cache_temporal(self, tmp_path, monkeypatch):
+        """Usa un directorio de caché temporal"""
+        monkeypatch.setattr(
+            dataset_cache, "DIRECTORIO_CACHE", str(tmp_path / "cache")
+        )
+
+    def test_token(self):
+        """El token solo lanza la excepción después de cancelar"""
+        token = TokenCancelacion()
+        token.comprobar()
+        comprobar_cancelacion(None)
+        assert not token.cancelado
+
+        token.cancelar()
+
+        assert token.cancelado
+        with pytest.raises(OperacionCancelada):
+            comprobar_cancelacion(token)
+        with pytest.raises(OperacionCancelada):
+            token.esperar(5)
+
+    def test_cancelar_csv_entre_bloques(self, ruta_csv):
+        """La lectura por bloques se detiene en el bloque en que se cancela"""
+        token = TokenCancelacion()
+        avances = []
+
+        def progreso(leidos, total, filas):
+            avances.append(filas)
+            if filas >= 300:
+                token.cancelar()
+
+        with pytest.raises(OperacionCancelada):
+            leer_csv_por_bloques(
+                ruta_csv,
+                progress_callback=progreso,
+                filas_por_bloque=100,
+                cancelacion=token,
+            )
+        assert avances[-1] == 300
+
+    def test_cargar_dataset_propaga_cancelacion(self, ruta_csv):
+        """cargar_dataset no trata la cancelación como un error de lectura"""
+        token = TokenCancelacion()
+        token.cancelar()
+
+        with pytest.raises(OperacionCancelada):
+            cargar_dataset(ruta_csv, cancelacion=token)
+
+    def test_cancelar_varios_archivos_y_hojas(self, datos, tmp_path):
+        """La lectura de varios archivos o varias hojas respeta el token"""
+        rutas = []
+        for i in range(2):
+            ruta = tmp_path / f"parte_{i}.csv"
+            datos.to_csv(ruta, index=False)
+            rutas.append(str(ruta))
+        ruta_excel = tmp_path / "libro.xlsx"
+        with pd.ExcelWriter(ruta_excel) as writer:
+            datos.head(10).to_excel(writer, sheet_name="uno", index=False)
+            datos.head(10).to_excel(writer, sheet_name="dos", index=False)
+        token = TokenCancelacion()
+        token.cancelar()
+
+        with pytest.raises(OperacionCancelada):
+            leer_archivos(rutas, en_paralelo=False, cancelacion=token)
+        with pytest.raises(OperacionCancelada):
+            leer_hojas_excel(
+                str(ruta_excel), ["uno", "dos"], en_paralelo=False, cancelacion=token
+            )
+
+    def test_cancelar_descompresion_sqlite(self, datos, tmp_path):
+        """Cancelar la descompresión de SQLite no deja archivos temporales en la caché"""
+        ruta_db = tmp_path / "datos.db"
+        conn = sqlite3.connect(ruta_db)
+        datos.to_sql("medidas", conn, index=False)
+        conn.close()
+        ruta_gz = tmp_path / "datos.db.gz"
+        ruta_gz.write_bytes(gzip.compress(ruta_db.read_bytes()))
+        token = TokenCancelacion()
+        token.cancelar()
+
+        with pytest.raises(OperacionCancelada):
+            ruta_sqlite_descomprimida(str(ruta_gz), cancelacion=token)
+        assert os.listdir(dataset_cache.DIRECTORIO_CACHE) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,95 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from cell_format import (  # noqa: E402
+    FILAS_POR_BLOQUE_FORMATO,
+    CacheFormato,
+    formatear_valores,
+    texto_celda,
+)
+
+
+class TestFormatoCeldas:
+    """Pruebas para el formato vectorizado de las celdas de la tabla"""
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame con columnas de distintos tipos"""
+        n = 1000
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(
+            {
+                "real": rng.normal(size=n) * 1e6,
+                "entero": np.arange(n) * 12345,
+                "booleano": np.arange(n) % 3 == 0,
+                "texto": [f"valor número {i} " * (i % 3) for i in range(n)],
+                "categoria": pd.Categorical(np.array(["a", "bb", "ccc"])[np.arange(n) % 3]),
+                "entero_nulos": pd.array([None if i % 7 == 0 else i for i in range(n)], dtype="Int64"),
+            }
+        )
+        df.loc[::5, "real"] = np.nan
+        return df
+
+    def test_mismo_texto_que_celda_a_celda(self, datos):
+        """El formato por columna coincide con el de texto_celda para cada tipo"""
+        for columna in datos.columns:
+            esperado = [texto_celda(v) for v in datos[columna].tolist()]
+            assert formatear_valores(datos[columna]).tolist() == esperado, columna
+
+    def test_recorte(self):
+        """Los textos largos se recortan a 18 caracteres acabados en puntos suspensivos"""
+        textos = formatear_valores(pd.Series(["corto", "x" * 18, "y" * 40]))
+        assert textos.tolist() == ["corto", "x" * 18, "y" * 15 + "..."]
+
+    def test_cache_por_bloques(self, datos):
+        """Solo se leen y formatean los bloques que no están en la caché"""
+        cache = CacheFormato()
+        lecturas = []
+
+        def leer_filas(inicio, fin):
+            lecturas.append((inicio, fin))
+            return datos.iloc[inicio:fin]
+
+        tamano = FILAS_POR_BLOQUE_FORMATO
+        textos = cache.textos(0, "entero", tamano - 5, tamano + 5, leer_filas)
+        assert textos.tolist() == [str(i * 12345) for i in range(tamano - 5, tamano + 5)]
+        assert len(lecturas) == 2
+
+        # Otro rango dentro de los mismos bloques no vuelve a leer
+        cache.textos(0, "entero", 0, 2 * tamano, leer_filas)
+        assert len(lecturas) == 2
+        # Otra fuente u otra columna son bloques distintos
+        cache.textos(1, "entero", 0, 10, leer_filas)
+        cache.textos(0, "real", 0, 10, leer_filas)
+        assert len(lecturas) == 4
+        assert cache.textos(0, "entero", 3, 3, leer_filas).tolist() == []
+
+    def test_lru(self, datos):
+        """La caché descarta los bloques usados hace más tiempo"""
+        cache = CacheFormato(maximo_bloques=2)
+        lecturas = []
+
+        def leer_filas(inicio, fin):
+            lecturas.append(inicio)
+            return datos.iloc[inicio:fin]
+
+        tamano = FILAS_POR_BLOQUE_FORMATO
+        cache.textos(0, "real", 0, 1, leer_filas)
+        cache.textos(0, "real", tamano, tamano + 1, leer_filas)
+        cache.textos(0, "real", 0, 1, leer_filas)
+        cache.textos(0, "real", 2 * tamano, 2 * tamano + 1, leer_filas)
+        assert len(cache) == 2
+
+        # El bloque 0 se usó más recientemente que el 1, que es el descartado
+        cache.textos(0, "real", 0, 1, leer_filas)
+        cache.textos(0, "real", tamano, tamano + 1, leer_filas)
+        assert lecturas == [0, tamano, 2 * tamano, tamano]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,90 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from column_list import ListaColumnas, tipo_columna  # noqa: E402
+
+
+class TestListaColumnas:
+    """Pruebas para el modelo del selector de columnas de datasets anchos"""
+
+    @pytest.fixture
+    def lista(self):
+        """Lista de 2.000 columnas numéricas más algunas de otros tipos"""
+        df = pd.DataFrame(
+            {f"sensor_{i:04d}": np.zeros(2, dtype="float32") for i in range(2000)}
+        )
+        df["Ciudad"] = ["Madrid", "Bilbao"]
+        df["zona"] = pd.Categorical(["a", "b"])
+        df["activo"] = [True, False]
+        df["fecha"] = pd.to_datetime(["2026-01-01", "2026-01-02"])
+        return ListaColumnas.desde_datos(df)
+
+    def test_tipos(self, lista):
+        """Cada columna se clasifica por su tipo"""
+        assert lista.tipos[0] == "Numérica"
+        assert lista.tipos[-4:] == ["Texto", "Categórica", "Booleana", "Fecha"]
+        assert tipo_columna(pd.Int64Dtype()) == "Numérica"
+
+    def test_busqueda_incremental(self, lista):
+        """Escribir estrecha la búsqueda sobre las coincidencias anteriores y borrar la amplía"""
+        assert len(lista.filtrar("sensor_1")) == 1000
+        assert len(lista.filtrar("sensor_19")) == 100
+        assert lista.filtrar("SENSOR_1999") == [1999]
+        assert len(lista.filtrar("sensor_1")) == 1000
+        assert lista.filtrar("ciudad") == [2000]
+        assert len(lista.filtrar("")) == len(lista)
+
+    def test_patron_y_tipo(self, lista):
+        """Los patrones glob y el tipo filtran las columnas visibles"""
+        assert lista.filtrar("sensor_00?0") == [0, 10, 20, 30, 40, 50, 60, 70, 80, 90]
+        assert lista.filtrar("*a*") == [2000, 2001, 2002, 2003]
+        assert lista.filtrar("*a*", "Categórica") == [2001]
+        assert len(lista.filtrar("", "Numérica")) == 2000
+
+    def test_marcado_en_bloque(self, lista):
+        """Marcar las visibles afecta solo a lo filtrado y la selección sigue el orden de los datos"""
+        lista.filtrar("sensor_01*")
+        assert lista.marcar_visibles() == 100
+        lista.filtrar("ciudad")
+        lista.marcar_visibles()
+        assert lista.alternar(5) is True
+        assert lista.alternar(5) is False
+
+        seleccion = lista.seleccionadas()
+        assert len(seleccion) == 101
+        assert seleccion[0] == "sensor_0100"
+        assert seleccion[-1] == "Ciudad"
+
+        lista.filtrar("sensor_015*")
+        assert lista.marcar_visibles(False) == 10
+        assert lista.marcar_visibles(False) == 0
+        assert len(lista.seleccionadas()) == 91
+
+    def test_marcas_pendientes_y_tipos_completos(self, lista):
+        """Las marcas en bloque se dibujan al verse su fila y los tipos se corrigen con los datos completos"""
+        lista.filtrar("sensor_0*")
+        lista.marcar_visibles()
+        # Primeras 12 de 1.000 filas a la vista: solo esas se dibujan, una sola vez
+        assert lista.pendientes_en(0.0, 0.012) == list(range(13))
+        assert lista.pendientes_en(0.0, 0.012) == []
+        assert lista.pendientes_en(0.5, 0.512) == list(range(500, 513))
+        lista.marcar_columnas(["Ciudad"])
+        lista.filtrar("ciudad")
+        assert lista.pendientes_en(0.0, 1.0) == [2000]
+
+        # En la vista previa "Ciudad" estaba vacía y parecía numérica
+        completos = list(lista.tipos)
+        lista.actualizar_tipos(["Numérica"] * 2001 + completos[2001:])
+        assert len(lista.filtrar("", "Numérica")) == 2001
+        assert lista.actualizar_tipos(completos) == [2000]
+        assert len(lista.visibles) == 2000
+        assert 2000 not in lista.visibles
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,128 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+import gzip
+import bz2
+import lzma
+import sqlite3
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import dataset_cache  # noqa: E402
+from compressed_files import (  # noqa: E402
+    detectar_compresion,
+    extension_datos,
+    ruta_sqlite_descomprimida,
+)
+from dataset_loading import cargar_dataset  # noqa: E402
+from dataset_readers import cargar_vista_previa, leer_csv_por_bloques  # noqa: E402
+
+
+class TestArchivosComprimidos:
+    """Pruebas para la lectura transparente de archivos comprimidos"""
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame de prueba"""
+        return pd.DataFrame(
+            {"a": np.arange(300), "b": np.arange(300) * 0.25, "c": ["x", "y", "z"] * 100}
+        )
+
+    @pytest.fixture
+    def contenido_csv(self, datos):
+        """Contenido del CSV sin comprimir"""
+        return datos.to_csv(index=False).encode("utf-8")
+
+    @pytest.fixture(autouse=True)
+    def cache_temporal(self, tmp_path, monkeypatch):
+        """Usa un directorio de caché temporal para las copias descomprimidas"""
+        monkeypatch.setattr(
+            dataset_cache, "DIRECTORIO_CACHE", str(tmp_path / "cache")
+        )
+
+    def test_detectar_por_extension_y_firma(self, contenido_csv, tmp_path):
+        """La compresión se detecta por extensión o, si falta, por los primeros bytes"""
+        ruta_gz = tmp_path / "datos.csv.gz"
+        ruta_gz.write_bytes(gzip.compress(contenido_csv))
+        ruta_camuflada = tmp_path / "datos.csv"
+        ruta_camuflada.write_bytes(bz2.compress(contenido_csv))
+        ruta_plana = tmp_path / "plano.csv"
+        ruta_plana.write_bytes(contenido_csv)
+
+        assert detectar_compresion(str(ruta_gz)) == "gzip"
+        assert detectar_compresion(str(ruta_camuflada)) == "bz2"
+        assert detectar_compresion(str(ruta_plana)) is None
+        assert extension_datos(str(ruta_gz)) == ".csv"
+
+    def test_csv_comprimidos(self, datos, contenido_csv, tmp_path):
+        """Los CSV en gzip, bz2, xz y zip se leen igual que sin comprimir"""
+        rutas = {
+            "datos.csv.gz": gzip.compress(contenido_csv),
+            "datos.csv.bz2": bz2.compress(contenido_csv),
+            "datos.csv.xz": lzma.compress(contenido_csv),
+        }
+        for nombre, contenido in rutas.items():
+            (tmp_path / nombre).write_bytes(contenido)
+        with zipfile.ZipFile(tmp_path / "datos.zip", "w") as archivo_zip:
+            archivo_zip.writestr("export/datos.csv", contenido_csv)
+
+        for nombre in list(rutas) + ["datos.zip"]:
+            df = cargar_dataset(str(tmp_path / nombre))
+            pd.testing.assert_frame_equal(df, datos)
+        assert len(cargar_vista_previa(str(tmp_path / "datos.zip"), 10)) == 10
+
+    def test_csv_zstd(self, datos, contenido_csv, tmp_path):
+        """Los CSV en zstd se leen si está disponible el descompresor"""
+        zstandard = pytest.importorskip("zstandard")
+        ruta = tmp_path / "datos.csv.zst"
+        ruta.write_bytes(zstandard.ZstdCompressor().compress(contenido_csv))
+
+        pd.testing.assert_frame_equal(cargar_dataset(str(ruta)), datos)
+
+    def test_progreso_sobre_bytes_comprimidos(self, contenido_csv, tmp_path):
+        """El progreso avanza sobre el tamaño del archivo comprimido"""
+        ruta = tmp_path / "datos.csv.gz"
+        ruta.write_bytes(gzip.compress(contenido_csv))
+        avances = []
+
+        leer_csv_por_bloques(
+            str(ruta),
+            progress_callback=lambda b, t, f: avances.append((b, t, f)),
+            filas_por_bloque=50,
+        )
+
+        assert len(avances) == 6
+        assert all(t == os.path.getsize(ruta) for _, t, _ in avances)
+        assert avances[-1][0] == avances[-1][1]
+        assert avances[-1][2] == 300
+
+    def test_sqlite_comprimido(self, datos, tmp_path):
+        """Una copia comprimida de SQLite se descomprime una vez y se reutiliza"""
+        ruta_db = tmp_path / "datos.db"
+        conn = sqlite3.connect(ruta_db)
+        datos.to_sql("medidas", conn, index=False)
+        conn.close()
+        ruta_gz = tmp_path / "datos.db.gz"
+        ruta_gz.write_bytes(gzip.compress(ruta_db.read_bytes()))
+
+        df = cargar_dataset(str(ruta_gz), tabla="medidas")
+        copia = ruta_sqlite_descomprimida(str(ruta_gz))
+
+        pd.testing.assert_frame_equal(df, datos)
+        assert copia != str(ruta_gz)
+        assert os.path.dirname(copia) == dataset_cache.DIRECTORIO_CACHE
+        assert ruta_sqlite_descomprimida(str(ruta_gz)) == copia
+
+    def test_formato_comprimido_no_soportado(self, tmp_path):
+        """Solo se descomprimen CSV y SQLite"""
+        ruta = tmp_path / "datos.xlsx.gz"
+        ruta.write_bytes(gzip.compress(b"no es un libro"))
+
+        assert cargar_dataset(str(ruta)) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
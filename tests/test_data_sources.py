@@ -0,0 +1,112 @@
+import pytest
+import pandas as pd
+import sqlite3
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data_sources import (  # noqa: E402
+    FuenteDataFrame,
+    FuenteSQLite,
+    crear_fuente_sqlite,
+)
+
+
+class TestFuentesDatos:
+    """Pruebas para las fuentes de datos paginadas de la tabla"""
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame de prueba"""
+        return pd.DataFrame({"a": range(1000), "b": [f"t{i}" for i in range(1000)]})
+
+    @pytest.fixture
+    def ruta_db(self, datos, tmp_path):
+        """Guarda los datos en SQLite con huecos en los rowid"""
+        ruta = str(tmp_path / "datos.db")
+        conn = sqlite3.connect(ruta)
+        datos.to_sql("datos", conn, index=False)
+        conn.execute("DELETE FROM datos WHERE a % 7 = 0")
+        conn.execute("CREATE VIEW vista AS SELECT * FROM datos")
+        conn.commit()
+        conn.close()
+        return ruta
+
+    def test_fuente_dataframe(self, datos):
+        """La fuente en memoria devuelve rangos de filas"""
+        fuente = FuenteDataFrame(datos)
+
+        assert len(fuente) == 1000
+        assert fuente.columnas == ["a", "b"]
+        pd.testing.assert_frame_equal(fuente.obtener_filas(10, 20), datos.iloc[10:20])
+
+    def test_paginas_sqlite_secuenciales(self, datos, ruta_db):
+        """Las páginas por rowid coinciden con la tabla aunque haya huecos"""
+        esperado = datos[datos["a"] % 7 != 0].reset_index(drop=True)
+        fuente = FuenteSQLite(ruta_db, "datos", filas_por_pagina=50)
+
+        filas = fuente.obtener_filas(0, len(fuente))
+
+        assert len(fuente) == len(esperado)
+        assert filas["a"].tolist() == esperado["a"].tolist()
+        fuente.cerrar()
+
+    def test_salto_a_pagina_no_visitada(self, datos, ruta_db):
+        """Un salto directo localiza la página correcta"""
+        esperado = datos[datos["a"] % 7 != 0].reset_index(drop=True)
+        fuente = FuenteSQLite(ruta_db, "datos", filas_por_pagina=50)
+
+        filas = fuente.obtener_filas(730, 760)
+
+        assert filas["a"].tolist() == esperado["a"].iloc[730:760].tolist()
+        fuente.cerrar()
+
+    def test_saltos_desde_la_clave_mas_cercana(self, datos, ruta_db, tmp_path):
+        """Un salto solo cuenta las filas desde la página conocida más cercana o desde el final"""
+        esperado = datos[datos["a"] % 7 != 0].reset_index(drop=True)
+        fuente = FuenteSQLite(ruta_db, "datos", filas_por_pagina=50)
+        consultas = []
+        fuente._conn.set_trace_callback(consultas.append)
+
+        for inicio in (800, 760, 450):
+            filas = fuente.obtener_filas(inicio, inicio + 10)
+            assert filas["a"].tolist() == esperado["a"].iloc[inicio:inicio + 10].tolist()
+        # 857 filas: del final a la fila 800, de la 800 a la 750 y de la 750 a la 450
+        saltos = [int(c.rsplit("OFFSET", 1)[1]) for c in consultas if "OFFSET" in c]
+        assert saltos == [57, 50, 300]
+        fuente.cerrar()
+
+        # Con rowid consecutivos la clave de la página se calcula sin recorrer la tabla
+        ruta = str(tmp_path / "consecutivos.db")
+        conn = sqlite3.connect(ruta)
+        datos.to_sql("datos", conn, index=False)
+        conn.close()
+        fuente = FuenteSQLite(ruta, "datos", filas_por_pagina=50)
+        consultas = []
+        fuente._conn.set_trace_callback(consultas.append)
+        assert fuente.obtener_filas(905, 915)["a"].tolist() == list(range(905, 915))
+        assert len(consultas) == 1
+        fuente.cerrar()
+
+    def test_cache_lru_acotada(self, ruta_db):
+        """Solo se conservan en memoria las páginas más recientes"""
+        fuente = FuenteSQLite(
+            ruta_db, "datos", filas_por_pagina=50, paginas_en_cache=3
+        )
+        for pagina in range(10):
+            fuente.obtener_pagina(pagina)
+
+        assert list(fuente._paginas) == [7, 8, 9]
+        fuente.cerrar()
+
+    def test_vista_no_paginable(self, ruta_db):
+        """Las vistas no admiten paginación por rowid"""
+        assert crear_fuente_sqlite(ruta_db, "vista") is None
+        fuente = crear_fuente_sqlite(ruta_db, "datos")
+        assert isinstance(fuente, FuenteSQLite)
+        fuente.cerrar()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
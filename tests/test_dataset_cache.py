@@ -0,0 +1,117 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import dataset_cache  # noqa: E402
+from dataset_cache import (  # noqa: E402
+    huella_archivo,
+    leer_cache,
+    guardar_cache,
+    expulsar_entradas,
+    limpiar_cache,
+    tamano_cache,
+)
+from dataset_loading import cargar_dataset  # noqa: E402
+
+
+class TestCacheDatasets:
+    """Pruebas para la caché en disco de datasets parseados"""
+
+    @pytest.fixture(autouse=True)
+    def requiere_pyarrow(self):
+        """Omite las pruebas si pyarrow no está instalado"""
+        pytest.importorskip("pyarrow")
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame de prueba"""
+        return pd.DataFrame(
+            {"a": np.arange(20), "b": np.arange(20) * 0.5, "c": ["x"] * 20}
+        )
+
+    @pytest.fixture
+    def ruta_csv(self, datos, tmp_path):
+        """Guarda los datos de prueba como CSV"""
+        ruta = str(tmp_path / "datos.csv")
+        datos.to_csv(ruta, index=False)
+        return ruta
+
+    def test_guardar_y_leer(self, datos, ruta_csv, tmp_path):
+        """Un dataset guardado se recupera igual y con proyección de columnas"""
+        cache = str(tmp_path / "cache")
+
+        assert leer_cache(ruta_csv, directorio=cache) is None
+        assert guardar_cache(ruta_csv, datos, directorio=cache)
+
+        pd.testing.assert_frame_equal(leer_cache(ruta_csv, directorio=cache), datos)
+        assert list(leer_cache(ruta_csv, ["b"], directorio=cache).columns) == ["b"]
+
+        # Pedir una columna que la entrada no tiene es un fallo de caché que no la borra
+        assert leer_cache(ruta_csv, ["b", "z"], directorio=cache) is None
+        pd.testing.assert_frame_equal(leer_cache(ruta_csv, directorio=cache), datos)
+
+    def test_huella_cambia_al_modificar(self, ruta_csv):
+        """Modificar el archivo invalida su huella"""
+        huella = huella_archivo(ruta_csv)
+        with open(ruta_csv, "a") as f:
+            f.write("99,1.0,y\n")
+
+        assert huella_archivo(ruta_csv) != huella
+
+    def test_variantes_independientes(self, datos, ruta_csv, tmp_path):
+        """Cada variante de lectura de un archivo (p. ej. la hoja) tiene su propia entrada"""
+        cache = str(tmp_path / "cache")
+        guardar_cache(ruta_csv, datos, directorio=cache, variante="hoja1")
+
+        assert leer_cache(ruta_csv, directorio=cache, variante="hoja2") is None
+        assert leer_cache(ruta_csv, directorio=cache, variante="hoja1") is not None
+
+    def test_expulsion_lru(self, datos, tmp_path):
+        """Al superar el tamaño máximo se eliminan las entradas menos usadas"""
+        cache = str(tmp_path / "cache")
+        rutas = []
+        for i in range(3):
+            ruta = str(tmp_path / f"datos_{i}.csv")
+            datos.to_csv(ruta, index=False)
+            guardar_cache(ruta, datos, directorio=cache)
+            rutas.append(ruta)
+        # Marcar la primera como usada más recientemente
+        entradas = sorted(os.listdir(cache))
+        for i, nombre in enumerate(entradas):
+            os.utime(os.path.join(cache, nombre), (i, i))
+        leer_cache(rutas[0], directorio=cache)
+
+        tamano_entrada = tamano_cache(cache) // 3
+        expulsar_entradas(cache, tamano_maximo=tamano_entrada)
+
+        assert len(os.listdir(cache)) == 1
+        assert leer_cache(rutas[0], directorio=cache) is not None
+
+    def test_limpiar_cache(self, datos, ruta_csv, tmp_path):
+        """Limpiar la caché elimina todas las entradas y devuelve lo liberado"""
+        cache = str(tmp_path / "cache")
+        guardar_cache(ruta_csv, datos, directorio=cache)
+        tamano = tamano_cache(cache)
+
+        assert limpiar_cache(cache) == tamano
+        assert tamano_cache(cache) == 0
+
+    def test_cargar_dataset_usa_cache(self, datos, ruta_csv, tmp_path, monkeypatch):
+        """La segunda carga de un CSV se sirve desde la caché"""
+        monkeypatch.setattr(
+            dataset_cache, "DIRECTORIO_CACHE", str(tmp_path / "cache")
+        )
+        cargar_dataset(ruta_csv, usar_cache=True)
+        assert tamano_cache() > 0
+
+        df = cargar_dataset(ruta_csv, usar_cache=True)
+
+        pd.testing.assert_frame_equal(df, datos)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
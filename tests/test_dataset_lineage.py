@@ -0,0 +1,123 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+import tracemalloc
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data_sources import FuenteVersion  # noqa: E402
+from dataset_lineage import VersionDataset, como_version, materializar  # noqa: E402
+
+
+class TestLinajeDataset:
+    """Pruebas para las versiones derivadas del dataset que comparten buffers"""
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame con valores faltantes y una columna de texto"""
+        return pd.DataFrame(
+            {
+                "a": [1.0, np.nan, 3.0, 4.0, np.nan, 6.0],
+                "b": [10.0, 20.0, 30.0, np.nan, 50.0, 60.0],
+                "c": [7, 8, 9, 10, 11, 12],
+                "texto": list("uvwxyz"),
+            }
+        )
+
+    def test_seleccion_comparte_buffers(self, datos):
+        """Seleccionar columnas y materializar no copia los datos del DataFrame cargado"""
+        version = como_version(datos).seleccionar(["c", "a"])
+        df = version.materializar()
+
+        assert list(df.columns) == ["c", "a"]
+        assert np.shares_memory(df["a"].to_numpy(), datos["a"].to_numpy())
+        assert np.shares_memory(df["c"].to_numpy(), datos["c"].to_numpy())
+        assert version.materializar() is df
+
+        # Construir el DataFrame tampoco reserva copias temporales de las columnas (16 MB)
+        grande = pd.DataFrame({c: np.arange(1_000_000, dtype=float) for c in "xyz"})
+        version = como_version(grande).seleccionar(["z", "x"])
+        tracemalloc.start()
+        try:
+            version.materializar()
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert pico < 1_000_000
+
+    def test_faltantes_y_eliminacion(self, datos):
+        """Los faltantes y la eliminación coinciden con isnull().sum() y dropna()"""
+        version = VersionDataset(datos).seleccionar(["a", "b", "c"])
+
+        pd.testing.assert_series_equal(
+            version.faltantes(), datos[["a", "b", "c"]].isnull().sum()
+        )
+        filtrada = version.filtrar(version.filas_completas())
+        pd.testing.assert_frame_equal(
+            filtrada.materializar(), datos[["a", "b", "c"]].dropna()
+        )
+
+    def test_rellenos_sin_modificar_la_raiz(self, datos):
+        """Rellenar solo copia las columnas afectadas y deja intacto el original"""
+        original = datos.copy()
+        version = VersionDataset(datos).rellenar({"a": 0.0})
+        df = version.materializar()
+
+        assert df["a"].tolist() == [1.0, 0.0, 3.0, 4.0, 0.0, 6.0]
+        assert version.faltantes().to_dict() == {"a": 0, "b": 1, "c": 0, "texto": 0}
+        assert np.shares_memory(df["b"].to_numpy(), datos["b"].to_numpy())
+        pd.testing.assert_frame_equal(datos, original)
+        # Un relleno anterior tiene prioridad sobre los siguientes
+        assert version.rellenar({"a": 99.0, "b": -1.0}).materializar()["a"].tolist() == (
+            df["a"].tolist()
+        )
+
+    def test_composicion_de_filas_y_linaje(self, datos):
+        """Las posiciones de cada paso se componen sobre las del anterior"""
+        version = (
+            VersionDataset(datos)
+            .seleccionar(["a", "c"])
+            .filtrar(datos["c"].to_numpy() > 7)
+            .tomar([3, 0], "Test")
+        )
+
+        pd.testing.assert_frame_equal(
+            version.materializar(), datos.loc[[4, 1], ["a", "c"]]
+        )
+        assert version.linaje() == [
+            "Carga",
+            "Selección de columnas",
+            "Filtrado de filas",
+            "Test",
+        ]
+        assert materializar(datos) is datos
+
+    def test_separacion_por_posiciones(self, datos):
+        """Separar posiciones reparte las filas igual que separar el DataFrame"""
+        version = VersionDataset(datos)
+        train_ref, test_ref = train_test_split(datos, test_size=0.33, random_state=5)
+        pos_train, pos_test = train_test_split(
+            np.arange(len(version)), test_size=0.33, random_state=5
+        )
+
+        pd.testing.assert_frame_equal(version.tomar(pos_train).materializar(), train_ref)
+        pd.testing.assert_frame_equal(version.tomar(pos_test).materializar(), test_ref)
+
+    def test_fuente_version_paginada(self, datos):
+        """La tabla pide solo las filas de cada página a la versión"""
+        version = VersionDataset(datos).rellenar({"a": -1.0}).tomar([5, 4, 3, 2])
+        fuente = FuenteVersion(version)
+
+        pagina = fuente.obtener_filas(1, 3)
+        assert len(fuente) == 4
+        assert fuente.columnas == ["a", "b", "c", "texto"]
+        assert pagina.index.tolist() == [4, 3]
+        assert pagina["a"].tolist() == [-1.0, 4.0]
+        assert len(fuente.obtener_filas(3, 10)) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -5,11 +5,27 @@ import tempfile
 import os
 import sys
 import sqlite3
+import tracemalloc
 
 # Agregar src al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
+from src import dataset_readers  # noqa: E402
 from src.dataset_loading import cargar_dataset  # noqa: E402
+from src.dataset_readers import (  # noqa: E402
+    cargar_vista_previa,
+    construir_consulta_sqlite,
+    expandir_patron,
+    leer_archivos,
+    leer_csv_por_bloques,
+    leer_hoja_excel,
+    leer_hojas_excel,
+    leer_sqlite,
+    listar_hojas_excel,
+    listar_tablas_sqlite,
+    optimizar_tipos,
+    texto_estadisticas_hojas,
+)
 
 
 class TestCargaDatos:
@@ -118,5 +134,482 @@ class TestCargaDatos:
         assert df_cargado is None or len(df_cargado) == 0
 
 
+class TestProyeccionColumnas:
+    """Pruebas para cargar únicamente las columnas seleccionadas"""
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame con un nombre de columna que requiere escape"""
+        return pd.DataFrame(
+            {
+                "a": [1, 2, 3],
+                "columna b": [4.0, 5.0, 6.0],
+                "c": ["x", "y", "z"],
+            }
+        )
+
+    def test_columnas_csv(self, datos, tmp_path):
+        """Solo se leen las columnas pedidas de un CSV"""
+        ruta = str(tmp_path / "datos.csv")
+        datos.to_csv(ruta, index=False)
+
+        df = cargar_dataset(ruta, columnas=["a", "columna b"])
+
+        assert list(df.columns) == ["a", "columna b"]
+        assert len(df) == 3
+
+    def test_columnas_excel(self, datos, tmp_path):
+        """Solo se leen las columnas pedidas de un Excel"""
+        ruta = str(tmp_path / "datos.xlsx")
+        datos.to_excel(ruta, index=False)
+
+        df = cargar_dataset(ruta, columnas=["c"])
+
+        assert list(df.columns) == ["c"]
+
+    def test_columnas_sqlite(self, datos, tmp_path):
+        """La consulta SQLite solo selecciona las columnas pedidas"""
+        ruta = str(tmp_path / "datos.db")
+        conn = sqlite3.connect(ruta)
+        datos.to_sql("datos", conn, index=False)
+        conn.close()
+
+        df = cargar_dataset(ruta, columnas=["columna b", "a"])
+
+        assert list(df.columns) == ["columna b", "a"]
+        assert df["a"].tolist() == [1, 2, 3]
+
+
+class TestOptimizacionTipos:
+    """Pruebas para la reducción de memoria de los tipos de datos"""
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame con tipos por defecto de pandas"""
+        n = 1000
+        return pd.DataFrame(
+            {
+                "entero": np.arange(n) % 100,
+                "decimal": (np.arange(n) % 8) * 0.25,
+                "preciso": np.linspace(0, 1, n) / 3,
+                "ciudad": np.array(["Madrid", "Sevilla", "Bilbao", None])[
+                    np.arange(n) % 4
+                ],
+                "numero_texto": [str(i % 5) for i in range(n)],
+            }
+        )
+
+    def test_reduce_tipos_sin_perder_valores(self, datos):
+        """Los numéricos se reducen al ancho mínimo sin alterar sus valores"""
+        df, _, _ = optimizar_tipos(datos)
+
+        assert df["entero"].dtype == np.int8
+        assert df["decimal"].dtype == np.float32
+        assert df["preciso"].dtype == np.float64
+        pd.testing.assert_frame_equal(
+            df.astype({"entero": "int64", "decimal": "float64"}).drop(
+                columns="ciudad"
+            ),
+            datos.drop(columns="ciudad"),
+        )
+
+    def test_texto_repetido_a_categorico(self, datos):
+        """El texto de baja cardinalidad pasa a categórico salvo si es numérico"""
+        df, _, _ = optimizar_tipos(datos)
+
+        assert isinstance(df["ciudad"].dtype, pd.CategoricalDtype)
+        assert df["ciudad"].isnull().sum() == datos["ciudad"].isnull().sum()
+        assert df["numero_texto"].dtype == object
+
+    def test_informa_memoria_ahorrada(self, datos):
+        """La memoria se mide con memory_usage(deep=True) antes y después"""
+        df, antes, despues = optimizar_tipos(datos)
+
+        assert antes == datos.memory_usage(deep=True).sum()
+        assert despues == df.memory_usage(deep=True).sum()
+        assert despues < antes
+
+
+class TestFormatosColumnares:
+    """Pruebas para la carga de Parquet, Feather y Arrow IPC"""
+
+    @pytest.fixture(autouse=True)
+    def requiere_pyarrow(self):
+        """Omite las pruebas si pyarrow no está instalado"""
+        pytest.importorskip("pyarrow")
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame de prueba"""
+        return pd.DataFrame(
+            {
+                "x": np.arange(100, dtype=np.int64),
+                "y": np.arange(100) * 1.5,
+                "z": [f"v{i}" for i in range(100)],
+            }
+        )
+
+    def test_cargar_parquet_por_grupos(self, datos, tmp_path):
+        """Parquet se lee por grupos de filas informando del progreso"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        ruta = str(tmp_path / "datos.parquet")
+        pq.write_table(pa.Table.from_pandas(datos), ruta, row_group_size=30)
+        avances = []
+
+        df = cargar_dataset(
+            ruta,
+            progress_callback=lambda b, t, f: avances.append((b, t, f)),
+            columnas=["x", "y"],
+        )
+
+        pd.testing.assert_frame_equal(df, datos[["x", "y"]])
+        assert [a[2] for a in avances] == [30, 60, 90, 100]
+        assert avances[-1][0] == avances[-1][1]
+
+    def test_vista_previa_parquet(self, datos, tmp_path):
+        """La vista previa de Parquet solo lee las primeras filas"""
+        ruta = str(tmp_path / "datos.parquet")
+        datos.to_parquet(ruta, index=False)
+
+        df = cargar_vista_previa(ruta, n_filas=10)
+
+        pd.testing.assert_frame_equal(df, datos.head(10))
+
+    def test_cargar_feather_y_arrow(self, datos, tmp_path):
+        """Feather y Arrow IPC se cargan con poda de columnas"""
+        for nombre in ("datos.feather", "datos.arrow"):
+            ruta = str(tmp_path / nombre)
+            datos.to_feather(ruta, compression="uncompressed")
+
+            df = cargar_dataset(ruta, columnas=["z", "x"])
+
+            assert sorted(df.columns) == ["x", "z"]
+            assert df["x"].tolist() == list(range(100))
+
+
+class TestOrigenSQLite:
+    """Pruebas para la elección de tabla y las consultas SQLite"""
+
+    @pytest.fixture
+    def ruta_db(self, tmp_path):
+        """Crea una base de datos con dos tablas y una vista"""
+        ruta = str(tmp_path / "datos.db")
+        conn = sqlite3.connect(ruta)
+        pd.DataFrame({"id": [1, 2], "nombre": ["a", "b"]}).to_sql(
+            "clientes", conn, index=False
+        )
+        pd.DataFrame(
+            {
+                "x": [1.0, 2.0, None, None, 5.0, 6.0],
+                "y": [10, 20, 30, 40, 50, 60],
+            }
+        ).to_sql("medidas", conn, index=False)
+        conn.execute("CREATE VIEW grandes AS SELECT * FROM medidas WHERE y > 30")
+        conn.commit()
+        conn.close()
+        return ruta
+
+    def test_listar_tablas_y_vistas(self, ruta_db):
+        """Se listan tablas y vistas con su tipo"""
+        objetos = listar_tablas_sqlite(ruta_db)
+
+        assert ("clientes", "table") in objetos
+        assert ("medidas", "table") in objetos
+        assert ("grandes", "view") in objetos
+
+    def test_construir_consulta(self):
+        """La consulta incluye proyección, filtro y límite"""
+        sql = construir_consulta_sqlite(
+            "medidas", columnas=["x"], condicion="y > 10", limite=5
+        )
+
+        assert sql == 'SELECT "x" FROM "medidas" WHERE y > 10 LIMIT 5'
+
+    def test_cargar_tabla_elegida(self, ruta_db):
+        """Se carga la tabla indicada en lugar de la primera"""
+        df = cargar_dataset(ruta_db, tabla="medidas")
+
+        assert list(df.columns) == ["x", "y"]
+        assert len(df) == 6
+
+    def test_consulta_con_proyeccion_por_bloques(self, ruta_db):
+        """Las columnas se proyectan sobre la consulta y se recibe por bloques"""
+        avances = []
+        df = leer_sqlite(
+            ruta_db,
+            consulta="SELECT * FROM grandes;",
+            columnas=["x"],
+            progress_callback=lambda b, t, f: avances.append(f),
+            filas_por_bloque=1,
+        )
+
+        assert list(df.columns) == ["x"]
+        assert avances == [1, 2, 3]
+        # Un bloque con solo nulos no debe convertir la columna en texto
+        assert df["x"].dtype == np.float64
+
+
+class TestCargaPorBloques:
+    """Pruebas para la lectura de CSV por bloques con progreso"""
+
+    @pytest.fixture
+    def ruta_csv_grande(self, tmp_path):
+        """Crea un CSV con suficientes filas para varios bloques"""
+        df = pd.DataFrame(
+            {
+                "x": np.arange(250),
+                "y": np.arange(250) * 0.5,
+                "texto": [f"fila_{i}" for i in range(250)],
+            }
+        )
+        ruta = tmp_path / "grande.csv"
+        df.to_csv(ruta, index=False)
+        return str(ruta), df
+
+    def test_bloques_equivalen_a_lectura_completa(self, ruta_csv_grande):
+        """La lectura por bloques produce el mismo DataFrame que read_csv"""
+        ruta, df = ruta_csv_grande
+        df_bloques = leer_csv_por_bloques(ruta, filas_por_bloque=40)
+
+        pd.testing.assert_frame_equal(df_bloques, pd.read_csv(ruta))
+
+    def test_trozos_y_pico_de_memoria(self, tmp_path, monkeypatch):
+        """Los bloques se unen en trozos según llegan sin tener el doble del resultado en memoria"""
+        n = 200_000
+        df = pd.DataFrame(
+            {c: np.arange(n) * 0.5 + i for i, c in enumerate("abcdefgh")}
+        )
+        # Columnas cuyo tipo cambia entre bloques: entera que luego tiene faltantes y texto
+        df["entero"] = np.arange(n)
+        df.loc[n - 5:, "entero"] = np.nan
+        df["texto"] = np.where(np.arange(n) < 100, "a", "")
+        ruta = str(tmp_path / "ancho.csv")
+        df.to_csv(ruta, index=False)
+        esperado = pd.read_csv(ruta, low_memory=False)
+        monkeypatch.setattr(dataset_readers, "BLOQUES_POR_TROZO", 3)
+
+        pd.testing.assert_frame_equal(
+            leer_csv_por_bloques(ruta, filas_por_bloque=7_000), esperado
+        )
+        del esperado
+        tracemalloc.start()
+        try:
+            resultado = leer_csv_por_bloques(ruta, filas_por_bloque=7_000)
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert pico < 1.5 * resultado.memory_usage(deep=True).sum()
+
+    def test_progreso_informa_bytes_y_filas(self, ruta_csv_grande):
+        """El callback de progreso recibe bytes leídos crecientes y el total de filas"""
+        ruta, df = ruta_csv_grande
+        avances = []
+        leer_csv_por_bloques(
+            ruta,
+            progress_callback=lambda b, t, f: avances.append((b, t, f)),
+            filas_por_bloque=40,
+        )
+
+        assert len(avances) == 7
+        assert avances[-1][0] == avances[-1][1] == os.path.getsize(ruta)
+        assert avances[-1][2] == len(df)
+        assert [a[2] for a in avances] == sorted(a[2] for a in avances)
+
+    def test_solo_cabecera(self, tmp_path):
+        """Un CSV con cabecera y sin filas devuelve un DataFrame vacío con columnas"""
+        ruta = tmp_path / "cabecera.csv"
+        ruta.write_text("a,b\n")
+
+        df = leer_csv_por_bloques(str(ruta))
+
+        assert list(df.columns) == ["a", "b"]
+        assert len(df) == 0
+
+
+class TestHojasExcel:
+    """Pruebas para la lectura en streaming de hojas de Excel"""
+
+    @pytest.fixture
+    def ruta_libro(self, tmp_path):
+        """Crea un libro con dos hojas de iguales columnas y una distinta"""
+        ruta = str(tmp_path / "libro.xlsx")
+        enero = pd.DataFrame(
+            {"x": [1.0, None, 3.0], "y": [0.5, 1.5, 2.5], "z": ["a", "b", "c"]}
+        )
+        febrero = pd.DataFrame(
+            {"x": [4.0, 5.0], "y": [3.5, 4.5], "z": ["d", "e"]}
+        )
+        otra = pd.DataFrame({"w": [1, 2]})
+        with pd.ExcelWriter(ruta) as writer:
+            enero.to_excel(writer, sheet_name="enero", index=False)
+            febrero.to_excel(writer, sheet_name="febrero", index=False)
+            otra.to_excel(writer, sheet_name="otra", index=False)
+        return ruta
+
+    def test_listar_hojas(self, ruta_libro):
+        """Se listan los nombres de las hojas sin leer su contenido"""
+        assert listar_hojas_excel(ruta_libro) == ["enero", "febrero", "otra"]
+
+    def test_hoja_equivale_a_read_excel(self, ruta_libro):
+        """La lectura en streaming produce lo mismo que pandas para la hoja elegida"""
+        for hoja in ("enero", "febrero"):
+            pd.testing.assert_frame_equal(
+                leer_hoja_excel(ruta_libro, hoja, filas_por_bloque=1),
+                pd.read_excel(ruta_libro, sheet_name=hoja),
+            )
+
+    def test_columnas_y_filas_limitadas(self, ruta_libro):
+        """Solo se extraen las columnas y filas pedidas"""
+        df = leer_hoja_excel(ruta_libro, "enero", columnas=["z", "y"], n_filas=2)
+
+        assert list(df.columns) == ["z", "y"]
+        assert df["z"].tolist() == ["a", "b"]
+
+    def test_concatenar_hojas_con_estadisticas(self, ruta_libro):
+        """Varias hojas se unen y se informa del tiempo y la memoria de cada una"""
+        df = cargar_dataset(ruta_libro, hojas=["enero", "febrero"])
+
+        assert df["x"].tolist()[3:] == [4.0, 5.0]
+        assert len(df) == 5
+        estadisticas = df.attrs["estadisticas_hojas"]
+        assert [e[0] for e in estadisticas] == ["enero", "febrero"]
+        assert [e[2] for e in estadisticas] == [3, 2]
+        assert all(e[1] >= 0 and e[3] > 0 for e in estadisticas)
+
+    def test_pico_de_memoria_por_hoja(self, ruta_libro, monkeypatch):
+        """Cada hoja informa de cuánto sube el pico del proceso, no del pico acumulado"""
+        # Pico del proceso antes y después de cada hoja: la segunda no supera el de la primera
+        picos = iter([100e6, 150e6, 150e6, 150e6])
+        monkeypatch.setattr(dataset_readers, "_pico_memoria_proceso", lambda: next(picos))
+        _, estadisticas = leer_hojas_excel(
+            ruta_libro, ["enero", "febrero"], en_paralelo=False
+        )
+
+        assert [e[4] for e in estadisticas] == [50e6, 0]
+        texto = texto_estadisticas_hojas(estadisticas)
+        assert "(pico del proceso +50 MB)" in texto
+        assert "(pico del proceso +0 MB)" in texto
+
+    def test_hojas_en_paralelo(self, ruta_libro):
+        """La lectura en varios procesos da el mismo resultado que la secuencial"""
+        secuencial, _ = leer_hojas_excel(
+            ruta_libro, ["enero", "febrero"], en_paralelo=False
+        )
+        paralelo, _ = leer_hojas_excel(
+            ruta_libro, ["enero", "febrero"], en_paralelo=True
+        )
+
+        pd.testing.assert_frame_equal(secuencial, paralelo)
+
+    def test_hojas_con_columnas_distintas(self, ruta_libro):
+        """No se concatenan hojas con esquemas diferentes"""
+        with pytest.raises(ValueError):
+            leer_hojas_excel(ruta_libro, ["enero", "otra"], en_paralelo=False)
+        assert cargar_dataset(ruta_libro, hojas=["enero", "otra"]) is None
+
+
+class TestVariosArchivos:
+    """Pruebas para la carga de varios archivos particionados"""
+
+    @pytest.fixture
+    def rutas_particiones(self, tmp_path):
+        """Crea tres particiones diarias con las mismas columnas"""
+        rutas = []
+        for dia in range(1, 4):
+            ruta = str(tmp_path / f"ventas_2026-01-0{dia}.csv")
+            pd.DataFrame(
+                {"dia": [dia] * 4, "importe": np.arange(4) * float(dia)}
+            ).to_csv(ruta, index=False)
+            rutas.append(ruta)
+        (tmp_path / "notas.txt").write_text("no es un dataset")
+        return rutas
+
+    def test_expandir_patron(self, rutas_particiones, tmp_path):
+        """El patrón devuelve solo archivos de datos, en orden"""
+        rutas = expandir_patron(str(tmp_path / "*"))
+
+        assert rutas == rutas_particiones
+
+    def test_concatenar_con_progreso_por_archivo(self, rutas_particiones):
+        """Los archivos se concatenan en orden y se informa al terminar cada uno"""
+        avances = []
+        df, estadisticas = leer_archivos(
+            rutas_particiones,
+            progress_callback=lambda b, t, f: avances.append((b, t, f)),
+            en_paralelo=False,
+        )
+
+        assert df["dia"].tolist() == [1] * 4 + [2] * 4 + [3] * 4
+        assert [e[2] for e in estadisticas] == [4, 4, 4]
+        assert len(avances) == 3
+        assert avances[-1][0] == avances[-1][1]
+        assert avances[-1][2] == 12
+
+    def test_lectura_en_paralelo(self, rutas_particiones):
+        """El pool de procesos da el mismo resultado que la lectura secuencial"""
+        secuencial, _ = leer_archivos(rutas_particiones, en_paralelo=False)
+        paralelo, _ = leer_archivos(rutas_particiones, en_paralelo=True)
+
+        pd.testing.assert_frame_equal(secuencial, paralelo)
+
+    def test_columnas_de_varios_archivos(self, rutas_particiones):
+        """cargar_dataset proyecta columnas en todos los archivos"""
+        df = cargar_dataset(
+            rutas_particiones[0], columnas=["importe"], archivos=rutas_particiones
+        )
+
+        assert list(df.columns) == ["importe"]
+        assert len(df) == 12
+        assert len(df.attrs["estadisticas_archivos"]) == 3
+
+    def test_esquemas_distintos(self, rutas_particiones, tmp_path):
+        """No se concatenan archivos con columnas diferentes"""
+        ruta = str(tmp_path / "otra.csv")
+        pd.DataFrame({"otra": [1]}).to_csv(ruta, index=False)
+
+        with pytest.raises(ValueError):
+            leer_archivos(rutas_particiones + [ruta], en_paralelo=False)
+        assert (
+            cargar_dataset(ruta, archivos=rutas_particiones + [ruta]) is None
+        )
+
+
+class TestVistaPrevia:
+    """Pruebas para la lectura rápida de las primeras filas"""
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame de prueba con más filas que la vista previa"""
+        return pd.DataFrame({"a": range(50), "b": range(50, 100)})
+
+    def test_vista_previa_csv(self, datos, tmp_path):
+        """La vista previa de un CSV contiene la cabecera y las primeras filas"""
+        ruta = str(tmp_path / "datos.csv")
+        datos.to_csv(ruta, index=False)
+
+        df = cargar_vista_previa(ruta, n_filas=10)
+
+        assert list(df.columns) == ["a", "b"]
+        pd.testing.assert_frame_equal(df, datos.head(10))
+
+    def test_vista_previa_sqlite(self, datos, tmp_path):
+        """La vista previa de SQLite limita las filas en la propia consulta"""
+        ruta = str(tmp_path / "datos.db")
+        conn = sqlite3.connect(ruta)
+        datos.to_sql("datos", conn, index=False)
+        conn.close()
+
+        df = cargar_vista_previa(ruta, n_filas=5)
+
+        assert len(df) == 5
+        assert list(df.columns) == ["a", "b"]
+
+    def test_vista_previa_archivo_invalido(self):
+        """Si no se puede leer el archivo, la vista previa devuelve None"""
+        assert cargar_vista_previa("no_existe.csv") is None
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
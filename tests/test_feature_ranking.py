@@ -0,0 +1,94 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import feature_ranking  # noqa: E402
+from column_list import ListaColumnas  # noqa: E402
+from feature_ranking import CacheRanking, ranking_columnas, resumen_ranking  # noqa: E402
+
+
+class TestRankingColumnas:
+    """Pruebas para la relevancia de las columnas respecto a la salida"""
+
+    @pytest.fixture
+    def df(self):
+        """Crea un DataFrame con entradas de distinta relevancia, faltantes y una constante"""
+        rng = np.random.default_rng(7)
+        n = 500
+        df = pd.DataFrame(rng.normal(size=(n, 4)), columns=["a", "b", "c", "d"])
+        df["y"] = 3 * df["a"] - df["b"] + 0.1 * rng.normal(size=n) + 1e9
+        df["d"] = df["d"] + 1e9
+        df.loc[::7, "a"] = np.nan
+        df.loc[::11, "y"] = np.nan
+        df["constante"] = 5.0
+        df["entero_nulos"] = pd.array([i if i % 3 else None for i in range(n)], dtype="Int64")
+        df["ciudad"] = "Madrid"
+        return df
+
+    def test_igual_que_correlacion_por_parejas(self, df, monkeypatch):
+        """Cada correlación coincide con la de numpy sobre los pares completos, por bloques"""
+        # Bloques pequeños para recorrer varios
+        monkeypatch.setattr(feature_ranking, "ELEMENTOS_POR_BLOQUE", 64)
+        ranking = ranking_columnas(df, "y").set_index("columna")
+
+        for columna in ["a", "b", "c", "d", "entero_nulos"]:
+            pares = df[[columna, "y"]].astype(float).dropna()
+            esperada = np.corrcoef(pares[columna], pares["y"])[0, 1]
+            assert ranking.loc[columna, "correlacion"] == pytest.approx(esperada, abs=1e-9)
+            assert ranking.loc[columna, "r2"] == pytest.approx(esperada**2, abs=1e-9)
+            assert ranking.loc[columna, "filas"] == len(pares)
+
+    def test_orden_y_columnas(self, df):
+        """Solo entran las columnas numéricas, de mayor a menor R² y las indefinidas al final"""
+        ranking = ranking_columnas(df, "y")
+        assert list(ranking["columna"][:2]) == ["a", "b"]
+        assert "ciudad" not in set(ranking["columna"])
+        assert "y" not in set(ranking["columna"])
+        assert ranking["columna"].iloc[-1] == "constante"
+        assert np.isnan(ranking["r2"].iloc[-1])
+
+    def test_cache_por_salida(self, df, monkeypatch):
+        """Cada salida se calcula una sola vez"""
+        llamadas = []
+        original = feature_ranking.ranking_columnas
+
+        def contar(datos, salida):
+            llamadas.append(salida)
+            return original(datos, salida)
+
+        monkeypatch.setattr(feature_ranking, "ranking_columnas", contar)
+        cache = CacheRanking(df)
+        primero = cache.ranking("y")
+        assert cache.ranking("y") is primero
+        cache.ranking("a")
+        assert llamadas == ["y", "a"]
+        assert set(cache.ranking("a")["columna"]) >= {"y", "b"}
+
+    def test_vista_previa_y_datos_completos(self, df):
+        """El ranking de la vista previa se indica como muestra y el completo usa todas las filas"""
+        previa = CacheRanking(df.head(200)).ranking("y")
+        completo = CacheRanking(df).ranking("y")
+        filas = dict(zip(completo["columna"], completo["filas"]))
+        assert filas["b"] == df["y"].notna().sum()
+        assert dict(zip(previa["columna"], previa["filas"]))["b"] < filas["b"]
+
+        assert resumen_ranking(completo, len(df)) == "6 columnas numéricas · 500 filas"
+        assert resumen_ranking(previa, 200, completo=False) == (
+            "6 columnas numéricas · muestra de las primeras 200 filas (vista previa)"
+        )
+
+    def test_marcar_mejores(self, df):
+        """Las k columnas con mayor R² se marcan en la lista del selector"""
+        lista = ListaColumnas.desde_datos(df)
+        ranking = ranking_columnas(df, "y")
+        assert lista.marcar_columnas(ranking["columna"].head(2)) == 2
+        assert lista.marcar_columnas(["a", "inexistente"]) == 0
+        assert lista.seleccionadas() == ["a", "b"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,188 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+import warnings
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import missing_index  # noqa: E402
+from dataset_lineage import VersionDataset  # noqa: E402
+from missing_index import indice_faltantes  # noqa: E402
+from pipeline import entrenar_modelo, separar_conjuntos, tratar_faltantes  # noqa: E402
+
+
+class WidgetFalso:
+    """Widget de Tk simulado: guarda las llamadas a after y acepta cualquier otro método"""
+
+    creados = []
+
+    def __init__(self, *args, **kwargs):
+        self.pendientes = []
+        WidgetFalso.creados.append(self)
+
+    def after(self, _retardo, funcion):
+        self.pendientes.append(funcion)
+
+    def __getattr__(self, nombre):
+        return lambda *args, **kwargs: None
+
+
+class HiloInmediato:
+    """Sustituye a threading.Thread ejecutando la función al arrancar"""
+
+    def __init__(self, target, daemon=None):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+class TestIndiceFaltantes:
+    """Pruebas para el índice de faltantes que comparten todos los pasos del flujo"""
+
+    @pytest.fixture
+    def df(self):
+        """Crea un DataFrame con faltantes escasos, abundantes y sin faltantes"""
+        n = 1000
+        x = np.arange(n, dtype=float)
+        escasa = x.copy()
+        escasa[[3, 500]] = np.nan
+        abundante = x * 2
+        abundante[::3] = np.nan
+        return pd.DataFrame(
+            {
+                "escasa": escasa,
+                "abundante": abundante,
+                "texto": [None if i % 10 == 0 else "a" for i in range(n)],
+                "completa": x,
+                "y": 3 * x + 1,
+            }
+        )
+
+    def test_cuentas_posiciones_y_mascaras(self, df):
+        """El índice coincide con isnull() y guarda posiciones o un bit por celda según convenga"""
+        indice = indice_faltantes(df)
+        for columna in df.columns:
+            nulos = df[columna].isnull().to_numpy()
+            assert indice.cuenta(columna) == nulos.sum()
+            np.testing.assert_array_equal(indice.mascara(columna), nulos)
+            np.testing.assert_array_equal(indice.posiciones(columna), np.flatnonzero(nulos))
+            filas = np.array([999, 3, 0, 500, 6])
+            np.testing.assert_array_equal(indice.mascara(columna, filas), nulos[filas])
+
+        _, posiciones, bits = indice._entrada("escasa")
+        assert bits is None and posiciones.tolist() == [3, 500]
+        _, posiciones, bits = indice._entrada("abundante")
+        assert posiciones is None and bits.nbytes == 125
+        assert indice._entrada("completa") == (0, None, None)
+
+    def test_se_recorre_una_vez(self, df, monkeypatch):
+        """Detectar, eliminar, separar y validar consultan el índice sin volver a buscar nulos"""
+        indice_faltantes(df).calcular()
+        llamadas = []
+        original = pd.Series.isnull
+
+        def contar(serie):
+            # pandas también llama a isna sobre series internas sin nombre al construir tablas
+            if serie.name in df.columns:
+                llamadas.append(serie.name)
+            return original(serie)
+
+        monkeypatch.setattr(pd.Series, "isnull", contar)
+        monkeypatch.setattr(pd.Series, "isna", contar)
+        version = VersionDataset(df).seleccionar(["escasa", "completa", "y"])
+        assert version.faltantes().to_dict() == {"escasa": 2, "completa": 0, "y": 0}
+        limpia = tratar_faltantes(version, "eliminar")
+        assert len(limpia) == 998
+        train, test, _, _ = separar_conjuntos(limpia, 80, semilla=0)
+        assert train.faltantes().sum() == 0
+        resultado = entrenar_modelo(train, test)
+        assert resultado["metricas"]["r2_test"] == pytest.approx(1.0)
+        assert llamadas == []
+
+    def test_validacion_antes_de_entrenar(self, df):
+        """Las columnas con faltantes en entrenamiento se indican sin materializar los datos"""
+        version = VersionDataset(df).seleccionar(["completa", "escasa", "y"])
+        train, test, _, _ = separar_conjuntos(version, 80, semilla=0)
+        if not train.faltantes()["escasa"]:
+            train, test = test, train
+        with pytest.raises(ValueError, match="columnas: escasa\\."):
+            entrenar_modelo(train, test)
+        assert train._materializada is None
+
+        rellena = tratar_faltantes(version, "constante", 0.0)
+        assert rellena.faltantes().sum() == 0
+        assert rellena.filas_completas().all()
+
+    def test_entrenamiento_desde_la_interfaz(self, df, monkeypatch):
+        """La pantalla de creación del modelo recibe versiones y valida sin recorrer los nulos"""
+        # graphic_interface_model importa matplotlib, que usa nombres de pyparsing obsoletos y
+        # emite PyparsingDeprecationWarning al importarse; solo esta prueba lo necesita
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            import graphic_interface_model
+
+        version = tratar_faltantes(VersionDataset(df).seleccionar(["escasa", "y"]), "eliminar")
+        train, test, _, _ = separar_conjuntos(version, 80, semilla=0)
+        recibidos = []
+        original = graphic_interface_model.entrenar_modelo
+
+        def entrenar(train_df, test_df, cancelacion=None):
+            recibidos.append((train_df, test_df))
+            return original(train_df, test_df, cancelacion)
+
+        llamadas = []
+        isnull = pd.Series.isnull
+
+        def contar(serie):
+            if serie.name in df.columns:
+                llamadas.append(serie.name)
+            return isnull(serie)
+
+        WidgetFalso.creados = []
+        monkeypatch.setattr(graphic_interface_model, "entrenar_modelo", entrenar)
+        monkeypatch.setattr(graphic_interface_model, "tk", SimpleNamespace(Canvas=WidgetFalso))
+        monkeypatch.setattr(
+            graphic_interface_model, "ttk", SimpleNamespace(Frame=WidgetFalso, Scrollbar=WidgetFalso)
+        )
+        monkeypatch.setattr(graphic_interface_model, "threading", SimpleNamespace(Thread=HiloInmediato))
+        monkeypatch.setattr(graphic_interface_model, "time", SimpleNamespace(sleep=lambda s: None))
+        monkeypatch.setattr(pd.Series, "isnull", contar)
+        monkeypatch.setattr(pd.Series, "isna", contar)
+        detenido = []
+        graphic_interface_model.dibujar_ui_model_creation(
+            WidgetFalso(), WidgetFalso(), train, test, stop_progress=lambda: detenido.append(True)
+        )
+
+        assert recibidos == [(train, test)]
+        assert llamadas == []
+        assert detenido == [True]
+        # Se programó el dibujo de los resultados, no un mensaje de error
+        assert sum(len(w.pendientes) for w in WidgetFalso.creados) == 1
+
+    def test_indice_se_libera_y_se_recalcula(self):
+        """Cada DataFrame tiene su índice, que se rehace si una columna cambia y se libera con él"""
+        df = pd.DataFrame({"x": [1.0, np.nan, 3.0], "t": ["a", None, "c"]})
+        indice = indice_faltantes(df)
+        assert indice_faltantes(df) is indice
+        assert indice.cuenta("x") == 1
+        # Cambios en el sitio que conservan el tipo y la longitud de la columna
+        df.loc[0, "x"] = np.nan
+        assert indice.cuenta("x") == 2
+        df.fillna({"x": 0.0, "t": "b"}, inplace=True)
+        assert indice.cuenta("x") == 0 and indice.cuenta("t") == 0
+        df["x"] = np.nan
+        assert indice.cuenta("x") == 3
+        assert indice_faltantes(df.copy()) is not indice
+
+        clave = id(df)
+        assert clave in missing_index._indices
+        del df, indice
+        assert clave not in missing_index._indices
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,174 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+import sqlite3
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_squared_error, r2_score
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import dataset_cache  # noqa: E402
+from cancellation import OperacionCancelada, TokenCancelacion  # noqa: E402
+from dataset_readers import iterar_dataset  # noqa: E402
+from out_of_core import (  # noqa: E402
+    DatosFueraDeMemoria,
+    ajustar_regresion,
+    calcular_rellenos,
+    contar_faltantes,
+    directorio_almacenes,
+    evaluar_regresion,
+    volcar_a_disco,
+)
+
+
+def _materializar(datos, filas_por_bloque=1000):
+    """Reúne todos los bloques de una vista en un DataFrame"""
+    return pd.DataFrame(
+        np.concatenate(list(datos.bloques(filas_por_bloque=filas_por_bloque))),
+        columns=datos.columnas,
+    )
+
+
+class TestFueraDeMemoria:
+    """Pruebas para el modo fuera de memoria sobre un almacén de columnas en disco"""
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame con una relación lineal, ruido y valores faltantes"""
+        rng = np.random.default_rng(0)
+        n = 5000
+        df = pd.DataFrame(
+            {
+                "x1": rng.normal(size=n) * 10 + 1000,
+                "x2": rng.normal(size=n),
+                "texto": ["a"] * n,
+            }
+        )
+        df["y"] = 3 * df["x1"] - 2 * df["x2"] + 7 + rng.normal(size=n)
+        df.loc[::10, "x2"] = np.nan
+        return df
+
+    @pytest.fixture
+    def ruta_csv(self, datos, tmp_path):
+        """Guarda los datos en un CSV temporal"""
+        ruta = tmp_path / "datos.csv"
+        datos.to_csv(ruta, index=False)
+        return str(ruta)
+
+    @pytest.fixture(autouse=True)
+    def cache_temporal(self, tmp_path, monkeypatch):
+        """Usa un directorio de caché temporal para los almacenes"""
+        monkeypatch.setattr(
+            dataset_cache, "DIRECTORIO_CACHE", str(tmp_path / "cache")
+        )
+
+    def test_volcado_y_faltantes(self, datos, ruta_csv):
+        """El volcado conserva los valores y cuenta los faltantes sin otra pasada"""
+        almacen = volcar_a_disco(ruta_csv, ["x1", "x2", "y"])
+        vista = DatosFueraDeMemoria(almacen)
+
+        assert len(almacen) == len(datos)
+        pd.testing.assert_frame_equal(
+            _materializar(vista, filas_por_bloque=700), datos[["x1", "x2", "y"]]
+        )
+        assert contar_faltantes(vista).to_dict() == {"x1": 0, "x2": 500, "y": 0}
+        assert len(vista.muestra(10)) == 10
+
+        almacen.eliminar()
+        assert not os.path.exists(almacen.directorio)
+
+    def test_volcado_no_numerico_o_cancelado(self, ruta_csv):
+        """Un volcado fallido o cancelado no deja almacenes en disco"""
+        with pytest.raises(ValueError, match="texto"):
+            volcar_a_disco(ruta_csv, ["x1", "texto"])
+        token = TokenCancelacion()
+        token.cancelar()
+        with pytest.raises(OperacionCancelada):
+            volcar_a_disco(ruta_csv, ["x1"], cancelacion=token)
+
+        assert os.listdir(directorio_almacenes()) == []
+
+    def test_rellenos(self, datos, ruta_csv):
+        """La media es exacta y la mediana se aproxima con el histograma"""
+        vista = DatosFueraDeMemoria(volcar_a_disco(ruta_csv, ["x1", "x2", "y"]))
+
+        medias = calcular_rellenos(vista, "media")
+        medianas = calcular_rellenos(vista, "mediana")
+        preprocesados = _materializar(vista.preprocesar(medias))
+
+        assert medias["x2"] == pytest.approx(datos["x2"].mean())
+        rango = datos["x2"].max() - datos["x2"].min()
+        assert abs(medianas["x2"] - datos["x2"].median()) < rango / 1000
+        assert calcular_rellenos(vista, "eliminar") == {}
+        assert len(_materializar(vista.preprocesar({}))) == 4500
+        assert preprocesados["x2"].isnull().sum() == 0
+        assert len(preprocesados) == len(datos)
+        with pytest.raises(ValueError):
+            calcular_rellenos(vista, "constante", "abc")
+
+    def test_separacion_en_streaming(self, ruta_csv):
+        """Los conjuntos son complementarios, reproducibles y no dependen del tamaño de bloque"""
+        vista = DatosFueraDeMemoria(volcar_a_disco(ruta_csv, ["x1", "x2", "y"]))
+        train, test = vista.preprocesar({}).separar(0.2, semilla=7)
+
+        train_a = _materializar(train, filas_por_bloque=300)
+        train_b = _materializar(train, filas_por_bloque=4096)
+        test_df = _materializar(test)
+
+        pd.testing.assert_frame_equal(train_a, train_b)
+        assert train.contar_separacion() == (len(train_a), len(test_df))
+        assert len(train_a) + len(test_df) == 4500
+        assert 0.15 < len(test_df) / 4500 < 0.25
+        juntos = pd.concat([train_a, test_df]).sort_values("x1")
+        assert juntos["x1"].is_unique
+
+    def test_regresion_con_estadisticos_suficientes(self, ruta_csv):
+        """El ajuste por bloques coincide con LinearRegression sobre los mismos datos"""
+        vista = DatosFueraDeMemoria(volcar_a_disco(ruta_csv, ["x1", "x2", "y"]))
+        train, test = vista.preprocesar({}).separar(0.25, semilla=3)
+        train_df = _materializar(train)
+        test_df = _materializar(test)
+        referencia = LinearRegression().fit(train_df[["x1", "x2"]], train_df["y"])
+
+        modelo, r2_train, ecm_train = ajustar_regresion(train)
+        r2_test, ecm_test = evaluar_regresion(modelo, test)
+
+        np.testing.assert_allclose(modelo.coef_, referencia.coef_, rtol=1e-8)
+        assert modelo.intercept_ == pytest.approx(referencia.intercept_, rel=1e-6)
+        pred_train = referencia.predict(train_df[["x1", "x2"]])
+        pred_test = referencia.predict(test_df[["x1", "x2"]])
+        assert r2_train == pytest.approx(r2_score(train_df["y"], pred_train))
+        assert ecm_train == pytest.approx(
+            mean_squared_error(train_df["y"], pred_train), rel=1e-6
+        )
+        assert r2_test == pytest.approx(r2_score(test_df["y"], pred_test))
+        assert ecm_test == pytest.approx(
+            mean_squared_error(test_df["y"], pred_test), rel=1e-6
+        )
+        np.testing.assert_allclose(
+            modelo.predict(test_df[["x1", "x2"]]), pred_test, rtol=1e-8
+        )
+
+    def test_iterar_sqlite_y_parquet(self, datos, tmp_path):
+        """SQLite y Parquet también se recorren por bloques"""
+        pytest.importorskip("pyarrow")
+        ruta_db = tmp_path / "datos.db"
+        conn = sqlite3.connect(ruta_db)
+        datos.to_sql("medidas", conn, index=False)
+        conn.close()
+        ruta_parquet = tmp_path / "datos.parquet"
+        datos.to_parquet(ruta_parquet, row_group_size=1000)
+
+        bloques_parquet = list(iterar_dataset(str(ruta_parquet), columnas=["y"]))
+        almacen = volcar_a_disco(str(ruta_db), ["x1", "y"], tabla="medidas")
+
+        assert len(bloques_parquet) == 5
+        assert list(bloques_parquet[0].columns) == ["y"]
+        assert len(almacen) == len(datos)
+        np.testing.assert_allclose(almacen.columna("y"), datos["y"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,174 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+import multiprocessing
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import dataset_cache  # noqa: E402
+from out_of_core import DatosFueraDeMemoria  # noqa: E402
+from pipeline import (  # noqa: E402
+    DatosInsuficientes,
+    cargar_datos,
+    detectar_faltantes,
+    ejecutar_flujo,
+    entrenar_modelo,
+    separar_conjuntos,
+    seleccionar_columnas,
+    tratar_faltantes,
+)
+
+RUTA_SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+
+
+class TestFlujoSinInterfaz:
+    """Pruebas para la API del flujo de carga, preprocesado y entrenamiento sin Tkinter"""
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame con una relación lineal, faltantes y una columna de texto"""
+        rng = np.random.default_rng(1)
+        n = 200
+        df = pd.DataFrame(
+            {
+                "x1": rng.normal(size=n),
+                "x2": rng.normal(size=n),
+                "texto": ["a"] * n,
+            }
+        )
+        df["y"] = 2 * df["x1"] - df["x2"] + 5
+        df.loc[::20, "x1"] = np.nan
+        return df
+
+    @pytest.fixture
+    def ruta_csv(self, datos, tmp_path):
+        """Guarda los datos en un CSV temporal"""
+        ruta = tmp_path / "datos.csv"
+        datos.to_csv(ruta, index=False)
+        return str(ruta)
+
+    @pytest.fixture(autouse=True)
+    def cache_temporal(self, tmp_path, monkeypatch):
+        """Usa un directorio de caché temporal para los almacenes"""
+        monkeypatch.setattr(
+            dataset_cache, "DIRECTORIO_CACHE", str(tmp_path / "cache")
+        )
+
+    def test_seleccion_invalida(self, datos):
+        """Una selección inválida lanza ValueError en lugar de mostrar un diálogo"""
+        with pytest.raises(ValueError, match="al menos una"):
+            seleccionar_columnas(datos, [], "y")
+        with pytest.raises(ValueError, match="no puede ser una entrada"):
+            seleccionar_columnas(datos, ["x1", "y"], "y")
+        with pytest.raises(ValueError, match="texto"):
+            seleccionar_columnas(datos, ["x1", "texto"], "y")
+        with pytest.raises(ValueError, match="inexistentes"):
+            seleccionar_columnas(datos, ["x3"], "y")
+
+    def test_estrategias_de_faltantes(self, datos):
+        """Cada estrategia coincide con su equivalente en pandas"""
+        seleccion = seleccionar_columnas(datos, ["x1", "x2"], "y")
+        esperado = datos[["x1", "x2", "y"]]
+
+        assert detectar_faltantes(seleccion).to_dict() == {"x1": 10}
+        pd.testing.assert_frame_equal(
+            tratar_faltantes(seleccion, "eliminar").materializar(), esperado.dropna()
+        )
+        pd.testing.assert_frame_equal(
+            tratar_faltantes(seleccion, "mediana").materializar(),
+            esperado.fillna(esperado.median()),
+        )
+        constante = tratar_faltantes(seleccion, "constante", 0.0).materializar()
+        assert constante["x1"].isnull().sum() == 0
+        with pytest.raises(ValueError):
+            tratar_faltantes(seleccion, "constante")
+        with pytest.raises(ValueError):
+            tratar_faltantes(seleccion, "interpolar")
+
+    def test_separacion(self, datos):
+        """La separación reparte igual que train_test_split y valida sus parámetros"""
+        procesados = tratar_faltantes(
+            seleccionar_columnas(datos, ["x1", "x2"], "y"), "media"
+        )
+        train, test, filas_train, filas_test = separar_conjuntos(procesados, "75", 4)
+        referencia, _ = train_test_split(
+            procesados.materializar(), test_size=0.25, random_state=4
+        )
+
+        assert (filas_train, filas_test) == (150, 50)
+        pd.testing.assert_frame_equal(train.materializar(), referencia)
+        with pytest.raises(ValueError):
+            separar_conjuntos(procesados, 100)
+        with pytest.raises(DatosInsuficientes):
+            separar_conjuntos(procesados.tomar([0, 1, 2]), 50)
+
+    def test_entrenamiento(self, datos):
+        """El modelo entrenado coincide con LinearRegression y sus métricas son las del JSON guardado"""
+        procesados = tratar_faltantes(
+            seleccionar_columnas(datos, ["x1", "x2"], "y"), "eliminar"
+        )
+        train, test, _, _ = separar_conjuntos(procesados, 80, 0)
+        resultado = entrenar_modelo(train, test)
+        df_train = train.materializar()
+        referencia = LinearRegression().fit(df_train[["x1", "x2"]], df_train["y"])
+
+        assert resultado["entradas"] == ["x1", "x2"]
+        assert resultado["salida"] == "y"
+        np.testing.assert_allclose(resultado["modelo"].coef_, referencia.coef_)
+        assert set(resultado["metricas"]) == {"r2_train", "r2_test", "ecm_train", "ecm_test"}
+        assert resultado["metricas"]["r2_test"] == pytest.approx(1.0)
+
+    def test_flujo_completo_en_memoria_y_fuera(self, ruta_csv):
+        """El flujo completo recupera la relación en memoria y fuera de memoria"""
+        en_memoria = ejecutar_flujo(ruta_csv, ["x1", "x2"], "y", "eliminar", 70, semilla=2)
+        fuera = ejecutar_flujo(
+            ruta_csv, ["x1", "x2"], "y", "eliminar", 70, semilla=2, fuera_de_memoria=True
+        )
+        datos = cargar_datos(ruta_csv, ["x1", "y"], fuera_de_memoria=True)
+
+        assert isinstance(datos, DatosFueraDeMemoria)
+        datos.almacen.eliminar()
+        np.testing.assert_allclose(en_memoria["modelo"].coef_, [2.0, -1.0])
+        np.testing.assert_allclose(fuera["modelo"].coef_, [2.0, -1.0])
+        assert fuera["metricas"]["ecm_test"] == pytest.approx(0.0, abs=1e-12)
+        assert os.listdir(os.path.dirname(datos.almacen.directorio)) == []
+        with pytest.raises(ValueError):
+            cargar_datos(ruta_csv, fuera_de_memoria=True)
+
+    def test_flujo_en_pool_de_procesos(self, ruta_csv):
+        """El flujo se puede lanzar en un pool de procesos"""
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=2, mp_context=contexto) as pool:
+            futuros = [
+                pool.submit(ejecutar_flujo, ruta_csv, ["x1", "x2"], "y", "eliminar", 80, s)
+                for s in (1, 2)
+            ]
+            resultados = [f.result() for f in futuros]
+
+        for resultado in resultados:
+            np.testing.assert_allclose(resultado["modelo"].coef_, [2.0, -1.0])
+
+    def test_sin_tkinter(self, ruta_csv):
+        """El flujo se importa y se ejecuta en un intérprete donde tkinter no está disponible"""
+        codigo = (
+            "import sys\n"
+            "sys.modules['tkinter'] = None\n"
+            f"sys.path.insert(0, {RUTA_SRC!r})\n"
+            "from pipeline import ejecutar_flujo\n"
+            f"resultado = ejecutar_flujo({ruta_csv!r}, ['x1', 'x2'], 'y', 'eliminar', 80, semilla=0)\n"
+            "print(resultado['metricas']['r2_test'])\n"
+        )
+        proceso = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True)
+
+        assert proceso.returncode == 0, proceso.stderr
+        assert float(proceso.stdout) == pytest.approx(1.0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,166 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import dataset_lineage  # noqa: E402
+from dataset_lineage import VersionDataset  # noqa: E402
+from table_query import ConsultaTabla, mascara_condicion  # noqa: E402
+
+
+class TestOrdenYFiltrosTabla:
+    """Pruebas para el orden y los filtros de la tabla de datos"""
+
+    @pytest.fixture
+    def df(self):
+        """Crea un DataFrame pequeño con faltantes, texto y categorías"""
+        return pd.DataFrame(
+            {
+                "precio": [30.0, np.nan, 10.0, 20.0, 10.0],
+                "ciudad": ["Madrid", "Sevilla", None, "madrid norte", "Bilbao"],
+                "zona": pd.Categorical(["a", "b", "a", None, "c"]),
+                "habitaciones": [3, 1, 2, 2, 4],
+            }
+        )
+
+    def test_condiciones(self, df):
+        """Cada operador, la búsqueda de texto y las categorías dan la máscara esperada"""
+        assert mascara_condicion(df["precio"], "> 15").tolist() == [
+            True, False, False, True, False
+        ]
+        assert mascara_condicion(df["precio"], "!=10").tolist() == [
+            True, False, False, True, False
+        ]
+        assert mascara_condicion(df["habitaciones"], "<= 2").tolist() == [
+            False, True, True, True, False
+        ]
+        assert mascara_condicion(df["ciudad"], "MADRID").tolist() == [
+            True, False, False, True, False
+        ]
+        assert mascara_condicion(df["ciudad"], "= Bilbao").tolist() == [
+            False, False, False, False, True
+        ]
+        assert mascara_condicion(df["zona"], "a").tolist() == [
+            True, False, True, False, False
+        ]
+        with pytest.raises(ValueError):
+            mascara_condicion(df["precio"], "> barato")
+        with pytest.raises(ValueError):
+            mascara_condicion(df["precio"], ">=")
+
+    def test_orden_cacheado_en_la_version(self, df):
+        """El orden deja los faltantes al final y se calcula una vez por columna y sentido"""
+        version = VersionDataset(df)
+        assert version.orden("precio").tolist() == [2, 4, 3, 0, 1]
+        # Los empates (filas 2 y 4) conservan su orden también en sentido descendente
+        assert version.orden("precio", descendente=True).tolist() == [0, 3, 2, 4, 1]
+        assert version.orden("ciudad").tolist() == [4, 0, 1, 3, 2]
+        assert version.orden("precio") is version.orden("precio")
+
+        # Una versión derivada tiene sus propias permutaciones
+        hija = version.tomar([4, 3, 2])
+        assert hija.orden("precio").tolist() == [0, 2, 1]
+
+    def test_orden_estable_y_compartido(self, df, monkeypatch):
+        """Ambos sentidos son estables y las tablas nuevas reutilizan el orden mientras la columna no cambie"""
+        rng = np.random.default_rng(3)
+        n = 2000
+        grande = pd.DataFrame(
+            {
+                "entero": rng.integers(0, 20, size=n),
+                "real": np.where(rng.random(n) < 0.1, np.nan, rng.integers(0, 5, size=n)),
+                "texto": rng.choice(["b", "a", None, "c"], size=n),
+                "categoria": pd.Categorical(rng.choice(["x", "y", None], size=n)),
+            }
+        )
+        for columna in grande.columns:
+            for descendente in (False, True):
+                esperado = grande[columna].reset_index(drop=True).sort_values(
+                    ascending=not descendente, kind="stable", na_position="last"
+                ).index.tolist()
+                assert VersionDataset(grande).orden(columna, descendente).tolist() == esperado
+                # Versión filtrada: se extrae de la permutación de la raíz
+                filtrada = VersionDataset(grande).filtrar(grande["entero"].to_numpy() % 3 == 0)
+                parte = grande[grande["entero"] % 3 == 0][columna].reset_index(drop=True)
+                assert filtrada.orden(columna, descendente).tolist() == parte.sort_values(
+                    ascending=not descendente, kind="stable", na_position="last"
+                ).index.tolist()
+
+        llamadas = []
+        original = dataset_lineage._argsort
+
+        def contar(serie):
+            llamadas.append(serie.name)
+            return original(serie)
+
+        monkeypatch.setattr(dataset_lineage, "_argsort", contar)
+        for _ in range(3):
+            # Cada cambio de datos de la tabla crea una consulta y una versión nuevas
+            consulta = ConsultaTabla(df)
+            consulta.ordenar("habitaciones")
+            consulta.ordenar("habitaciones")
+            consulta.resultado()
+        assert llamadas == ["habitaciones"]
+        # Un valor cambiado en el sitio (mismo tipo y longitud) obliga a volver a ordenar
+        df.loc[1, "habitaciones"] = 9
+        assert VersionDataset(df).orden("habitaciones").tolist() == [2, 3, 0, 4, 1]
+        assert VersionDataset(df).orden("habitaciones", descendente=True).tolist() == [1, 4, 0, 2, 3]
+        assert llamadas == ["habitaciones", "habitaciones"]
+
+    def test_consulta(self, df):
+        """Orden y filtros se combinan en una versión derivada que no copia los datos"""
+        consulta = ConsultaTabla(df)
+        assert not consulta.activa()
+        assert consulta.resultado().materializar() is not None
+
+        consulta.filtrar("habitaciones", ">= 2")
+        consulta.ordenar("precio")
+        resultado = consulta.resultado()
+        assert resultado.raiz is df
+        assert resultado.materializar()["precio"].tolist() == [10.0, 10.0, 20.0, 30.0]
+        assert consulta.resultado() is resultado
+
+        consulta.ordenar("precio")
+        assert consulta.orden == ("precio", True)
+        assert consulta.resultado().materializar()["habitaciones"].tolist() == [3, 2, 2, 4]
+
+        consulta.filtrar("ciudad", "madrid")
+        assert len(consulta.resultado()) == 2
+        consulta.filtrar("ciudad", "")
+        assert list(consulta.filtros) == ["habitaciones"]
+        with pytest.raises(ValueError):
+            consulta.filtrar("precio", "> mucho")
+        assert list(consulta.filtros) == ["habitaciones"]
+
+        consulta.quitar_filtros()
+        assert not consulta.activa()
+        assert len(consulta.resultado()) == len(df)
+
+    def test_dataset_grande(self):
+        """Con las permutaciones en caché, reordenar y filtrar un millón de filas es inmediato"""
+        n = 1_000_000
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame({"x": rng.normal(size=n), "y": rng.integers(0, 100, size=n)})
+        consulta = ConsultaTabla(df)
+        consulta.ordenar("x")
+        consulta.resultado()
+
+        inicio = time.perf_counter()
+        consulta.ordenar("x")
+        consulta.filtrar("y", "< 50")
+        resultado = consulta.resultado()
+        filas = resultado.materializar_filas(0, 20)
+        duracion = time.perf_counter() - inicio
+
+        assert duracion < 0.5
+        assert filas["x"].is_monotonic_decreasing
+        assert (filas["y"] < 50).all()
+        assert len(resultado) == int((df["y"] < 50).sum())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,268 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from cell_format import texto_celda  # noqa: E402
+from data_sources import FuenteDataFrame  # noqa: E402
+from table_view import (  # noqa: E402
+    ALTO_CABECERA,
+    ALTO_FILA,
+    COLOR_CABECERA,
+    COLOR_ENTRADA,
+    COLOR_SALIDA,
+    COLORES_FILAS,
+    TablaVirtual,
+    desplazar,
+    rango_columnas,
+)
+
+
+class CanvasFalso:
+    """Canvas mínimo que guarda los elementos en memoria (sin ventanas)"""
+
+    def __init__(self, ancho, alto):
+        self.ancho = ancho
+        self.alto = alto
+        self.elementos = {}
+        self.creados = 0
+        self.configuraciones = 0
+        self.pendientes = {}
+        self.programados = 0
+
+    def winfo_width(self):
+        return self.ancho
+
+    def winfo_height(self):
+        return self.alto
+
+    def _crear(self, tipo, coords, opciones):
+        self.creados += 1
+        self.elementos[self.creados] = {"tipo": tipo, "coords": coords, **opciones}
+        return self.creados
+
+    def create_rectangle(self, *coords, **opciones):
+        return self._crear("rect", coords, opciones)
+
+    def create_text(self, *coords, **opciones):
+        return self._crear("texto", coords, opciones)
+
+    def coords(self, elemento, *coords):
+        self.elementos[elemento]["coords"] = coords
+
+    def itemconfigure(self, elemento, **opciones):
+        """Configura un elemento por su identificador o todos los que tienen una etiqueta"""
+        self.configuraciones += 1
+        if isinstance(elemento, str):
+            for e in self.elementos.values():
+                if e.get("tags") == elemento:
+                    e.update(opciones)
+        else:
+            self.elementos[elemento].update(opciones)
+
+    def after(self, _milisegundos, funcion):
+        self.programados += 1
+        self.pendientes[self.programados] = funcion
+        return self.programados
+
+    def after_cancel(self, identificador):
+        del self.pendientes[identificador]
+
+    def ejecutar_pendientes(self):
+        """Ejecuta las funciones programadas con after"""
+        pendientes, self.pendientes = self.pendientes, {}
+        for funcion in pendientes.values():
+            funcion()
+
+    def delete(self, *_):
+        self.elementos.clear()
+
+    def textos_visibles(self):
+        """Textos de las celdas visibles ordenados por posición (y, x)"""
+        return [
+            e["text"]
+            for e in sorted(
+                self.elementos.values(), key=lambda e: (e["coords"][1], e["coords"][0])
+            )
+            if e["tipo"] == "texto" and e.get("state") == "normal"
+        ]
+
+
+class BarraFalsa:
+    """Barra de scroll que recuerda su comando y su última posición"""
+
+    def configure(self, command=None):
+        self.comando = command
+
+    def set(self, primero, ultimo):
+        self.posicion = (primero, ultimo)
+
+
+class FuenteContada(FuenteDataFrame):
+    """Fuente que cuenta las lecturas de filas"""
+
+    def __init__(self, df):
+        super().__init__(df)
+        self.lecturas = 0
+
+    def obtener_filas(self, inicio, fin):
+        self.lecturas += 1
+        return super().obtener_filas(inicio, fin)
+
+
+class TestTablaVirtual:
+    """Pruebas para la tabla que solo dibuja las celdas visibles"""
+
+    @pytest.fixture
+    def datos(self):
+        """Crea un DataFrame grande y ancho"""
+        filas = 100_000
+        return pd.DataFrame(
+            {f"c{j}": np.arange(filas) * 10 + j for j in range(200)}
+        )
+
+    @pytest.fixture
+    def tabla(self):
+        """Tabla sobre un canvas falso de 600 x 280 píxeles (10 filas y 4 columnas visibles)"""
+        return TablaVirtual(CanvasFalso(600, 280), BarraFalsa(), BarraFalsa())
+
+    def test_funciones_de_ventana(self):
+        """Los desplazamientos se limitan a los datos y las columnas visibles se calculan bien"""
+        assert desplazar(("moveto", "0.5"), 0, 1000, 10) == 500
+        assert desplazar(("moveto", "1.0"), 0, 1000, 10) == 990
+        assert desplazar(("scroll", "-3", "units"), 2, 1000, 10) == 0
+        assert desplazar(("scroll", "2", "pages"), 0, 1000, 10) == 20
+        assert rango_columnas(0, 600, 150, 200) == (0, 4)
+        assert rango_columnas(75, 600, 150, 200) == (0, 5)
+        assert rango_columnas(0, 600, 150, 2) == (0, 2)
+        assert texto_celda("x" * 30) == "x" * 15 + "..."
+
+    def test_solo_dibuja_lo_visible(self, tabla, datos):
+        """El número de elementos depende de la vista, no del tamaño del dataset"""
+        fuente = FuenteContada(datos)
+        tabla.mostrar(fuente, 150, ["c1"], "c0")
+        canvas = tabla.canvas
+
+        # 4 cabeceras y 10 x 4 celdas, cada una con rectángulo y texto
+        assert len(canvas.elementos) == 2 * (4 + 10 * 4)
+        assert canvas.textos_visibles()[:6] == ["c0", "c1", "c2", "c3", "0", "1"]
+        colores = {
+            e["fill"] for e in canvas.elementos.values() if e["coords"][0] == 150 and "fill" in e
+        }
+        assert colores == {COLOR_ENTRADA}
+
+    def test_desplazamiento_reutiliza_elementos(self, tabla, datos):
+        """Desplazarse no crea elementos nuevos y pagina las filas de la fuente completa"""
+        fuente = FuenteContada(datos)
+        tabla.mostrar(fuente, 150)
+        creados = tabla.canvas.creados
+
+        tabla.scroll_y.comando("moveto", "0.99999")
+        tabla.scroll_x.comando("scroll", "1", "pages")
+
+        assert tabla.canvas.creados == creados
+        assert tabla.fila_inicio == len(datos) - 10
+        assert tabla.scroll_y.posicion == ((len(datos) - 10) / len(datos), 1.0)
+        textos = tabla.canvas.textos_visibles()
+        assert textos[:4] == ["c4", "c5", "c6", "c7"]
+        assert textos[4] == str((len(datos) - 10) * 10 + 4)
+
+        # Desplazamientos pequeños se sirven del bloque ya leído
+        lecturas = fuente.lecturas
+        for _ in range(5):
+            tabla.scroll_y.comando("scroll", "-1", "units")
+        assert fuente.lecturas == lecturas
+
+    def test_colorear_solo_cambia_fondos(self, tabla, datos):
+        """Cambiar la selección recolorea las columnas afectadas sin releer ni mover la vista"""
+        fuente = FuenteContada(datos)
+        tabla.mostrar(fuente, 150, ["c1"], "c0")
+        tabla.scroll_y.comando("scroll", "3", "units")
+        canvas = tabla.canvas
+        creados, lecturas, textos = canvas.creados, fuente.lecturas, canvas.textos_visibles()
+        configuraciones = canvas.configuraciones
+
+        tabla.colorear(["c1", "c2"], None)
+
+        # c0 deja de ser salida y c2 pasa a ser entrada: cabecera y dos etiquetas de filas por columna
+        assert canvas.configuraciones - configuraciones == 6
+        assert (canvas.creados, fuente.lecturas) == (creados, lecturas)
+        assert canvas.textos_visibles() == textos
+        assert tabla.fila_inicio == 3
+
+        def fondos(x):
+            return [
+                e["fill"]
+                for e in sorted(canvas.elementos.values(), key=lambda e: e["coords"][1])
+                if e["tipo"] == "rect" and e["coords"][0] == x
+            ]
+
+        assert fondos(0) == [COLOR_CABECERA] + [COLORES_FILAS[(3 + i) % 2] for i in range(10)]
+        assert fondos(300) == [COLOR_ENTRADA] * 11
+        assert COLOR_SALIDA not in fondos(0)
+
+        # Tras recolorear, un desplazamiento sigue usando los colores nuevos
+        tabla.scroll_y.comando("scroll", "1", "units")
+        assert fondos(0) == [COLOR_CABECERA] + [COLORES_FILAS[(4 + i) % 2] for i in range(10)]
+
+    def test_redimensionar_agrupa_y_conserva_posicion(self, tabla, datos):
+        """Los cambios de tamaño seguidos producen un solo ajuste que conserva la posición"""
+        fuente = FuenteContada(datos.iloc[:, :20])
+        tabla.mostrar(fuente, 150)
+        tabla.scroll_y.comando("moveto", "0.5")
+        tabla.scroll_x.comando("scroll", "1", "pages")
+        canvas = tabla.canvas
+        lecturas = fuente.lecturas
+
+        for ancho in range(610, 800, 10):
+            canvas.ancho = ancho
+            tabla.redimensionar()
+        assert len(canvas.pendientes) == 1
+
+        canvas.ancho, canvas.alto = 800, 330
+        canvas.ejecutar_pendientes()
+
+        # 800 px entre 20 columnas no llega al mínimo de 120 px; la vista sigue en la columna c4
+        assert tabla.ancho_columna == 120
+        assert tabla.fila_inicio == len(datos) // 2
+        assert tabla.canvas.textos_visibles()[0] == "c4"
+        assert fuente.lecturas == lecturas
+        assert tabla.scroll_x.posicion == (480 / 2400, 1280 / 2400)
+
+        # Mostrar otros datos descarta el ajuste pendiente
+        tabla.redimensionar()
+        tabla.mostrar(FuenteDataFrame(datos.iloc[:3]), 150)
+        assert canvas.pendientes == {}
+
+    def test_cabeceras_para_ordenar(self, tabla, datos):
+        """Las cabeceras se localizan por posición y la columna ordenada lleva su marca"""
+        tabla.mostrar(FuenteDataFrame(datos), 150, orden=("c2", True))
+        tabla.scroll_x.comando("scroll", "1", "units")
+
+        assert tabla.canvas.textos_visibles()[:4] == ["c0", "c1", "c2 ▼", "c3"]
+        assert tabla.columna_en(10, 10) == "c0"
+        assert tabla.columna_en(100, 10) == "c1"
+        assert tabla.columna_en(100, ALTO_CABECERA + 1) is None
+
+    def test_dataset_pequeno_oculta_sobrantes(self, tabla, datos):
+        """Al pasar a una fuente más pequeña los elementos sobrantes se ocultan"""
+        tabla.mostrar(FuenteDataFrame(datos), 150)
+        tabla.mostrar(FuenteDataFrame(datos.iloc[:3, :2]), 150)
+
+        assert tabla.canvas.textos_visibles() == ["c0", "c1", "0", "1", "10", "11", "20", "21"]
+        rect_visible = [
+            e for e in tabla.canvas.elementos.values()
+            if e["tipo"] == "rect" and e.get("state") == "normal"
+        ]
+        assert max(e["coords"][3] for e in rect_visible) == ALTO_CABECERA + 3 * ALTO_FILA
+
+        tabla.limpiar()
+        assert tabla.canvas.elementos == {}
+        assert tabla.scroll_y.posicion == (0, 1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,114 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import type_profile  # noqa: E402
+from pipeline import seleccionar_columnas  # noqa: E402
+from type_profile import (  # noqa: E402
+    CONVERTIBLE,
+    NO_NUMERICA,
+    NUMERICA,
+    perfil_columna,
+    perfil_tipos,
+)
+
+
+class TestPerfilTipos:
+    """Pruebas para el perfil de tipos que valida la selección de columnas"""
+
+    @pytest.fixture
+    def df(self):
+        """Crea un DataFrame con columnas numéricas, convertibles y no numéricas"""
+        return pd.DataFrame(
+            {
+                "edad": [25, 30, np.nan, 40],
+                "precio_texto": ["10", "2.5", None, "-3"],
+                "ciudad": [None, "12", "Madrid", "Sevilla"],
+                "zona": pd.Categorical(["1", None, "2", "norte"]),
+            }
+        )
+
+    def test_perfil_de_columnas(self, df):
+        """Cada columna se clasifica y se localiza el primer valor que no es un número"""
+        assert perfil_columna(df["edad"]) == {"tipo": NUMERICA}
+        assert perfil_columna(df["precio_texto"]) == {"tipo": CONVERTIBLE}
+        assert perfil_columna(df["ciudad"]) == {
+            "tipo": NO_NUMERICA,
+            "valor": "Madrid",
+            "fila": 2,
+        }
+        assert perfil_columna(df["zona"]) == {
+            "tipo": NO_NUMERICA,
+            "valor": "norte",
+            "fila": 3,
+        }
+        assert perfil_columna(pd.Series(["1", [2, 3]]))["fila"] == 1
+
+    def test_se_calcula_una_vez(self, df, monkeypatch):
+        """El perfil se guarda por DataFrame y columna y se recalcula si la columna cambia"""
+        llamadas = []
+        original = type_profile.perfil_columna
+
+        def contar(serie):
+            llamadas.append(serie.name)
+            return original(serie)
+
+        monkeypatch.setattr(type_profile, "perfil_columna", contar)
+        perfil = perfil_tipos(df)
+        perfil.calcular()
+        assert perfil_tipos(df) is perfil
+        for _ in range(3):
+            assert list(perfil.no_numericas(["edad", "ciudad", "zona"])) == ["ciudad", "zona"]
+        assert len(llamadas) == 4
+
+        # Columna sustituida por otra de distinto tipo
+        df["ciudad"] = [1.0, 2.0, 3.0, 4.0]
+        assert perfil.perfil("ciudad") == {"tipo": NUMERICA}
+        assert llamadas[4:] == ["ciudad"]
+
+        # Otro DataFrame tiene su propio perfil
+        assert perfil_tipos(df.copy()) is not perfil
+
+    def test_error_indica_la_celda(self, df):
+        """El error de la selección dice qué valor y qué fila impiden usar cada columna"""
+        with pytest.raises(ValueError) as error:
+            seleccionar_columnas(df, ["edad", "ciudad"], "zona")
+        mensaje = str(error.value)
+        assert "• ciudad: 'Madrid' en la fila 2" in mensaje
+        assert "• zona: 'norte' en la fila 3" in mensaje
+        assert "edad" not in mensaje.split("\n\n")[1]
+
+        version = seleccionar_columnas(df, ["edad"], "precio_texto")
+        assert version.columnas == ["edad", "precio_texto"]
+
+    def test_celda_modificada_en_el_sitio(self, df):
+        """Los cambios en el sitio que conservan el tipo y la longitud se tienen en cuenta al validar"""
+        seleccionar_columnas(df, ["precio_texto"], "edad")
+        df.loc[1, "precio_texto"] = "x"
+        with pytest.raises(ValueError, match="precio_texto: 'x' en la fila 1"):
+            seleccionar_columnas(df, ["precio_texto"], "edad")
+        df.loc[1, "precio_texto"] = "2.5"
+        assert seleccionar_columnas(df, ["precio_texto"], "edad").columnas == ["precio_texto", "edad"]
+
+        with pytest.raises(ValueError, match="ciudad: 'Madrid' en la fila 2"):
+            seleccionar_columnas(df, ["ciudad"], "edad")
+        df.fillna({"ciudad": "Cádiz"}, inplace=True)
+        with pytest.raises(ValueError, match="ciudad: 'Cádiz' en la fila 0"):
+            seleccionar_columnas(df, ["ciudad"], "edad")
+
+    def test_perfil_se_libera_con_el_dataframe(self):
+        """El perfil no mantiene vivo su DataFrame y se elimina al liberarlo"""
+        df = pd.DataFrame({"x": ["a"]})
+        perfil_tipos(df).calcular()
+        clave = id(df)
+        assert clave in type_profile._perfiles
+        del df
+        assert clave not in type_profile._perfiles
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])